@@ -0,0 +1,180 @@
+"""
+Benchmark de audiencias (búsqueda inversa de intereses) con keyset.
+
+    cd backend/users-service/src
+    PYTHONPATH=. python ../benchmarks/audience_bench.py --database-url postgresql://.../audience_bench [--accounts 1000000]
+
+ATENCIÓN: borra y recrea las tablas en la base indicada; usar una base descartable.
+
+Siembra cuentas con 1-2 ciudades de interés y 3 barrios rankeados por ciudad, con popularidad
+sesgada (pocas ciudades/barrios concentran la mayoría). Mide p50/p99 de la primera página y de
+una página profunda (cursor tras N páginas) para el barrio y la ciudad más populares y uno
+mediano, con y sin filtro de tipo de propiedad; luego repite sin los índices de audiencia.
+"""
+import argparse
+import statistics
+import time
+
+import sqlalchemy as sa
+from sqlmodel import Session, SQLModel
+
+from app.models import account, interests, location  # noqa: F401 (registra las tablas)
+from app.models.interests import PropertyType
+from app.repositories.interest_repository import list_city_audience, list_neighborhood_audience
+
+CITIES = 200
+NEIGHBORHOODS_PER_CITY = 20
+AUDIENCE_INDEXES = {
+    "ix_user_interest_city_active": "user_interest",
+    "ix_user_neighborhood_interest_reverse": "user_neighborhood_interest",
+}
+
+SEED_SQL = [
+    "INSERT INTO country (id, name, iso2, iso3, phone_code, currency, is_active) "
+    "VALUES (gen_random_uuid(), 'Bench', 'BN', 'BNC', '0', 'BNC', true)",
+    f"""INSERT INTO city (id, country_id, name, state_id, code, latitude, longitude, is_active, timezone)
+        SELECT gen_random_uuid(), (SELECT id FROM country), 'city ' || g, 'S', lpad(g::text, 4, '0'), 0, 0, true, 'UTC'
+        FROM generate_series(0, {CITIES - 1}) g""",
+    f"""INSERT INTO neighborhood (id, city_id, name, latitude, longitude, is_active)
+        SELECT gen_random_uuid(), c.id, c.code || '-' || k, 0, 0, true
+        FROM city c CROSS JOIN generate_series(0, {NEIGHBORHOODS_PER_CITY - 1}) k""",
+    """CREATE TEMP TABLE bench_city AS
+        SELECT row_number() OVER (ORDER BY code) - 1 AS idx, id FROM city""",
+    """CREATE TEMP TABLE bench_neighborhood AS
+        SELECT c.idx AS city_idx, (split_part(n.name, '-', 2))::int AS k, n.id
+        FROM neighborhood n JOIN bench_city c ON c.id = n.city_id""",
+    # 2% de cuentas inactivas: la consulta tiene que saltearlas.
+    """INSERT INTO accounts (account_id, email, account_type, onboarding_step, is_active)
+        SELECT gen_random_uuid(), 'u' || g || '@bench.test', 'person', 1, g % 50 <> 0
+        FROM generate_series(1, :accounts) g""",
+    # 1-2 ciudades por cuenta, sesgadas (power 3) hacia las primeras. MATERIALIZED: random()
+    # se evalúa una vez por fila, no dentro del join.
+    f"""WITH picks AS MATERIALIZED (
+            SELECT a.account_id, floor(power(random(), 3) * {CITIES})::int AS city_idx
+            FROM accounts a
+            -- Lateral sobre la cuenta: un filtro con random() se evaluaría una vez por slot.
+            CROSS JOIN LATERAL generate_series(1, 1 + (abs(hashtext(a.account_id::text)) % 10 < 3)::int) slot
+        )
+        INSERT INTO user_interest (id, account_id, city_id, is_active)
+        SELECT gen_random_uuid(), p.account_id, c.id, random() > 0.05
+        FROM picks p JOIN bench_city c ON c.idx = p.city_idx
+        ON CONFLICT DO NOTHING""",
+    # 3 barrios distintos por ciudad (offsets 7/14/21 mod 20), rank 1..3.
+    f"""WITH picks AS MATERIALIZED (
+            SELECT ui.id, c.idx AS city_idx, floor(power(random(), 2) * {NEIGHBORHOODS_PER_CITY})::int AS base
+            FROM user_interest ui JOIN bench_city c ON c.id = ui.city_id
+        )
+        INSERT INTO user_neighborhood_interest (user_interest_id, neighborhood_id, interest_rank)
+        SELECT p.id, n.id, r
+        FROM picks p
+        CROSS JOIN generate_series(1, 3) r
+        JOIN bench_neighborhood n ON n.city_idx = p.city_idx AND n.k = (p.base + r * 7) % {NEIGHBORHOODS_PER_CITY}""",
+    """INSERT INTO user_property_type_interest (user_interest_id, property_type)
+        SELECT id, (ARRAY['house', 'apartment'])[1 + (random() < 0.5)::int]::propertytype FROM user_interest
+        UNION ALL
+        SELECT id, 'house'::propertytype FROM user_interest WHERE random() < 0.3
+        ON CONFLICT DO NOTHING""",
+    "ANALYZE",
+]
+
+
+def _seed(engine, accounts: int) -> None:
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        for statement in SEED_SQL:
+            conn.execute(sa.text(statement), {"accounts": accounts})
+    with engine.connect() as conn:
+        counts = {
+            table: conn.execute(sa.text(f"SELECT count(*) FROM {table}")).scalar()
+            for table in ("accounts", "user_interest", "user_neighborhood_interest", "user_property_type_interest")
+        }
+    print(f"seed {time.perf_counter() - started:.1f}s  {counts}")
+
+
+def _targets(engine) -> list[tuple[str, str, object]]:
+    with engine.connect() as conn:
+        neighborhoods = conn.execute(sa.text(
+            "SELECT neighborhood_id, count(*) FROM user_neighborhood_interest GROUP BY 1 ORDER BY 2 DESC"
+        )).all()
+        cities = conn.execute(sa.text(
+            "SELECT city_id, count(*) FROM user_interest WHERE is_active GROUP BY 1 ORDER BY 2 DESC"
+        )).all()
+    return [
+        ("neighborhood", f"top ({neighborhoods[0][1]} filas)", neighborhoods[0][0]),
+        ("neighborhood", f"mediano ({neighborhoods[len(neighborhoods) // 2][1]})", neighborhoods[len(neighborhoods) // 2][0]),
+        ("city", f"top ({cities[0][1]})", cities[0][0]),
+        ("city", f"mediana ({cities[len(cities) // 2][1]})", cities[len(cities) // 2][0]),
+    ]
+
+
+def _page(session, kind, location_id, property_type, after, limit):
+    lookup = list_neighborhood_audience if kind == "neighborhood" else list_city_audience
+    return lookup(session, location_id, property_type=property_type, after=after, limit=limit)
+
+
+def _percentiles(samples: list[float]) -> str:
+    samples = sorted(samples)
+    p50 = statistics.median(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return f"p50 {p50 * 1000:8.3f} ms  p99 {p99 * 1000:8.3f} ms"
+
+
+def _measure(engine, targets, *, limit: int, depth: int, repeats: int) -> None:
+    with Session(engine) as session:
+        for kind, label, location_id in targets:
+            for property_type in (None, PropertyType.apartment):
+                # Cursor profundo: recorrer `depth` páginas.
+                after = None
+                for _ in range(depth):
+                    rows = _page(session, kind, location_id, property_type, after, limit)
+                    if len(rows) < limit:
+                        break
+                    after = rows[-1][0]
+
+                for name, cursor in (("página 1", None), (f"página {depth + 1}", after)):
+                    timings = []
+                    for _ in range(repeats):
+                        start = time.perf_counter()
+                        _page(session, kind, location_id, property_type, cursor, limit)
+                        timings.append(time.perf_counter() - start)
+                    session.rollback()
+                    filter_label = property_type.value if property_type else "-"
+                    print(f"    {kind:<12} {label:<22} {filter_label:<9} {name:<10} {_percentiles(timings)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True, help="Base descartable: se borran y recrean las tablas.")
+    parser.add_argument("--accounts", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--depth", type=int, default=50, help="Páginas a recorrer para el cursor profundo.")
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--skip-seed", action="store_true", help="Reusar los datos de una corrida anterior.")
+    args = parser.parse_args()
+
+    engine = sa.create_engine(args.database_url)
+    if not args.skip_seed:
+        _seed(engine, args.accounts)
+    targets = _targets(engine)
+
+    print("con índices de audiencia")
+    _measure(engine, targets, limit=args.limit, depth=args.depth, repeats=args.repeats)
+
+    with engine.begin() as conn:
+        for index in AUDIENCE_INDEXES:
+            conn.execute(sa.text(f"DROP INDEX {index}"))
+    try:
+        print("sin índices de audiencia")
+        _measure(engine, targets, limit=args.limit, depth=args.depth, repeats=max(3, args.repeats // 10))
+    finally:
+        # Rearmar los índices para que la base quede como la crea el modelo.
+        for table in (interests.UserInterest.__table__, interests.UserNeighborhoodInterest.__table__):
+            for index in table.indexes:
+                if index.name in AUDIENCE_INDEXES:
+                    index.create(engine)
+
+
+if __name__ == "__main__":
+    main()
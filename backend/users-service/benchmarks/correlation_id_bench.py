@@ -0,0 +1,94 @@
+"""
+Benchmark del middleware de correlation id sobre una ruta trivial.
+
+    cd backend/users-service/src
+    PYTHONPATH=. python ../benchmarks/correlation_id_bench.py [--requests 10000]
+
+Compara, en proceso (httpx.ASGITransport, sin red): sin middleware, el middleware
+de función anterior (@app.middleware("http"), BaseHTTPMiddleware) y el ASGI puro actual.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+from fastapi import FastAPI, Request
+
+from app.api.middleware.correlation_id import add_correlation_id
+from app.core.logging.context import request_id_ctx
+
+
+def _legacy_correlation_id(app: FastAPI) -> None:
+    # Versión previa, tal cual estaba en app/api/middleware/correlation_id.py.
+    @app.middleware("http")
+    async def correlation_id_middleware(request: Request, call_next):
+        request_id = request.headers.get("X-Request-Id", str(uuid.uuid4()))
+        token = request_id_ctx.set(request_id)
+
+        response = await call_next(request)
+        response.headers["X-Request-Id"] = request_id
+
+        request_id_ctx.reset(token)
+        return response
+
+
+def _app(install=None) -> FastAPI:
+    app = FastAPI()
+    if install is not None:
+        install(app)
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+async def _run(client: httpx.AsyncClient, requests: int, latencies: list[float]) -> None:
+    for _ in range(requests):
+        start = time.perf_counter()
+        await client.get("/ping")
+        latencies.append(time.perf_counter() - start)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    variants = [
+        ("sin middleware", _app()),
+        ("@app.middleware (anterior)", _app(_legacy_correlation_id)),
+        ("ASGI puro (actual)", _app(add_correlation_id)),
+    ]
+    clients = [
+        httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+        for _, app in variants
+    ]
+    results: list[list[float]] = [[] for _ in variants]
+
+    for client in clients:
+        await _run(client, 200, [])
+    # Rondas intercaladas: el ruido de la máquina afecta por igual a las tres variantes.
+    per_round = max(1, args.requests // args.rounds)
+    for _ in range(args.rounds):
+        for client, latencies in zip(clients, results):
+            await _run(client, per_round, latencies)
+    for client in clients:
+        await client.aclose()
+
+    for (name, _), latencies in zip(variants, results):
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2]
+        p99 = latencies[int(len(latencies) * 0.99)]
+        print(
+            f"{name:<28} mean {statistics.fmean(latencies) * 1e6:7.1f} us"
+            f"  p50 {p50 * 1e6:7.1f} us  p99 {p99 * 1e6:7.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,117 @@
+"""
+Servidor falso del admin API de Keycloak para benchmarks (sin Keycloak real).
+
+Implementa lo que usa KeycloakIntegration: token client_credentials, crear usuario,
+set-password y delete. Permite inyectar latencia y errores por operación.
+"""
+import json
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+OPERATIONS = ("token", "create_user", "set_password", "delete_user")
+
+
+@dataclass
+class FaultProfile:
+    """Latencia (media ± jitter, en ms) y tasa de errores 5xx por operación."""
+
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    # Keycloak viejos rechazan "credentials" embebidas en el create.
+    reject_inline_credentials: bool = False
+    per_operation_error_rate: dict[str, float] = field(default_factory=dict)
+
+
+class FakeKeycloak:
+    def __init__(self, profile: FaultProfile | None = None, seed: int | None = None):
+        self.profile = profile or FaultProfile()
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = {operation: 0 for operation in OPERATIONS}
+        self.errors = {operation: 0 for operation in OPERATIONS}
+        self.server: ThreadingHTTPServer | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def _inject(self, operation: str) -> bool:
+        """Cuenta la llamada, aplica la latencia y decide si responde con error."""
+        profile = self.profile
+        with self.lock:
+            self.calls[operation] += 1
+            delay = max(0.0, self.random.gauss(profile.latency_ms, profile.jitter_ms)) if profile.latency_ms else 0.0
+            rate = profile.per_operation_error_rate.get(operation, profile.error_rate)
+            failed = operation != "token" and self.random.random() < rate
+            if failed:
+                self.errors[operation] += 1
+        if delay:
+            time.sleep(delay / 1000)
+        return failed
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> "FakeKeycloak":
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _body(self) -> bytes:
+                return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+            def _send(self, code: int, body: bytes = b"", headers: dict | None = None) -> None:
+                self.send_response(code)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _error(self) -> None:
+                self._send(503, b'{"error":"injected"}', {"Content-Type": "application/json"})
+
+            def do_POST(self):
+                body = self._body()
+                if self.path.endswith("/token"):
+                    fake._inject("token")
+                    token = {"access_token": uuid.uuid4().hex, "expires_in": 300, "token_type": "Bearer"}
+                    return self._send(200, json.dumps(token).encode(), {"Content-Type": "application/json"})
+                if fake._inject("create_user"):
+                    return self._error()
+                if fake.profile.reject_inline_credentials and b'"credentials"' in body:
+                    return self._send(400, b'{"errorMessage":"credentials not supported"}', {"Content-Type": "application/json"})
+                return self._send(201, b"", {"Location": f"{fake.url}admin/realms/bench/users/{uuid.uuid4()}"})
+
+            def do_PUT(self):
+                self._body()
+                if fake._inject("set_password"):
+                    return self._error()
+                self._send(204)
+
+            def do_DELETE(self):
+                self._body()
+                if fake._inject("delete_user"):
+                    return self._error()
+                self._send(204)
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name="fake-keycloak", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"calls": dict(self.calls), "injected_errors": dict(self.errors)}
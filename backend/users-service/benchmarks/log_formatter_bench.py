@@ -0,0 +1,68 @@
+"""
+Micro-benchmark de los formatters JSON de logging.
+
+    cd backend/users-service/src
+    PYTHONPATH=. python ../benchmarks/log_formatter_bench.py [--records 200000]
+
+Formatea el mismo set de records (info típico de registro, uno con exception
+en extra y uno con traceback) con JsonLogFormatter y FastJsonLogFormatter.
+"""
+import argparse
+import logging
+import sys
+import time
+import uuid
+
+from app.core.logging import formatter as formatter_module
+from app.core.logging.formatter import FastJsonLogFormatter, JsonLogFormatter
+
+
+def _records() -> list[logging.LogRecord]:
+    info = logging.LogRecord("app.services.auth_service", logging.INFO, __file__, 1, "kc_user_create_succeeded", None, None)
+    info.extra = {"email_hash": "3f1a9c0b2d4e", "kc_user_id": str(uuid.uuid4()), "duration_ms": 41.7}
+
+    db_error = logging.LogRecord("app.workers.keycloak_tasks", logging.ERROR, __file__, 1, "Failed to update task", None, None)
+    db_error.extra = {"task_ids": [str(uuid.uuid4()) for _ in range(5)], "db_err": RuntimeError("connection reset")}
+
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        exc_info = sys.exc_info()
+    failed = logging.LogRecord("app.services.auth_service", logging.ERROR, __file__, 1, "account_register_failed", None, exc_info)
+    failed.extra = {"email_hash": "3f1a9c0b2d4e"}
+
+    return [info] * 8 + [db_error, failed]
+
+
+def _bench(formatter: logging.Formatter, records: list[logging.LogRecord], total: int) -> float:
+    rounds = total // len(records)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for record in records:
+            formatter.format(record)
+    return (time.perf_counter() - start) / (rounds * len(records))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=200_000)
+    args = parser.parse_args()
+
+    records = _records()
+    static = {"service": "users-service"}
+    results = [("JsonLogFormatter", _bench(JsonLogFormatter(static), records, args.records))]
+
+    orjson = formatter_module.orjson
+    formatter_module.orjson = None
+    results.append(("FastJsonLogFormatter (json)", _bench(FastJsonLogFormatter(static), records, args.records)))
+    formatter_module.orjson = orjson
+    if orjson is not None:
+        results.append(("FastJsonLogFormatter (orjson)", _bench(FastJsonLogFormatter(static), records, args.records)))
+
+    baseline = results[0][1]
+    for name, per_record in results:
+        print(f"{name:<32} {per_record * 1e6:8.2f} us/record  x{baseline / per_record:.2f}")
+
+
+if __name__ == "__main__":
+    main()
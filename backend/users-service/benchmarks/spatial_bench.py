@@ -0,0 +1,101 @@
+"""
+Benchmark del índice espacial del catálogo (k-vecinos y radio).
+
+    cd backend/users-service/src
+    PYTHONPATH=. python ../benchmarks/spatial_bench.py [--points 100000 250000] [--queries 500]
+
+Genera barrios sintéticos agrupados alrededor de ciudades (como un catálogo real) y mide,
+por backend (numpy, python, haversine ingenuo sobre todas las filas): tiempo de armado,
+p50/p99 de kNN (k=20) y de radio (5 km). Verifica que los tres devuelvan lo mismo.
+"""
+import argparse
+import math
+import random
+import statistics
+import time
+
+from app.services import spatial_index as spatial_module
+from app.services.spatial_index import SpatialIndex, haversine_km
+
+
+def _points(count: int, seed: int) -> tuple[list[int], list[float], list[float]]:
+    rng = random.Random(seed)
+    # ~500 "ciudades" en el cono sur, barrios con dispersión de unos 10 km alrededor de cada una.
+    centers = [(rng.uniform(-55.0, -22.0), rng.uniform(-73.0, -53.0)) for _ in range(500)]
+    latitudes, longitudes = [], []
+    for _ in range(count):
+        lat, lon = rng.choice(centers)
+        latitudes.append(lat + rng.gauss(0, 0.09))
+        longitudes.append(lon + rng.gauss(0, 0.09 / math.cos(math.radians(lat))))
+    return list(range(count)), latitudes, longitudes
+
+
+def _naive(latitudes, longitudes, lat, lon, k, max_km=None):
+    distances = ((index, haversine_km(lat, lon, other_lat, other_lon)) for index, (other_lat, other_lon) in enumerate(zip(latitudes, longitudes)))
+    if max_km is not None:
+        distances = (pair for pair in distances if pair[1] <= max_km)
+    return sorted(distances, key=lambda pair: pair[1])[:k]
+
+
+def _percentiles(samples: list[float]) -> str:
+    samples = sorted(samples)
+    p50 = statistics.median(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return f"p50 {p50 * 1000:8.3f} ms  p99 {p99 * 1000:8.3f} ms"
+
+
+def _run(label: str, search, queries, **kwargs) -> list:
+    timings, results = [], []
+    for lat, lon in queries:
+        start = time.perf_counter()
+        results.append(search(lat, lon, **kwargs))
+        timings.append(time.perf_counter() - start)
+    print(f"    {label:<28} {_percentiles(timings)}")
+    return results
+
+
+def _same(expected, got) -> bool:
+    # Empates de distancia pueden salir en otro orden: comparar distancias, no ids.
+    return len(expected) == len(got) and all(abs(a[1] - b[1]) < 1e-6 for a, b in zip(expected, got))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, nargs="+", default=[100_000, 250_000])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--naive-queries", type=int, default=20, help="el haversine ingenuo es lento: menos consultas")
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--radius-km", type=float, default=5.0)
+    args = parser.parse_args()
+
+    backends = ["numpy", "python"] if spatial_module.np is not None else ["python"]
+    if spatial_module.np is None:
+        print("numpy no instalado: solo backend python (uv sync --extra spatial)")
+
+    for count in args.points:
+        items, latitudes, longitudes = _points(count, seed=count)
+        rng = random.Random(1)
+        queries = [(latitudes[i] + rng.gauss(0, 0.05), longitudes[i] + rng.gauss(0, 0.05)) for i in rng.sample(items, args.queries)]
+        print(f"{count} puntos, {args.queries} consultas")
+
+        outputs = {}
+        for backend in backends:
+            start = time.perf_counter()
+            index = SpatialIndex(items, latitudes, longitudes, backend=backend)
+            print(f"  {backend}: armado {(time.perf_counter() - start) * 1000:.1f} ms")
+            knn = _run(f"kNN k={args.k}", index.nearest, queries, k=args.k)
+            radius = _run(f"radio {args.radius_km} km", index.nearest, queries, k=count, max_km=args.radius_km)
+            outputs[backend] = (knn, radius)
+
+        naive_queries = queries[: args.naive_queries]
+        print(f"  naive ({len(naive_queries)} consultas)")
+        naive_knn = _run(f"kNN k={args.k}", lambda lat, lon, k: _naive(latitudes, longitudes, lat, lon, k), naive_queries, k=args.k)
+        naive_radius = _run(f"radio {args.radius_km} km", lambda lat, lon, k, max_km: _naive(latitudes, longitudes, lat, lon, k, max_km), naive_queries, k=count, max_km=args.radius_km)
+
+        for backend, (knn, radius) in outputs.items():
+            ok = all(_same(e, g) for e, g in zip(naive_knn, knn)) and all(_same(e, g) for e, g in zip(naive_radius, radius))
+            print(f"  {backend} == naive: {ok}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import hmac
+import uuid
+
+from fastapi import Request
+
+from app.core import config
+from app.core.exceptions.user import ForbiddenError, NotAuthenticatedError
+
+
+def get_current_account_id(request: Request) -> uuid.UUID:
+    """
+    account_id del usuario autenticado, desde el header que pone el gateway tras validar el
+    token (AUTH_USER_ID_HEADER). El servicio no valida JWT por su cuenta.
+    """
+    value = request.headers.get(config.AUTH_USER_ID_HEADER)
+    if not value:
+        raise NotAuthenticatedError()
+    try:
+        return uuid.UUID(value)
+    except ValueError:
+        raise NotAuthenticatedError() from None
+
+def require_internal_service(request: Request) -> None:
+    """
+    Endpoints entre servicios: exige el token compartido (INTERNAL_API_TOKEN). Sin token
+    configurado no se abren: 403 para todos.
+    """
+    value = request.headers.get(config.INTERNAL_API_TOKEN_HEADER)
+    if not value:
+        raise NotAuthenticatedError()
+    if not config.INTERNAL_API_TOKEN or not hmac.compare_digest(value.encode(), config.INTERNAL_API_TOKEN.encode()):
+        raise ForbiddenError()
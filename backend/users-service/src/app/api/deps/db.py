@@ -1,17 +1,89 @@
 import os
 
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 
 from sqlmodel import Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 
 from dotenv import load_dotenv
 
+from app.core import config
+from app.core.tracing import instrument_engine_tracing
+from app.db.pool_metrics import TimedAsyncAdaptedQueuePool, TimedQueuePool, instrument_engine
+
 load_dotenv()
 
 database_URL = os.getenv('DATABASE_URL')
 
-engine = create_engine(database_URL, connect_args={"options": "-c timezone=utc"})
+
+def _pool_kwargs(pool_size: int, max_overflow: int) -> dict:
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": config.DB_POOL_TIMEOUT_SEC,
+        "pool_recycle": config.DB_POOL_RECYCLE_SEC,
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+    }
+
+
+def _connect_args(url: str) -> dict:
+    # "options" es de libpq/psycopg2; SQLite (benchmarks locales) no lo acepta.
+    return {"options": "-c timezone=utc"} if make_url(url).get_backend_name() == "postgresql" else {}
+
+
+engine = create_engine(
+    database_URL,
+    connect_args=_connect_args(database_URL),
+    poolclass=TimedQueuePool,
+    **_pool_kwargs(config.DB_POOL_SIZE, config.DB_MAX_OVERFLOW),
+)
+instrument_engine(engine, "api")
+instrument_engine_tracing(engine, "api")
+
+# Los jobs (compensaciones Keycloak) usan su propio pool si se configura, para no competir con los requests.
+worker_engine = engine
+if config.DB_WORKER_POOL_SIZE > 0:
+    worker_engine = create_engine(
+        database_URL,
+        connect_args=_connect_args(database_URL),
+        poolclass=TimedQueuePool,
+        **_pool_kwargs(config.DB_WORKER_POOL_SIZE, config.DB_WORKER_MAX_OVERFLOW),
+    )
+    instrument_engine(worker_engine, "worker")
+    instrument_engine_tracing(worker_engine, "worker")
+
+
+def _async_database_url(url: str) -> str:
+    """
+    Deriva la URL asyncpg a partir de DATABASE_URL (postgresql:// o postgresql+psycopg2://).
+    """
+    return make_url(url).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+
+async_engine: AsyncEngine | None = None
+if config.DB_ASYNC:
+    async_engine = create_async_engine(
+        config.ASYNC_DATABASE_URL or _async_database_url(database_URL),
+        connect_args={"server_settings": {"timezone": "utc"}},
+        poolclass=TimedAsyncAdaptedQueuePool,
+        **_pool_kwargs(config.DB_POOL_SIZE, config.DB_MAX_OVERFLOW),
+    )
+    instrument_engine(async_engine, "api_async")
+    instrument_engine_tracing(async_engine, "api_async")
+
 
 def get_session() -> Generator[Session,None,None]:
     with Session(engine) as session:
-        yield session
\ No newline at end of file
+        yield session
+
+
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    # expire_on_commit=False: serializar la respuesta tras el commit no debe disparar lazy loads.
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+
+# Dependencia que usan las rutas; DB_ASYNC permite convivir ambos caminos durante la migración.
+get_db_session = get_async_session if config.DB_ASYNC else get_session
@@ -1,7 +1,8 @@
+import math
+
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from sqlalchemy.exc import ProgrammingError
-import psycopg2
 
 from app.core.exceptions.base import BaseError
 
@@ -22,6 +23,10 @@ def register_exception_handlers(app: FastAPI) -> None:
             },
         )
 
+        # 503 con tiempo estimado (p. ej. circuit breaker abierto): el cliente sabe cuándo reintentar.
+        retry_after_sec = exc.context.get("retry_after_sec")
+        headers = {"Retry-After": str(math.ceil(retry_after_sec))} if retry_after_sec else None
+
         return JSONResponse(
             status_code=exc.status_code,
             content={
@@ -29,13 +34,15 @@ def register_exception_handlers(app: FastAPI) -> None:
                 "code": exc.code,
                 "context": exc.context,
             },
+            headers=headers,
         )
 
     @app.exception_handler(ProgrammingError)
     async def sqlalchemy_programming_error_handler(request: Request, exc: ProgrammingError):
         # Cuando no han corrido migraciones: UndefinedTable
+        # pgcode 42P01 = undefined_table (psycopg2 y asyncpg lo exponen igual)
         orig = getattr(exc, "orig", None)
-        if isinstance(orig, psycopg2.errors.UndefinedTable):
+        if getattr(orig, "pgcode", None) == "42P01":
             return JSONResponse(
                 status_code=503,
                 content={
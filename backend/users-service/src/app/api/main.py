@@ -1,6 +1,9 @@
 from fastapi import APIRouter
 
-from app.api.routes import account
+from app.api.routes import account, audiences, locations, user
 
 api_router = APIRouter()
-api_router.include_router(account.router)
\ No newline at end of file
+api_router.include_router(account.router)
+api_router.include_router(audiences.router)
+api_router.include_router(locations.router)
+api_router.include_router(user.router)
@@ -1,15 +1,73 @@
+import base64
+import json
 import uuid
-from fastapi import FastAPI, Request
-from app.core.logging.context import request_id_ctx
 
-def add_correlation_id(app: FastAPI) -> None:
-    @app.middleware("http")
-    async def correlation_id_middleware(request: Request, call_next):
-        request_id = request.headers.get("X-Request-Id", str(uuid.uuid4()))
-        token = request_id_ctx.set(request_id)
+from fastapi import FastAPI
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import config
+from app.core.logging.context import request_id_ctx, user_id_ctx
+from app.core.logging.sampling import finish_request_trail, start_request_trail
+
+
+def _bearer_subject(authorization: str | None) -> str | None:
+    """
+    `sub` del JWT Bearer SIN verificar la firma: solo sirve para correlacionar logs,
+    nunca para autorizar.
+    """
+    if not authorization or not authorization.startswith("Bearer "):
+        return None
+    parts = authorization[7:].split(".")
+    if len(parts) != 3:
+        return None
+    try:
+        payload = parts[1] + "=" * (-len(parts[1]) % 4)
+        return json.loads(base64.urlsafe_b64decode(payload)).get("sub")
+    except (ValueError, AttributeError):
+        return None
+
+
+class CorrelationIdMiddleware:
+    """
+    Middleware ASGI: fija request_id_ctx (X-Request-Id entrante o uno nuevo) y user_id_ctx
+    (header del gateway o `sub` del token) durante el request, agrega X-Request-Id a la
+    respuesta envolviendo `send` y resetea el contexto en finally, aunque la app falle.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
-        response = await call_next(request)
-        response.headers["X-Request-Id"] = request_id
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        request_id_ctx.reset(token)
-        return response
+        headers = Headers(scope=scope)
+        request_id = headers.get("x-request-id") or str(uuid.uuid4())
+        user_id = headers.get(config.AUTH_USER_ID_HEADER) or _bearer_subject(headers.get("authorization"))
+
+        request_token = request_id_ctx.set(request_id)
+        user_token = user_id_ctx.set(user_id)
+        # Con muestreo activo, lo descartado del request se retiene y se emite solo si falla.
+        trail_token = start_request_trail(config.LOG_TRAIL_MAX_RECORDS) if config.LOG_SAMPLING_ENABLED else None
+        status_code = 500
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message)["X-Request-Id"] = request_id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            if trail_token is not None:
+                finish_request_trail(trail_token, failed=status_code >= 500)
+            user_id_ctx.reset(user_token)
+            request_id_ctx.reset(request_token)
+
+
+def add_correlation_id(app: FastAPI) -> None:
+    app.add_middleware(CorrelationIdMiddleware)
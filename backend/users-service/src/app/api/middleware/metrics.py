@@ -0,0 +1,51 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import HTTP_REQUEST_SECONDS
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Template de la ruta que atendió el request. Con routers anidados (FastAPI >= 0.14x)
+    scope["route"] solo trae el path relativo a su router; el template completo
+    queda en el contexto efectivo que FastAPI deja en scope["fastapi"].
+    """
+    effective = (scope.get("fastapi") or {}).get("effective_route_context")
+    path = getattr(effective, "path_format", None)
+    if path:
+        return path
+    return getattr(scope.get("route"), "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que observa la latencia de cada request HTTP.
+    La ruta se etiqueta con el template (/v1/account/{id}) para acotar la cardinalidad.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUEST_SECONDS.labels(
+                scope["method"],
+                route_template(scope),
+                str(status_code),
+            ).observe(time.perf_counter() - start)
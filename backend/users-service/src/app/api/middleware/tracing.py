@@ -0,0 +1,55 @@
+import inspect
+
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.api.middleware.metrics import route_template
+from app.core.tracing import mark_span_error, start_span, tracing_enabled
+
+
+# Las versiones recientes de FastAPI abren el span SERVER por su cuenta (FastAPI(telemetry=...))
+# en cuanto hay un TracerProvider; ahí este middleware duplicaría el span.
+FASTAPI_NATIVE_TRACING = "telemetry" in inspect.signature(FastAPI.__init__).parameters
+
+
+class TracingMiddleware:
+    """
+    Middleware ASGI que abre el span SERVER de cada request HTTP (continúa un traceparent entrante).
+    Los spans de SQL y Keycloak del request quedan como hijos de este.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not tracing_enabled():
+            await self.app(scope, receive, send)
+            return
+
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        with start_span(
+            f'{scope["method"]} {scope["path"]}',
+            kind="server",
+            attributes={"http.request.method": scope["method"], "url.path": scope["path"]},
+            headers=headers,
+        ) as span:
+            try:
+                await self.app(scope, receive, send_with_status)
+            except Exception as exc:
+                mark_span_error(span, exc)
+                raise
+            finally:
+                route = route_template(scope)
+                span.update_name(f'{scope["method"]} {route}')
+                span.set_attribute("http.route", route)
+                span.set_attribute("http.response.status_code", status_code)
+                if status_code >= 500:
+                    mark_span_error(span, description=f"HTTP {status_code}")
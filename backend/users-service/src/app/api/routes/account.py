@@ -1,9 +1,11 @@
 from typing import Annotated
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Header, Response, status
 
-from app.api.deps.db import get_session
+from app.api.deps.db import get_db_session
+from app.core import config
 
 from app.schemas.auth import (
     RegisterRequest,
@@ -11,13 +13,29 @@ from app.schemas.auth import (
 )
 
 from app.services.auth_service import create_account_service
+from app.services.idempotency_service import request_fingerprint, run_idempotent
 
 router = APIRouter(prefix="/account", tags=["auth"])
 
 @router.post("/register", response_model=RegisterResponse, status_code=status.HTTP_201_CREATED)
 async def register_user_generic_flow(
         payload: RegisterRequest, 
-        session: Annotated[Session, Depends(get_session)]
+        session: Annotated[Session | AsyncSession, Depends(get_db_session)],
+        response: Response,
+        idempotency_key: Annotated[str | None, Header(min_length=1, max_length=255)] = None,
     ):
-    user = await create_account_service(session, payload)
+    if idempotency_key is None or not config.IDEMPOTENCY_ENABLED:
+        user = await create_account_service(session, payload)
+        return user
+
+    user, replayed = await run_idempotent(
+        session,
+        scope="account_register",
+        key=idempotency_key,
+        request_hash=request_fingerprint(payload, secret_fields={"password"}),
+        operation=lambda: create_account_service(session, payload),
+        response_model=RegisterResponse,
+    )
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
     return user
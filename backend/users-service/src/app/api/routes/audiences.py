@@ -0,0 +1,42 @@
+import uuid
+from typing import Annotated
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from fastapi import APIRouter, Depends, Query
+
+from app.api.deps.auth import require_internal_service
+from app.api.deps.db import get_db_session
+from app.models.interests import PropertyType
+from app.schemas.interests import AudiencePage
+from app.services.interest_service import audience_service
+
+# Búsqueda inversa de intereses para matching: quién quiere qué, dónde. Solo entre servicios:
+# expone account_ids en lote.
+router = APIRouter(prefix="/audiences", tags=["audiences"], dependencies=[Depends(require_internal_service)])
+
+AudienceLimit = Annotated[int, Query(ge=1, le=1000)]
+
+@router.get("/neighborhoods/{neighborhood_id}", response_model=AudiencePage)
+async def neighborhood_audience(
+        neighborhood_id: uuid.UUID,
+        session: Annotated[Session | AsyncSession, Depends(get_db_session)],
+        property_type: PropertyType | None = None,
+        cursor: uuid.UUID | None = None,
+        limit: AudienceLimit = 100,
+    ):
+    return await audience_service(
+        session, kind="neighborhood", location_id=neighborhood_id, property_type=property_type, cursor=cursor, limit=limit
+    )
+
+@router.get("/cities/{city_id}", response_model=AudiencePage)
+async def city_audience(
+        city_id: uuid.UUID,
+        session: Annotated[Session | AsyncSession, Depends(get_db_session)],
+        property_type: PropertyType | None = None,
+        cursor: uuid.UUID | None = None,
+        limit: AudienceLimit = 100,
+    ):
+    return await audience_service(
+        session, kind="city", location_id=city_id, property_type=property_type, cursor=cursor, limit=limit
+    )
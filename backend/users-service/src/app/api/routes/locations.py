@@ -0,0 +1,72 @@
+import uuid
+from typing import Annotated
+
+from fastapi import APIRouter, Query, Request, Response
+from pydantic_core import to_json
+
+from app.core import config
+from app.core.exceptions.location import LocationNotFoundError
+from app.schemas.location import CityNearbyOut, CityOut, CountryOut, NeighborhoodNearbyOut, NeighborhoodOut
+from app.services.location_catalog import CatalogSnapshot, location_catalog
+
+# Catálogo servido desde memoria (services/location_catalog.py): ninguna ruta toma conexión del pool.
+router = APIRouter(prefix="/locations", tags=["locations"])
+
+# Parámetros de /nearby: k vecinos más cercanos, opcionalmente dentro de radius_km.
+Latitude = Annotated[float, Query(ge=-90, le=90)]
+Longitude = Annotated[float, Query(ge=-180, le=180)]
+NearbyLimit = Annotated[int, Query(ge=1, le=500)]
+RadiusKm = Annotated[float | None, Query(gt=0, le=20000)]
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+def _catalog_response(request: Request, snapshot: CatalogSnapshot, payload: bytes) -> Response:
+    headers = {
+        "ETag": snapshot.etag,
+        "Cache-Control": f"public, max-age={config.LOCATION_CATALOG_MAX_AGE_SEC}",
+    }
+    if _etag_matches(request.headers.get("if-none-match"), snapshot.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=payload, media_type="application/json", headers=headers)
+
+
+@router.get("/countries", response_model=list[CountryOut])
+async def list_countries(request: Request):
+    snapshot = location_catalog.snapshot
+    return _catalog_response(request, snapshot, snapshot.countries_json)
+
+@router.get("/countries/{country_id}/cities", response_model=list[CityOut])
+async def list_cities(country_id: uuid.UUID, request: Request):
+    snapshot = location_catalog.snapshot
+    if country_id not in snapshot.countries_by_id:
+        raise LocationNotFoundError(kind="country", location_id=str(country_id))
+    return _catalog_response(request, snapshot, snapshot.cities_json.get(country_id, b"[]"))
+
+@router.get("/cities/{city_id}/neighborhoods", response_model=list[NeighborhoodOut])
+async def list_neighborhoods(city_id: uuid.UUID, request: Request):
+    snapshot = location_catalog.snapshot
+    if city_id not in snapshot.cities_by_id:
+        raise LocationNotFoundError(kind="city", location_id=str(city_id))
+    return _catalog_response(request, snapshot, snapshot.neighborhoods_json.get(city_id, b"[]"))
+
+
+def _nearby_json(results) -> bytes:
+    return to_json([{**entry._asdict(), "distance_km": round(distance, 3)} for entry, distance in results])
+
+# El resultado depende solo de la query y del snapshot: mismo ETag que el resto del catálogo.
+@router.get("/cities/nearby", response_model=list[CityNearbyOut])
+async def nearby_cities(request: Request, lat: Latitude, lon: Longitude, k: NearbyLimit = 20, radius_km: RadiusKm = None):
+    snapshot = location_catalog.snapshot
+    results = snapshot.city_index.nearest(lat, lon, k, max_km=radius_km)
+    return _catalog_response(request, snapshot, _nearby_json(results))
+
+@router.get("/neighborhoods/nearby", response_model=list[NeighborhoodNearbyOut])
+async def nearby_neighborhoods(request: Request, lat: Latitude, lon: Longitude, k: NearbyLimit = 20, radius_km: RadiusKm = None):
+    snapshot = location_catalog.snapshot
+    results = snapshot.neighborhood_index.nearest(lat, lon, k, max_km=radius_km)
+    return _catalog_response(request, snapshot, _nearby_json(results))
@@ -0,0 +1,120 @@
+import threading
+import time
+from datetime import timezone
+
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, HistogramMetricFamily
+from sqlmodel import Session
+
+from app.api.deps.db import worker_engine
+from app.core import config
+from app.core.logging.logger import dropped_log_records, get_logger
+from app.db.pool_metrics import WAIT_BUCKETS_SEC, pool_stats
+from app.integrations.keycloak_client import keycloak_provider
+from app.models.kc_tasks import KcTaskStatus
+from app.repositories.kc_task_repository import compensation_backlog
+
+logger = get_logger(__name__)
+
+router = APIRouter(tags=["metrics"])
+
+
+class CompensationBacklogCollector:
+    """
+    Gauges de la cola de compensaciones Keycloak. Consulta la DB al hacer scrape,
+    con el resultado cacheado METRICS_BACKLOG_CACHE_SEC para no multiplicar queries.
+    """
+
+    def __init__(self, cache_sec: float):
+        self.cache_sec = cache_sec
+        self._lock = threading.Lock()
+        self._cached_at = 0.0
+        self._backlog: dict = {}
+
+    def _current_backlog(self) -> dict:
+        with self._lock:
+            if time.monotonic() - self._cached_at >= self.cache_sec:
+                try:
+                    with Session(worker_engine) as session:
+                        self._backlog = compensation_backlog(session)
+                except Exception as e:
+                    logger.warning("metrics_backlog_query_failed", extra={"extra": {"error_type": type(e).__name__}})
+                self._cached_at = time.monotonic()
+            return self._backlog
+
+    @staticmethod
+    def _families() -> tuple[GaugeMetricFamily, GaugeMetricFamily]:
+        tasks = GaugeMetricFamily("kc_compensation_tasks", "Tasks de compensación por estado.", labels=["status"])
+        oldest = GaugeMetricFamily(
+            "kc_compensation_oldest_next_retry_timestamp_seconds",
+            "next_retry_at más antiguo de las tasks pendientes (unix).",
+        )
+        return tasks, oldest
+
+    def describe(self):
+        # Sin describe(), REGISTRY.register() llamaría a collect() y consultaría la DB al importar.
+        return list(self._families())
+
+    def collect(self):
+        backlog = self._current_backlog()
+        tasks, oldest = self._families()
+        for status in (KcTaskStatus.pending, KcTaskStatus.failed):
+            count, _ = backlog.get(status, (0, None))
+            tasks.add_metric([status.value], count)
+        _, oldest_pending = backlog.get(KcTaskStatus.pending, (0, None))
+        if oldest_pending is not None:
+            oldest.add_metric([], oldest_pending.replace(tzinfo=timezone.utc).timestamp())
+        yield tasks
+        yield oldest
+
+
+class RuntimeStatsCollector:
+    """
+    Expone los contadores que ya llevan los pools de DB, el cliente Keycloak y el logging.
+    """
+
+    def collect(self):
+        checked_out = GaugeMetricFamily("db_pool_checked_out", "Conexiones en uso.", labels=["pool"])
+        overflow = GaugeMetricFamily("db_pool_overflow", "Conexiones abiertas por encima de pool_size.", labels=["pool"])
+        checkouts = CounterMetricFamily("db_pool_checkouts", "Checkouts del pool.", labels=["pool"])
+        connects = CounterMetricFamily("db_pool_connects", "Conexiones nuevas abiertas.", labels=["pool"])
+        invalidations = CounterMetricFamily("db_pool_invalidations", "Conexiones invalidadas.", labels=["pool"])
+        wait = HistogramMetricFamily("db_pool_checkout_wait_seconds", "Espera por una conexión del pool.", labels=["pool"])
+
+        for stats in pool_stats():
+            pool = [stats["pool"]]
+            checked_out.add_metric(pool, stats.get("checked_out", 0))
+            overflow.add_metric(pool, stats.get("overflow", 0))
+            checkouts.add_metric(pool, stats["checkouts"])
+            connects.add_metric(pool, stats["connects"])
+            invalidations.add_metric(pool, stats["invalidations"])
+            cumulative, buckets = 0, []
+            for bound, count in zip([*map(str, WAIT_BUCKETS_SEC), "+Inf"], stats["wait_buckets"].values()):
+                cumulative += count
+                buckets.append((bound, cumulative))
+            wait.add_metric(pool, buckets, stats["wait_sum_sec"])
+
+        kc = keycloak_provider.stats()
+        kc_connections = GaugeMetricFamily("keycloak_http_open_connections", "Conexiones HTTP abiertas hacia Keycloak.")
+        kc_connections.add_metric([], kc["open_connections"])
+        kc_refreshes = CounterMetricFamily("keycloak_token_refreshes", "Renovaciones del token admin.")
+        kc_refreshes.add_metric([], kc["token_refreshes"])
+        kc_refresh_failures = CounterMetricFamily("keycloak_token_refresh_failures", "Renovaciones del token admin fallidas.")
+        kc_refresh_failures.add_metric([], kc["token_refresh_failures"])
+
+        dropped = CounterMetricFamily("log_records_dropped", "Records descartados con la cola de logging llena.")
+        dropped.add_metric([], dropped_log_records())
+
+        yield from (checked_out, overflow, checkouts, connects, invalidations, wait)
+        yield from (kc_connections, kc_refreshes, kc_refresh_failures, dropped)
+
+
+REGISTRY.register(CompensationBacklogCollector(config.METRICS_BACKLOG_CACHE_SEC))
+REGISTRY.register(RuntimeStatsCollector())
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    # Ruta síncrona: el scrape (y la query del backlog) corre en el threadpool, no en el event loop.
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,45 @@
+import uuid
+from typing import Annotated
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from fastapi import APIRouter, Depends
+
+from app.api.deps.auth import get_current_account_id
+from app.api.deps.db import get_db_session
+
+from app.schemas.account import AccountOut
+from app.schemas.interests import (
+    InterestsReplaceRequest,
+    InterestsResponse
+)
+
+from app.services.interest_service import get_interests_service, replace_interests_service
+from app.services.user_service import get_account_service
+
+router = APIRouter(prefix="/users", tags=["users"])
+
+@router.get("/me", response_model=AccountOut)
+async def get_current_account(
+        account_id: Annotated[uuid.UUID, Depends(get_current_account_id)],
+        session: Annotated[Session | AsyncSession, Depends(get_db_session)],
+    ):
+    # Se llama en cada apertura de la app: sale de account_cache casi siempre.
+    return await get_account_service(session, account_id)
+
+# Siempre sobre la cuenta autenticada: el account_id no viaja en el path.
+@router.put("/me/interests", response_model=InterestsResponse)
+async def replace_user_interests(
+        account_id: Annotated[uuid.UUID, Depends(get_current_account_id)],
+        payload: InterestsReplaceRequest,
+        session: Annotated[Session | AsyncSession, Depends(get_db_session)],
+    ):
+    # Reemplazo completo (guardado del onboarding): lo que no viene en el body se quita.
+    return await replace_interests_service(session, account_id, payload)
+
+@router.get("/me/interests", response_model=InterestsResponse)
+async def get_user_interests(
+        account_id: Annotated[uuid.UUID, Depends(get_current_account_id)],
+        session: Annotated[Session | AsyncSession, Depends(get_db_session)],
+    ):
+    return await get_interests_service(session, account_id)
@@ -0,0 +1,193 @@
+import itertools
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core import config
+from app.core.metrics import CACHE_ENTRIES, CACHE_EVICTIONS, CACHE_REQUESTS
+
+# Cuánto se recuerda una invalidación para descartar cargas que empezaron antes (más que
+# cualquier lectura razonable a la base).
+INVALIDATION_MEMORY_SEC = 30.0
+# Clave de session.info con las invalidaciones pendientes hasta el commit.
+PENDING_INVALIDATIONS_KEY = "cache_invalidations"
+# Reloj de TTLs e invalidaciones; los tests lo reemplazan solo en este módulo.
+_clock = time.monotonic
+
+
+class CacheBackend(ABC):
+    """
+    Almacenamiento de un Cache. Cada backend maneja su TTL y su tope de tamaño; un backend
+    compartido (p. ej. Redis) extiende la invalidación a todas las réplicas.
+    """
+
+    @abstractmethod
+    def get(self, key: Hashable) -> object | None: ...
+
+    @abstractmethod
+    def set(self, key: Hashable, value: object) -> None: ...
+
+    @abstractmethod
+    def delete(self, key: Hashable) -> bool: ...
+
+    @abstractmethod
+    def clear(self) -> None: ...
+
+    @abstractmethod
+    def __len__(self) -> int: ...
+
+
+class MemoryBackend(CacheBackend):
+    """
+    TTL + LRU en memoria del proceso, seguro entre hilos. `on_evict(reason)` se llama por
+    cada entrada que sale sola (expired, lru).
+    """
+
+    def __init__(self, *, max_entries: int, ttl_sec: float, on_evict: Callable[[str], None] | None = None):
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self._on_evict = on_evict
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, tuple[float, object]] = OrderedDict()
+
+    def get(self, key: Hashable) -> object | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= _clock():
+                del self._entries[key]
+                self._evicted("expired")
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: object) -> None:
+        with self._lock:
+            self._entries[key] = (_clock() + self.ttl_sec, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evicted("lru")
+
+    def delete(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evicted(self, reason: str) -> None:
+        if self._on_evict is not None:
+            self._on_evict(reason)
+
+
+class Cache:
+    """
+    Cache read-through con métricas de hit/miss sobre un CacheBackend intercambiable.
+
+    Carrera lectura/escritura: quien va a leer de la base toma `load_token()` antes y lo pasa
+    a `set`; si la key se invalidó en el medio (un commit que el lector no vio), el valor se descarta.
+    """
+
+    def __init__(self, name: str, backend: CacheBackend, *, enabled: bool = True):
+        self.name = name
+        self.backend = backend
+        self.enabled = enabled
+        self._sequence = itertools.count(1)
+        self._last_token = 0
+        self._invalidated: dict[Hashable, tuple[int, float]] = {}
+        self._lock = threading.Lock()
+        # Hijos etiquetados cacheados: el hit es el camino caliente.
+        self._hits = CACHE_REQUESTS.labels(name, "hit")
+        self._misses = CACHE_REQUESTS.labels(name, "miss")
+        self._entries = CACHE_ENTRIES.labels(name)
+
+    def get(self, key: Hashable) -> object | None:
+        if not self.enabled:
+            return None
+        value = self.backend.get(key)
+        (self._misses if value is None else self._hits).inc()
+        return value
+
+    def load_token(self) -> int:
+        with self._lock:
+            return self._last_token
+
+    def set(self, key: Hashable, value: object, *, token: int | None = None) -> bool:
+        """
+        Guarda `value`. False si se descartó porque la key se invalidó después de `token`.
+        """
+        if not self.enabled:
+            return False
+        with self._lock:
+            invalidated = self._invalidated.get(key)
+            if token is not None and invalidated is not None and invalidated[0] > token:
+                return False
+            self.backend.set(key, value)
+        self._entries.set(len(self.backend))
+        return True
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            token = next(self._sequence)
+            self._last_token = token
+            now = _clock()
+            self._invalidated[key] = (token, now)
+            if len(self._invalidated) > 1024:
+                self._invalidated = {
+                    other: entry for other, entry in self._invalidated.items()
+                    if now - entry[1] < INVALIDATION_MEMORY_SEC
+                }
+            deleted = self.backend.delete(key)
+        if deleted:
+            CACHE_EVICTIONS.labels(self.name, "invalidated").inc()
+            self._entries.set(len(self.backend))
+
+    def clear(self) -> None:
+        self.backend.clear()
+        self._entries.set(0)
+
+
+def memory_cache(name: str, *, max_entries: int, ttl_sec: float, enabled: bool = True) -> Cache:
+    evictions = {reason: CACHE_EVICTIONS.labels(name, reason) for reason in ("expired", "lru")}
+    backend = MemoryBackend(max_entries=max_entries, ttl_sec=ttl_sec, on_evict=lambda reason: evictions[reason].inc())
+    return Cache(name, backend, enabled=enabled)
+
+
+def invalidate_on_commit(session, cache: Cache, key: Hashable) -> None:
+    """
+    Invalida `key` cuando la transacción de `session` (Session o AsyncSession) hace commit.
+    Antes del commit no: un lector volvería a cargar el valor viejo, todavía visible.
+    """
+    sync_session = getattr(session, "sync_session", session)
+    sync_session.info.setdefault(PENDING_INVALIDATIONS_KEY, set()).add((cache, key))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_invalidations(session: Session) -> None:
+    for cache, key in session.info.pop(PENDING_INVALIDATIONS_KEY, ()):
+        cache.invalidate(key)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidations(session: Session) -> None:
+    session.info.pop(PENDING_INVALIDATIONS_KEY, None)
+
+
+# Cuenta + perfil por account_id (services/user_service.py).
+account_cache = memory_cache(
+    "account",
+    max_entries=config.ACCOUNT_CACHE_MAX_ENTRIES,
+    ttl_sec=config.ACCOUNT_CACHE_TTL_SEC,
+    enabled=config.ACCOUNT_CACHE_ENABLED,
+)
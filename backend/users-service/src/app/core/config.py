@@ -0,0 +1,131 @@
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Keycloak admin client (pool HTTP compartido + token cacheado)
+KC_POOL_CONNECTIONS = _env_int("KC_POOL_CONNECTIONS", 4)
+KC_POOL_MAXSIZE = _env_int("KC_POOL_MAXSIZE", 20)
+KC_HTTP_TIMEOUT_SEC = _env_int("KC_HTTP_TIMEOUT_SEC", 10)
+KC_TOKEN_REFRESH_MARGIN_SEC = _env_int("KC_TOKEN_REFRESH_MARGIN_SEC", 30)
+KC_INLINE_CREDENTIALS = _env_bool("KC_INLINE_CREDENTIALS", True)
+# Circuit breaker: KC_BREAKER_FAILURE_THRESHOLD fallas seguidas (5xx, timeouts, conexión) lo abren
+# por KC_BREAKER_OPEN_SEC; después pasan KC_BREAKER_HALF_OPEN_PROBES llamadas de prueba.
+KC_BREAKER_ENABLED = _env_bool("KC_BREAKER_ENABLED", True)
+KC_BREAKER_FAILURE_THRESHOLD = _env_int("KC_BREAKER_FAILURE_THRESHOLD", 5)
+KC_BREAKER_OPEN_SEC = _env_float("KC_BREAKER_OPEN_SEC", 30.0)
+KC_BREAKER_HALF_OPEN_PROBES = _env_int("KC_BREAKER_HALF_OPEN_PROBES", 1)
+# Bulkhead: llamadas concurrentes a Keycloak por proceso; sin cupo en KC_BULKHEAD_WAIT_SEC se rechaza.
+KC_BULKHEAD_MAX_CONCURRENT = _env_int("KC_BULKHEAD_MAX_CONCURRENT", 10)
+KC_BULKHEAD_WAIT_SEC = _env_float("KC_BULKHEAD_WAIT_SEC", 1.0)
+
+# Base de datos
+DB_ASYNC = _env_bool("DB_ASYNC", False)
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+DB_POOL_SIZE = _env_int("DB_POOL_SIZE", 5)
+DB_MAX_OVERFLOW = _env_int("DB_MAX_OVERFLOW", 10)
+DB_POOL_TIMEOUT_SEC = _env_float("DB_POOL_TIMEOUT_SEC", 30.0)
+DB_POOL_RECYCLE_SEC = _env_int("DB_POOL_RECYCLE_SEC", 1800)
+DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", True)
+# Pool propio para jobs en segundo plano; 0 = comparten el engine de la API.
+DB_WORKER_POOL_SIZE = _env_int("DB_WORKER_POOL_SIZE", 0)
+DB_WORKER_MAX_OVERFLOW = _env_int("DB_WORKER_MAX_OVERFLOW", 2)
+
+# Registro
+# Reserva el email con INSERT ... ON CONFLICT antes de llamar a Keycloak (en vez de SELECT previo).
+REGISTER_RESERVE_EMAIL = _env_bool("REGISTER_RESERVE_EMAIL", False)
+# Reserva pendiente más vieja que esto (registro caído sin liberarla): otro registro puede tomarla.
+REGISTER_RESERVATION_TTL_SEC = _env_int("REGISTER_RESERVATION_TTL_SEC", 300)
+# Header Idempotency-Key: un reintento con la misma key espera al primer intento o repite su respuesta.
+IDEMPOTENCY_ENABLED = _env_bool("IDEMPOTENCY_ENABLED", True)
+IDEMPOTENCY_TTL_SEC = _env_int("IDEMPOTENCY_TTL_SEC", 86400)
+# Lease del intento en curso; vencido (proceso caído) otro request con la key puede retomarla.
+IDEMPOTENCY_LOCK_SEC = _env_int("IDEMPOTENCY_LOCK_SEC", 60)
+# Cuánto espera un duplicado a que termine el primer intento antes de responder 409.
+IDEMPOTENCY_WAIT_SEC = _env_float("IDEMPOTENCY_WAIT_SEC", 10.0)
+IDEMPOTENCY_PURGE_INTERVAL_SEC = _env_int("IDEMPOTENCY_PURGE_INTERVAL_SEC", 3600)
+# Clave HMAC del fingerprint de requests con secretos (password); igual en todas las réplicas.
+IDEMPOTENCY_FINGERPRINT_SECRET = os.getenv("IDEMPOTENCY_FINGERPRINT_SECRET", "")
+
+# Catálogo de ubicaciones (country/city/neighborhood) en memoria del proceso
+LOCATION_CATALOG_ENABLED = _env_bool("LOCATION_CATALOG_ENABLED", True)
+# Recarga completa por intervalo; con LISTEN además recarga apenas cambia una tabla del catálogo.
+LOCATION_CATALOG_REFRESH_SEC = _env_int("LOCATION_CATALOG_REFRESH_SEC", 300)
+LOCATION_CATALOG_LISTEN = _env_bool("LOCATION_CATALOG_LISTEN", True)
+# Cache-Control max-age de los endpoints /v1/locations (el ETag permite revalidar con 304).
+LOCATION_CATALOG_MAX_AGE_SEC = _env_int("LOCATION_CATALOG_MAX_AGE_SEC", 300)
+
+# Cache de lectura de cuenta + perfil (GET /v1/users/me), por account_id
+ACCOUNT_CACHE_ENABLED = _env_bool("ACCOUNT_CACHE_ENABLED", True)
+# Las escrituras de este proceso invalidan al commit; el TTL acota lo viejo que ve otra réplica.
+ACCOUNT_CACHE_TTL_SEC = _env_float("ACCOUNT_CACHE_TTL_SEC", 60.0)
+ACCOUNT_CACHE_MAX_ENTRIES = _env_int("ACCOUNT_CACHE_MAX_ENTRIES", 10000)
+# Header con el account_id autenticado que pone el gateway (ya validó el token). Lo usan la
+# autenticación de /v1/users/me y el user_id de los logs.
+AUTH_USER_ID_HEADER = os.getenv("AUTH_USER_ID_HEADER", "X-User-Id")
+# Endpoints internos entre servicios (/v1/audiences): token compartido en INTERNAL_API_TOKEN_HEADER.
+# Sin token configurado responden 403.
+INTERNAL_API_TOKEN = os.getenv("INTERNAL_API_TOKEN", "")
+INTERNAL_API_TOKEN_HEADER = os.getenv("INTERNAL_API_TOKEN_HEADER", "X-Internal-Token")
+
+# Job de compensaciones Keycloak
+KC_COMPENSATION_CONCURRENCY = _env_int("KC_COMPENSATION_CONCURRENCY", 5)
+KC_COMPENSATION_TIME_BUDGET_SEC = _env_float("KC_COMPENSATION_TIME_BUDGET_SEC", 120.0)
+KC_COMPENSATION_LEASE_SEC = _env_int("KC_COMPENSATION_LEASE_SEC", 300)
+KC_COMPENSATION_INTERVAL_SEC = _env_int("KC_COMPENSATION_INTERVAL_SEC", 900)
+# Scheduler embebido en la API; apagarlo cuando corre el worker dedicado (python -m app.workers).
+SCHEDULER_ENABLED = _env_bool("SCHEDULER_ENABLED", True)
+# LISTEN/NOTIFY: procesar tasks nuevas en segundos sin acortar el intervalo de poll.
+KC_COMPENSATION_LISTEN = _env_bool("KC_COMPENSATION_LISTEN", True)
+KC_COMPENSATION_NOTIFY_DEBOUNCE_SEC = _env_float("KC_COMPENSATION_NOTIFY_DEBOUNCE_SEC", 1.0)
+# Retención: las tasks done se mueven a kc_compensation_tasks_archive tras KC_TASK_RETENTION_DAYS.
+KC_TASK_RETENTION_DAYS = _env_int("KC_TASK_RETENTION_DAYS", 7)
+KC_TASK_ARCHIVE_BATCH_SIZE = _env_int("KC_TASK_ARCHIVE_BATCH_SIZE", 1000)
+KC_TASK_ARCHIVE_INTERVAL_SEC = _env_int("KC_TASK_ARCHIVE_INTERVAL_SEC", 3600)
+
+# Logging
+# Cola acotada + hilo escritor: el request solo encola el record.
+LOG_ASYNC = _env_bool("LOG_ASYNC", False)
+LOG_QUEUE_SIZE = _env_int("LOG_QUEUE_SIZE", 10000)
+# drop: con la cola llena se descartan INFO/DEBUG (WARNING+ siempre espera); block: siempre espera.
+LOG_QUEUE_FULL_POLICY = os.getenv("LOG_QUEUE_FULL_POLICY", "drop")
+# Formatter JSON rápido (orjson si está instalado, timestamp desde el record).
+LOG_FORMAT_FAST = _env_bool("LOG_FORMAT_FAST", False)
+# Se agrega como campo "service" en cada línea de log si está definido.
+SERVICE_NAME = os.getenv("SERVICE_NAME")
+# Muestreo de eventos INFO/DEBUG por nombre ("evento=0.01,otro=0.1"); WARNING+ siempre se emite.
+LOG_SAMPLING_ENABLED = _env_bool("LOG_SAMPLING_ENABLED", False)
+LOG_SAMPLING_DEFAULT_RATE = _env_float("LOG_SAMPLING_DEFAULT_RATE", 1.0)
+LOG_SAMPLING_RATES = os.getenv("LOG_SAMPLING_RATES", "")
+# Records muestreados que se retienen por request para emitirlos si el request falla.
+LOG_TRAIL_MAX_RECORDS = _env_int("LOG_TRAIL_MAX_RECORDS", 200)
+
+# Métricas Prometheus (/metrics)
+METRICS_ENABLED = _env_bool("METRICS_ENABLED", True)
+# Cache del conteo de la cola de compensaciones entre scrapes.
+METRICS_BACKLOG_CACHE_SEC = _env_float("METRICS_BACKLOG_CACHE_SEC", 15.0)
+
+# Tracing OpenTelemetry (requiere el extra `tracing`)
+TRACING_ENABLED = _env_bool("TRACING_ENABLED", False)
+# console | file | otlp (otlp requiere opentelemetry-exporter-otlp-proto-http)
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "console")
+TRACING_FILE = os.getenv("TRACING_FILE", "traces.jsonl")
@@ -0,0 +1,19 @@
+from app.core.exceptions.base import BaseError
+
+class IdempotencyKeyMismatchError(BaseError):
+    def __init__(self, *, key: str):
+        super().__init__(
+            message="Idempotency-Key was already used with a different request body",
+            code="IDEMPOTENCY_KEY_MISMATCH",
+            status_code=422,
+            context={"idempotency_key": key},
+        )
+
+class IdempotencyKeyInProgressError(BaseError):
+    def __init__(self, *, key: str):
+        super().__init__(
+            message="A request with this Idempotency-Key is still in progress",
+            code="IDEMPOTENCY_KEY_IN_PROGRESS",
+            status_code=409,
+            context={"idempotency_key": key},
+        )
@@ -28,4 +28,13 @@ class KeycloakDeleteAccountError(BaseError):
             status_code=502,
             context={"detail": detail, "user_id": user_id},
             cause=cause,
-        )
\ No newline at end of file
+        )
+
+class KeycloakUnavailableError(BaseError):
+    def __init__(self, *, reason: str, retry_after_sec: float | None = None):
+        super().__init__(
+            message="Identity provider temporarily unavailable",
+            code="IDENTITY_PROVIDER_UNAVAILABLE",
+            status_code=503,
+            context={"reason": reason, "retry_after_sec": retry_after_sec},
+        )
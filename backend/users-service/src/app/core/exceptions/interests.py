@@ -0,0 +1,22 @@
+from app.core.exceptions.base import BaseError
+
+class InvalidInterestLocationError(BaseError):
+    def __init__(self, *, kind: str, location_id: str, city_id: str | None = None):
+        context = {"kind": kind, "id": location_id}
+        if city_id is not None:
+            context["city_id"] = city_id
+        super().__init__(
+            message=f"Invalid {kind} for interests",
+            code="INVALID_INTEREST_LOCATION",
+            status_code=422,
+            context=context,
+        )
+
+class InterestRankConflictError(BaseError):
+    def __init__(self, *, account_id: str):
+        super().__init__(
+            message="Conflicting neighborhood ranks for interests",
+            code="INTEREST_RANK_CONFLICT",
+            status_code=409,
+            context={"account_id": account_id},
+        )
@@ -0,0 +1,19 @@
+from app.core.exceptions.base import BaseError
+
+class LocationNotFoundError(BaseError):
+    def __init__(self, *, kind: str, location_id: str):
+        super().__init__(
+            message=f"{kind.capitalize()} not found",
+            code="LOCATION_NOT_FOUND",
+            status_code=404,
+            context={"kind": kind, "id": location_id},
+        )
+
+class LocationCatalogUnavailableError(BaseError):
+    def __init__(self):
+        super().__init__(
+            message="Location catalog not loaded yet",
+            code="LOCATION_CATALOG_UNAVAILABLE",
+            status_code=503,
+            context={"retry_after_sec": 5},
+        )
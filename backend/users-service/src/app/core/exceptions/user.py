@@ -7,4 +7,28 @@ class EmailAlreadyRegisteredError(BaseError):
             code="EMAIL_ALREADY_REGISTERED",
             status_code=409,
             context={"email": email},
-        )
\ No newline at end of file
+        )
+class AccountNotFoundError(BaseError):
+    def __init__(self, *, account_id: str):
+        super().__init__(
+            message="Account not found",
+            code="ACCOUNT_NOT_FOUND",
+            status_code=404,
+            context={"account_id": account_id},
+        )
+
+class NotAuthenticatedError(BaseError):
+    def __init__(self):
+        super().__init__(
+            message="Not authenticated",
+            code="NOT_AUTHENTICATED",
+            status_code=401,
+        )
+
+class ForbiddenError(BaseError):
+    def __init__(self):
+        super().__init__(
+            message="Forbidden",
+            code="FORBIDDEN",
+            status_code=403,
+        )
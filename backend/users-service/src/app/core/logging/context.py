@@ -1,4 +1,19 @@
 from contextvars import ContextVar
 
+try:
+    from opentelemetry import trace as _otel_trace
+except ImportError:  # extra opcional: uv sync --extra tracing
+    _otel_trace = None
+
 request_id_ctx: ContextVar[str | None] = ContextVar("request_id", default=None)
-user_id_ctx: ContextVar[str | None] = ContextVar("user_id", default=None)
\ No newline at end of file
+user_id_ctx: ContextVar[str | None] = ContextVar("user_id", default=None)
+
+
+def current_trace_id() -> str | None:
+    """
+    trace id (hex) del span activo, o None sin tracing / fuera de un span.
+    """
+    if _otel_trace is None:
+        return None
+    span_context = _otel_trace.get_current_span().get_span_context()
+    return format(span_context.trace_id, "032x") if span_context.is_valid else None
@@ -1,24 +1,113 @@
 # app/core/logging/formatters.py
 import json
 import logging
-from datetime import datetime
-from app.core.logging.context import request_id_ctx, user_id_ctx
+import time
+from datetime import date, datetime
+from enum import Enum
+from typing import Any
+from app.core.logging.context import current_trace_id, request_id_ctx, user_id_ctx
+
+try:
+    import orjson
+except ImportError:  # extra opcional: uv sync --extra fast-logging
+    orjson = None
+
+
+def _json_default(value: Any) -> Any:
+    """
+    Serializa lo que json/orjson no conocen (excepciones en extra, UUID, enums...) en vez de fallar.
+    """
+    if isinstance(value, BaseException):
+        return f"{type(value).__name__}: {value}"
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    return str(value)
+
 
 class JsonLogFormatter(logging.Formatter):
+    def __init__(self, static_fields: dict[str, Any] | None = None):
+        super().__init__()
+        self.static_fields = dict(static_fields or {})
+
     def format(self, record: logging.LogRecord) -> str:
         log = {
             "timestamp": datetime.utcnow().isoformat(),
+            **self.static_fields,
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
-            "request_id": request_id_ctx.get(),
-            "user_id": user_id_ctx.get(),
+            # Si el record pasó por BoundedQueueHandler el contexto ya viene capturado en él.
+            "request_id": record.request_id if hasattr(record, "request_id") else request_id_ctx.get(),
+            "user_id": record.user_id if hasattr(record, "user_id") else user_id_ctx.get(),
         }
 
+        trace_id = record.trace_id if hasattr(record, "trace_id") else current_trace_id()
+        if trace_id:
+            log["trace_id"] = trace_id
+
         if record.exc_info:
             log["exception"] = self.formatException(record.exc_info)
 
         if hasattr(record, "extra"):
             log.update(record.extra)
 
-        return json.dumps(log, ensure_ascii=False)
+        return json.dumps(log, ensure_ascii=False, default=_json_default)
+
+
+class FastJsonLogFormatter(JsonLogFormatter):
+    """
+    Misma salida que JsonLogFormatter, más barata por record: orjson si está instalado,
+    timestamp desde record.created (con el prefijo por segundo cacheado), campos fijos
+    por (logger, level) precalculados y traceback formateado una sola vez (record.exc_text).
+    """
+
+    def __init__(self, static_fields: dict[str, Any] | None = None):
+        super().__init__(static_fields)
+        self._base_fields: dict[tuple[str, str], dict[str, Any]] = {}
+        self._second_prefix: tuple[int, str] = (-1, "")
+
+    def _timestamp(self, created: float) -> str:
+        second = int(created)
+        cached_second, prefix = self._second_prefix
+        if second != cached_second:
+            prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+            self._second_prefix = (second, prefix)
+        return f"{prefix}.{int((created - second) * 1_000_000):06d}"
+
+    def _base(self, record: logging.LogRecord) -> dict[str, Any]:
+        key = (record.name, record.levelname)
+        base = self._base_fields.get(key)
+        if base is None:
+            base = {**self.static_fields, "level": record.levelname, "logger": record.name}
+            self._base_fields[key] = base
+        return base
+
+    def format(self, record: logging.LogRecord) -> str:
+        log = {
+            "timestamp": self._timestamp(record.created),
+            **self._base(record),
+            "message": record.getMessage(),
+            "request_id": record.request_id if hasattr(record, "request_id") else request_id_ctx.get(),
+            "user_id": record.user_id if hasattr(record, "user_id") else user_id_ctx.get(),
+        }
+
+        trace_id = record.trace_id if hasattr(record, "trace_id") else current_trace_id()
+        if trace_id:
+            log["trace_id"] = trace_id
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            log["exception"] = record.exc_text
+
+        extra = getattr(record, "extra", None)
+        if extra:
+            log.update(extra)
+
+        if orjson is not None:
+            return orjson.dumps(log, default=_json_default, option=orjson.OPT_NON_STR_KEYS).decode()
+        return json.dumps(log, ensure_ascii=False, default=_json_default)
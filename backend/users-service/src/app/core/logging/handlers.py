@@ -0,0 +1,54 @@
+# app/core/logging/handlers.py
+import logging
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+from app.core.logging.context import current_trace_id, request_id_ctx, user_id_ctx
+
+QUEUE_FULL_POLICIES = ("drop", "block")
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Encola el LogRecord sin formatear; el QueueListener lo formatea y escribe en su hilo.
+    request_id/user_id/trace_id se capturan aquí porque los ContextVar no cruzan al hilo del listener.
+
+    Con la cola llena, policy="drop" descarta INFO/DEBUG (y los cuenta en `dropped`);
+    WARNING o superior siempre espera lugar, igual que policy="block".
+    """
+
+    def __init__(self, log_queue: queue.Queue, policy: str = "drop"):
+        if policy not in QUEUE_FULL_POLICIES:
+            raise ValueError(f"policy must be one of {QUEUE_FULL_POLICIES}, got {policy!r}")
+        super().__init__(log_queue)
+        self.policy = policy
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # La cola es en proceso: no hace falta pre-formatear ni descartar exc_info como en la stdlib.
+        record.request_id = request_id_ctx.get()
+        record.user_id = user_id_ctx.get()
+        record.trace_id = current_trace_id()
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.policy == "block" or record.levelno >= logging.WARNING:
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+
+class DrainingQueueListener(QueueListener):
+    """
+    QueueListener para colas acotadas: el centinela de stop() espera lugar en vez de
+    fallar con queue.Full, así lo ya encolado se escribe antes de salir.
+    """
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
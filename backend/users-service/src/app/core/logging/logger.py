@@ -1,15 +1,29 @@
 # app/core/logging/logger.py
+import atexit
 import logging
 import logging.config
-from app.core.logging.formatter import JsonLogFormatter
+import queue
+from app.core import config
+from app.core.logging.formatter import FastJsonLogFormatter, JsonLogFormatter
+from app.core.logging.handlers import BoundedQueueHandler, DrainingQueueListener
+from app.core.logging.sampling import SamplingFilter, parse_rates
 
-def setup_logging(level: str = "INFO") -> None:
+_listener: DrainingQueueListener | None = None
+_queue_handler: BoundedQueueHandler | None = None
+
+
+def setup_logging(level: str = "INFO", *, use_queue: bool | None = None) -> None:
+    """
+    Configura el root logger en JSON. Con LOG_ASYNC (o use_queue=True) los handlers
+    se mueven detrás de una cola acotada y escriben desde un hilo en segundo plano.
+    """
     logging_config = {
         "version": 1,
         "disable_existing_loggers": False,
         "formatters": {
             "json": {
-                "()": JsonLogFormatter,
+                "()": FastJsonLogFormatter if config.LOG_FORMAT_FAST else JsonLogFormatter,
+                "static_fields": {"service": config.SERVICE_NAME} if config.SERVICE_NAME else None,
             }
         },
         "handlers": {
@@ -24,7 +38,58 @@ def setup_logging(level: str = "INFO") -> None:
         },
     }
 
+    shutdown_logging()
     logging.config.dictConfig(logging_config)
 
+    if config.LOG_ASYNC if use_queue is None else use_queue:
+        _start_queue_logging()
+
+    if config.LOG_SAMPLING_ENABLED:
+        # En los handlers del root (no del logger): ahí pasan también los records propagados,
+        # y en modo cola se decide antes de encolar, en el hilo que tiene el contexto del request.
+        sampling = SamplingFilter(parse_rates(config.LOG_SAMPLING_RATES), config.LOG_SAMPLING_DEFAULT_RATE)
+        for handler in logging.getLogger().handlers:
+            handler.addFilter(sampling)
+
+
+def _start_queue_logging() -> None:
+    global _listener, _queue_handler
+
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+    log_queue: queue.Queue = queue.Queue(maxsize=config.LOG_QUEUE_SIZE)
+
+    _queue_handler = BoundedQueueHandler(log_queue, policy=config.LOG_QUEUE_FULL_POLICY)
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+
+    _listener = DrainingQueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """
+    Detiene el listener vaciando la cola (lo pendiente se escribe antes de salir).
+    """
+    global _listener, _queue_handler
+
+    if _listener is not None:
+        _listener.stop()
+        root = logging.getLogger()
+        root.removeHandler(_queue_handler)
+        for handler in _listener.handlers:
+            root.addHandler(handler)
+        _listener = None
+        _queue_handler = None
+
+
+def dropped_log_records() -> int:
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+atexit.register(shutdown_logging)
+
+
 def get_logger(name: str) -> logging.Logger:
     return logging.getLogger(name)
@@ -0,0 +1,96 @@
+# app/core/logging/sampling.py
+import logging
+import random
+import zlib
+from collections import deque
+from contextvars import ContextVar, Token
+
+from app.core.logging.context import request_id_ctx
+
+
+def parse_rates(spec: str | None) -> dict[str, float]:
+    """
+    "evento=0.01,otro_evento=0.1" -> {"evento": 0.01, "otro_evento": 0.1}
+    """
+    rates: dict[str, float] = {}
+    for item in (spec or "").split(","):
+        if not item.strip():
+            continue
+        name, _, rate = item.partition("=")
+        rates[name.strip()] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+class RequestTrail:
+    """
+    Records descartados por el muestreo durante un request; se emiten solo si el request falla.
+    """
+
+    def __init__(self, max_records: int):
+        self.records: deque[logging.LogRecord] = deque(maxlen=max_records)
+        self.failed = False
+
+
+_trail_ctx: ContextVar[RequestTrail | None] = ContextVar("log_request_trail", default=None)
+
+
+def start_request_trail(max_records: int) -> Token:
+    return _trail_ctx.set(RequestTrail(max_records))
+
+
+def finish_request_trail(token: Token, *, failed: bool) -> None:
+    """
+    Cierra el trail del request: si falló (o logueó ERROR) emite lo que el muestreo había retenido.
+    """
+    trail = _trail_ctx.get()
+    _trail_ctx.reset(token)
+    if trail is None or not (failed or trail.failed):
+        return
+
+    handlers = logging.getLogger().handlers
+    for record in trail.records:
+        record.sampling_flushed = True
+        for handler in handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Muestrea records por nombre de evento (el mensaje) según `rates`; el resto usa `default_rate`.
+    WARNING o superior siempre pasa. Con request_id la decisión es determinística por request,
+    así un request muestreado conserva su traza completa. Lo descartado dentro de un request
+    queda en su RequestTrail por si el request termina en error.
+    """
+
+    def __init__(self, rates: dict[str, float] | None = None, default_rate: float = 1.0):
+        super().__init__()
+        self.rates = dict(rates or {})
+        self.default_rate = default_rate
+
+    def _keep(self, rate: float, request_id: str | None) -> bool:
+        if rate >= 1.0:
+            return True
+        if rate <= 0.0:
+            return False
+        if request_id is not None:
+            return zlib.crc32(request_id.encode()) / 0xFFFFFFFF < rate
+        return random.random() < rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "sampling_flushed", False):
+            return True
+
+        trail = _trail_ctx.get()
+        if record.levelno >= logging.WARNING:
+            if trail is not None and record.levelno >= logging.ERROR:
+                trail.failed = True
+            return True
+
+        event = record.msg if isinstance(record.msg, str) else ""
+        if self._keep(self.rates.get(event, self.default_rate), request_id_ctx.get()):
+            return True
+
+        if trail is not None:
+            trail.records.append(record)
+        return False
@@ -0,0 +1,106 @@
+# app/core/metrics.py
+import time
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# Buckets (segundos) para latencias de requests y llamadas externas.
+LATENCY_BUCKETS_SEC = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Latencia de requests HTTP por ruta (template, no path concreto).",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS_SEC,
+)
+REGISTER_STAGE_SECONDS = Histogram(
+    "account_register_stage_duration_seconds",
+    "Latencia por etapa del registro de cuentas.",
+    ["stage"],
+    buckets=LATENCY_BUCKETS_SEC,
+)
+KEYCLOAK_CALL_SECONDS = Histogram(
+    "keycloak_admin_call_duration_seconds",
+    "Latencia de llamadas al admin API de Keycloak.",
+    ["operation"],
+    buckets=LATENCY_BUCKETS_SEC,
+)
+KEYCLOAK_CALL_ERRORS = Counter(
+    "keycloak_admin_call_errors_total",
+    "Llamadas al admin API de Keycloak que fallaron, por clase de excepción.",
+    ["operation", "error"],
+)
+KEYCLOAK_CALLS_REJECTED = Counter(
+    "keycloak_admin_calls_rejected_total",
+    "Llamadas a Keycloak rechazadas sin salir del proceso (circuit_open, bulkhead_full).",
+    ["operation", "reason"],
+)
+KEYCLOAK_CIRCUIT_STATE = Gauge(
+    "keycloak_circuit_state",
+    "Estado del circuit breaker de Keycloak: 0 closed, 1 open, 2 half_open.",
+)
+LOCATION_CATALOG_VERSION = Gauge(
+    "location_catalog_version",
+    "Versión del catálogo de ubicaciones cargado en memoria (sube con cada cambio de contenido).",
+)
+IDEMPOTENCY_REQUESTS = Counter(
+    "idempotency_requests_total",
+    "Requests con Idempotency-Key por resultado (executed, replayed, mismatch, in_progress).",
+    ["scope", "outcome"],
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Lecturas de caches en proceso por resultado (hit, miss).",
+    ["cache", "result"],
+)
+CACHE_EVICTIONS = Counter(
+    "cache_evictions_total",
+    "Entradas que salen del cache por motivo (expired, lru, invalidated).",
+    ["cache", "reason"],
+)
+CACHE_ENTRIES = Gauge(
+    "cache_entries",
+    "Entradas vivas en el cache.",
+    ["cache"],
+)
+
+
+class _Timer:
+    """
+    Context manager liviano (sync y async) que observa la duración en un histograma ya etiquetado.
+    Con `error_counter`, cuenta además la excepción por nombre de clase.
+    """
+
+    __slots__ = ("_histogram", "_operation", "_error_counter", "_start")
+
+    def __init__(self, histogram, operation: str | None = None, error_counter: Counter | None = None):
+        self._histogram = histogram
+        self._operation = operation
+        self._error_counter = error_counter
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._histogram.observe(time.perf_counter() - self._start)
+        if exc_type is not None and self._error_counter is not None:
+            self._error_counter.labels(self._operation, exc_type.__name__).inc()
+
+
+# Hijos etiquetados cacheados: evita el lookup con lock de labels() en cada observación.
+_stage_children: dict[str, object] = {}
+_keycloak_children: dict[str, object] = {}
+
+
+def stage_timer(stage: str) -> _Timer:
+    child = _stage_children.get(stage)
+    if child is None:
+        child = _stage_children[stage] = REGISTER_STAGE_SECONDS.labels(stage)
+    return _Timer(child)
+
+
+def keycloak_call_timer(operation: str) -> _Timer:
+    child = _keycloak_children.get(operation)
+    if child is None:
+        child = _keycloak_children[operation] = KEYCLOAK_CALL_SECONDS.labels(operation)
+    return _Timer(child, operation, KEYCLOAK_CALL_ERRORS)
@@ -0,0 +1,150 @@
+import asyncio
+import threading
+import time
+from enum import Enum
+
+from app.core.logging.logger import get_logger
+logger = get_logger(__name__)
+
+# Reloj de los timeouts del breaker; los tests lo reemplazan solo en este módulo.
+_clock = time.monotonic
+
+
+class CircuitState(str, Enum):
+    closed = "closed"
+    open = "open"
+    half_open = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker por fallas consecutivas, seguro entre hilos (jobs) y el event loop (requests).
+
+    closed: todo pasa; `failure_threshold` fallas seguidas lo abren.
+    open: se rechaza sin llamar hasta que pasan `open_sec`.
+    half_open: pasan hasta `half_open_probes` llamadas de prueba; un éxito cierra, una falla reabre.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_threshold: int,
+        open_sec: float,
+        half_open_probes: int = 1,
+        on_state_change=None,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.open_sec = open_sec
+        self.half_open_probes = half_open_probes
+        self._on_state_change = on_state_change
+        self._lock = threading.Lock()
+        self._state = CircuitState.closed
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> CircuitState:
+        if self._state is CircuitState.open and _clock() - self._opened_at >= self.open_sec:
+            self._transition(CircuitState.half_open)
+        return self._state
+
+    def _transition(self, state: CircuitState) -> None:
+        previous = self._state
+        self._state = state
+        self._probes = 0
+        if state is CircuitState.open:
+            self._opened_at = _clock()
+        if state is CircuitState.closed:
+            self._failures = 0
+        log = logger.warning if state is CircuitState.open else logger.info
+        log("circuit_state_changed", extra={"extra": {"circuit": self.name, "from": previous.value, "to": state.value}})
+        if self._on_state_change is not None:
+            self._on_state_change(state)
+
+    def is_open(self) -> bool:
+        return self.state is CircuitState.open
+
+    def retry_after_sec(self) -> float:
+        with self._lock:
+            if self._current_state() is not CircuitState.open:
+                return 0.0
+            return max(0.0, self.open_sec - (_clock() - self._opened_at))
+
+    def allow(self) -> bool:
+        """
+        Pide permiso para una llamada. Todo permiso concedido termina en record_success,
+        record_failure o release.
+        """
+        with self._lock:
+            state = self._current_state()
+            if state is CircuitState.closed:
+                return True
+            if state is CircuitState.half_open and self._probes < self.half_open_probes:
+                self._probes += 1
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state is CircuitState.half_open:
+                self._transition(CircuitState.closed)
+            elif self._state is CircuitState.closed:
+                self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            if self._state is CircuitState.half_open:
+                self._transition(CircuitState.open)
+            elif self._state is CircuitState.closed:
+                self._failures += 1
+                if self._failures >= self.failure_threshold:
+                    self._transition(CircuitState.open)
+
+    def release(self) -> None:
+        # Llamada sin resultado (cancelada): devuelve el permiso de prueba sin mover el estado.
+        with self._lock:
+            if self._state is CircuitState.half_open and self._probes > 0:
+                self._probes -= 1
+
+
+class Bulkhead:
+    """
+    Tope de llamadas concurrentes a una dependencia, con espera acotada.
+
+    Hilos y event loop tienen cupos separados (threading vs asyncio), cada uno de `max_concurrent`.
+    """
+
+    def __init__(self, name: str, *, max_concurrent: int, wait_sec: float):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.wait_sec = wait_sec
+        self._semaphore = threading.BoundedSemaphore(max_concurrent)
+        self._a_semaphore: asyncio.Semaphore | None = None
+
+    def acquire(self) -> bool:
+        return self._semaphore.acquire(timeout=self.wait_sec)
+
+    def release(self) -> None:
+        self._semaphore.release()
+
+    async def a_acquire(self) -> bool:
+        if self._a_semaphore is None:
+            self._a_semaphore = asyncio.Semaphore(self.max_concurrent)
+        if not self._a_semaphore.locked():
+            await self._a_semaphore.acquire()
+            return True
+        try:
+            await asyncio.wait_for(self._a_semaphore.acquire(), self.wait_sec)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def a_release(self) -> None:
+        self._a_semaphore.release()
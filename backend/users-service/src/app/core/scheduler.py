@@ -1,13 +1,53 @@
+import asyncio
+import threading
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
+from datetime import datetime
 from fastapi import FastAPI
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 # En v3 los triggers se importan así o se pasan como string
-from app.workers.keycloak_tasks import run_job
+from app.workers.keycloak_tasks import run_archive_job, run_job
+from app.workers.idempotency import run_purge_job
+from app.integrations.keycloak_client import keycloak_provider
+from app.services.location_catalog import location_catalog
+from app.workers.notifications import CompensationTaskListener, supports_listen
+from app.api.deps.db import worker_engine
+from app.core import config
+
+from app.core.logging.logger import get_logger
+logger = get_logger(__name__)
+
+
+def _wake_on_notify(scheduler: AsyncIOScheduler, listener: CompensationTaskListener, stop: threading.Event) -> None:
+    """
+    Hilo que adelanta el job kc_compensation a "ahora" cuando llega un NOTIFY de task nueva.
+    El trigger por intervalo queda como red de seguridad.
+    """
+    while not stop.is_set():
+        if listener.wait(1.0):
+            stop.wait(config.KC_COMPENSATION_NOTIFY_DEBOUNCE_SEC)
+            listener.drain()
+            try:
+                scheduler.modify_job("kc_compensation", next_run_time=datetime.now(scheduler.timezone))
+            except Exception:
+                logger.exception("kc_compensation_wakeup_failed")
+    listener.close()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None]:
+    # El catálogo de ubicaciones es por proceso de API, corra o no el scheduler.
+    if config.LOCATION_CATALOG_ENABLED:
+        await asyncio.to_thread(location_catalog.start)
+
+    # Con SCHEDULER_ENABLED=false las compensaciones las corre el worker dedicado (python -m app.workers)
+    if not config.SCHEDULER_ENABLED:
+        app.state.scheduler = None
+        yield
+        await asyncio.to_thread(location_catalog.stop)
+        await keycloak_provider.aclose()
+        return
+
     # 1. Instanciar el scheduler estable
     scheduler = AsyncIOScheduler()
     app.state.scheduler = scheduler
@@ -17,17 +57,51 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None]:
     scheduler.add_job(
         run_job,
         trigger="interval", 
-        seconds=900,
+        seconds=config.KC_COMPENSATION_INTERVAL_SEC,
         id="kc_compensation",
         max_instances=1,
         coalesce=True,
         misfire_grace_time=60
     )
+    scheduler.add_job(
+        run_archive_job,
+        trigger="interval",
+        seconds=config.KC_TASK_ARCHIVE_INTERVAL_SEC,
+        id="kc_task_archive",
+        max_instances=1,
+        coalesce=True,
+        misfire_grace_time=300
+    )
+    scheduler.add_job(
+        run_purge_job,
+        trigger="interval",
+        seconds=config.IDEMPOTENCY_PURGE_INTERVAL_SEC,
+        id="idempotency_purge",
+        max_instances=1,
+        coalesce=True,
+        misfire_grace_time=300
+    )
 
     # 3. Iniciar
     scheduler.start()
+
+    listener_stop = threading.Event()
+    listener_thread: threading.Thread | None = None
+    if config.KC_COMPENSATION_LISTEN and supports_listen(worker_engine):
+        listener_thread = threading.Thread(
+            target=_wake_on_notify,
+            args=(scheduler, CompensationTaskListener(), listener_stop),
+            name="kc-task-listener",
+            daemon=True,
+        )
+        listener_thread.start()
     
     yield  # Aquí es donde la app corre
     
     # 4. Apagar al cerrar la app
-    scheduler.shutdown()
\ No newline at end of file
+    listener_stop.set()
+    if listener_thread is not None:
+        listener_thread.join(timeout=5)
+    scheduler.shutdown()
+    await asyncio.to_thread(location_catalog.stop)
+    await keycloak_provider.aclose()
\ No newline at end of file
@@ -0,0 +1,163 @@
+# app/core/tracing.py
+import atexit
+from contextlib import nullcontext
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core import config
+
+from app.core.logging.logger import get_logger
+logger = get_logger(__name__)
+
+try:
+    from opentelemetry import trace
+    from opentelemetry.propagate import extract, inject
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    from opentelemetry.trace import Link, SpanKind, Status, StatusCode
+except ImportError:  # extra opcional: uv sync --extra tracing
+    trace = None
+
+_tracer = None
+_provider = None
+
+
+def _exporter():
+    if config.TRACING_EXPORTER == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter()
+    if config.TRACING_EXPORTER == "file":
+        return ConsoleSpanExporter(out=open(config.TRACING_FILE, "a", encoding="utf-8"))
+    return ConsoleSpanExporter()
+
+
+def setup_tracing() -> None:
+    """
+    Con TRACING_ENABLED configura el TracerProvider y el exporter (console, file u otlp).
+    Sin el extra `tracing` instalado queda todo como no-op.
+    """
+    global _tracer, _provider
+
+    if not config.TRACING_ENABLED or _tracer is not None:
+        return
+    if trace is None:
+        logger.warning("tracing_unavailable", extra={"extra": {"reason": "opentelemetry not installed"}})
+        return
+
+    try:
+        exporter = _exporter()
+    except ImportError:
+        # TRACING_EXPORTER=otlp sin opentelemetry-exporter-otlp-proto-http: mismo trato que sin SDK.
+        logger.warning(
+            "tracing_unavailable",
+            extra={"extra": {"reason": "otlp exporter not installed", "exporter": config.TRACING_EXPORTER}},
+        )
+        return
+
+    _provider = TracerProvider(resource=Resource.create({"service.name": config.SERVICE_NAME or "users-service"}))
+    _provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(_provider)
+    _tracer = trace.get_tracer("app")
+    atexit.register(shutdown_tracing)
+    logger.info("tracing_enabled", extra={"extra": {"exporter": config.TRACING_EXPORTER}})
+
+
+def shutdown_tracing() -> None:
+    """Exporta los spans pendientes del batch."""
+    if _provider is not None:
+        _provider.shutdown()
+
+
+def tracing_enabled() -> bool:
+    return _tracer is not None
+
+
+def start_span(
+    name: str,
+    *,
+    kind: str = "internal",
+    attributes: dict[str, Any] | None = None,
+    headers: Any = None,
+    traceparent: str | None = None,
+):
+    """
+    Span como context manager (no-op sin tracing). `headers` continúa una traza entrante
+    (W3C traceparent); `traceparent` se agrega como link a otra traza (p. ej. el request
+    que originó una task de compensación).
+    """
+    if _tracer is None:
+        return nullcontext()
+    links = []
+    if traceparent:
+        linked = trace.get_current_span(extract({"traceparent": traceparent})).get_span_context()
+        if linked.is_valid:
+            links.append(Link(linked))
+    return _tracer.start_as_current_span(
+        name,
+        context=extract(headers) if headers is not None else None,
+        kind=getattr(SpanKind, kind.upper()),
+        attributes=attributes,
+        links=links,
+    )
+
+
+def current_traceparent() -> str | None:
+    """W3C traceparent del span activo, para persistirlo junto a trabajo diferido."""
+    if _tracer is None:
+        return None
+    carrier: dict[str, str] = {}
+    inject(carrier)
+    return carrier.get("traceparent")
+
+
+def mark_span_error(span, exc: BaseException | None = None, description: str | None = None) -> None:
+    if span is None or _tracer is None:
+        return
+    if exc is not None:
+        span.record_exception(exc)
+    span.set_status(Status(StatusCode.ERROR, description or (type(exc).__name__ if exc else None)))
+
+
+def instrument_engine_tracing(engine: Engine | AsyncEngine, name: str) -> None:
+    """
+    Un span CLIENT por sentencia SQL, hijo del span activo (request o job).
+    Los engines se crean al importar, antes de setup_tracing(): por eso se decide con
+    TRACING_ENABLED y cada evento revisa si el tracer ya existe.
+    """
+    if not config.TRACING_ENABLED or trace is None:
+        return
+    sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if _tracer is None:
+            return
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement else "SQL"
+        context._trace_span = _tracer.start_span(
+            f"db.{operation}",
+            kind=SpanKind.CLIENT,
+            attributes={
+                "db.system": sync_engine.dialect.name,
+                "db.statement": statement[:2000],
+                "db.pool": name,
+                "db.executemany": executemany,
+            },
+        )
+
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        span = getattr(context, "_trace_span", None)
+        if span is not None:
+            span.end()
+
+    def _error(exception_context):
+        span = getattr(exception_context.execution_context, "_trace_span", None)
+        if span is not None:
+            mark_span_error(span, exception_context.original_exception)
+            span.end()
+
+    event.listen(sync_engine, "before_cursor_execute", _before)
+    event.listen(sync_engine, "after_cursor_execute", _after)
+    event.listen(sync_engine, "handle_error", _error)
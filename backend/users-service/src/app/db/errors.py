@@ -0,0 +1,35 @@
+import re
+
+# SQLSTATE de Postgres.
+FOREIGN_KEY_VIOLATION = "23503"
+UNIQUE_VIOLATION = "23505"
+
+# "Key (neighborhood_id)=(<uuid>) is not present in table ..."
+_KEY_DETAIL = re.compile(r"Key \((?P<column>[^)]+)\)=\((?P<value>[^)]*)\)")
+
+
+def _driver_error(db_exc: Exception):
+    """
+    psycopg2 expone el detalle en orig.diag; asyncpg deja la excepción original en orig.__cause__.
+    """
+    orig = getattr(db_exc, "orig", None)
+    return getattr(orig, "diag", None) or getattr(orig, "__cause__", None)
+
+def pg_error_details(db_exc: Exception) -> tuple[str | None, str | None, str | None]:
+    """
+    Extrae (pgcode, constraint_name, column_name) de un error de SQLAlchemy.
+    """
+    pgcode = getattr(getattr(db_exc, "orig", None), "pgcode", None)
+    diag = _driver_error(db_exc)
+    return pgcode, getattr(diag, "constraint_name", None), getattr(diag, "column_name", None)
+
+def pg_error_key(db_exc: Exception) -> tuple[str | None, str | None]:
+    """
+    (columna, valor) de la clave que violó una FK o unique, según el detalle del error.
+    """
+    diag = _driver_error(db_exc)
+    detail = getattr(diag, "message_detail", None) or getattr(diag, "detail", None) or ""
+    match = _KEY_DETAIL.search(detail)
+    if match is None:
+        return None, None
+    return match["column"], match["value"]
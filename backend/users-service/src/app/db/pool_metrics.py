@@ -0,0 +1,138 @@
+import time
+import threading
+from typing import Any, Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+# Buckets (segundos) del histograma de espera por una conexión del pool.
+WAIT_BUCKETS_SEC = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class PoolMetrics:
+    """
+    Contadores de un pool de conexiones: checkouts, conexiones nuevas,
+    invalidaciones e histograma del tiempo de espera en el checkout.
+    """
+
+    def __init__(self, name: str, pool: Pool):
+        self.name = name
+        self.pool = pool
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.soft_invalidations = 0
+        self.wait_bucket_counts = [0] * (len(WAIT_BUCKETS_SEC) + 1)
+        self.wait_sum_sec = 0.0
+        self.wait_count = 0
+
+    def incr(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def observe_wait(self, seconds: float) -> None:
+        idx = len(WAIT_BUCKETS_SEC)
+        for i, bound in enumerate(WAIT_BUCKETS_SEC):
+            if seconds <= bound:
+                idx = i
+                break
+        with self._lock:
+            self.wait_bucket_counts[idx] += 1
+            self.wait_sum_sec += seconds
+            self.wait_count += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        pool = self.pool
+        with self._lock:
+            data: Dict[str, Any] = {
+                "pool": self.name,
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "soft_invalidations": self.soft_invalidations,
+                "wait_count": self.wait_count,
+                "wait_sum_sec": self.wait_sum_sec,
+                "wait_buckets": dict(zip([*map(str, WAIT_BUCKETS_SEC), "+Inf"], self.wait_bucket_counts)),
+            }
+        if isinstance(pool, QueuePool):
+            data.update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                checked_in=pool.checkedin(),
+                overflow=max(0, pool.overflow()),
+            )
+        return data
+
+
+class _TimedCheckoutMixin:
+    """
+    Mide cuánto espera un checkout por una conexión (incluye abrir una nueva en overflow).
+    SQLAlchemy no emite un evento previo al checkout, por eso se envuelve _do_get.
+    """
+
+    _metrics: PoolMetrics | None = None
+
+    def _do_get(self):
+        metrics = self._metrics
+        if metrics is None:
+            return super()._do_get()
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.observe_wait(time.perf_counter() - start)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool._metrics = self._metrics
+        if self._metrics is not None:
+            self._metrics.pool = pool
+        return pool
+
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+_registry: Dict[str, PoolMetrics] = {}
+
+
+def instrument_engine(engine: Engine | AsyncEngine, name: str) -> PoolMetrics:
+    """
+    Registra hooks de eventos sobre el pool del engine y lo publica bajo `name`.
+    """
+    pool = engine.sync_engine.pool if isinstance(engine, AsyncEngine) else engine.pool
+    metrics = PoolMetrics(name, pool)
+    if isinstance(pool, _TimedCheckoutMixin):
+        pool._metrics = metrics
+
+    def _on_connect(dbapi_conn, record):
+        metrics.incr("connects")
+
+    def _on_checkout(dbapi_conn, record, proxy):
+        metrics.incr("checkouts")
+
+    def _on_invalidate(dbapi_conn, record, exc):
+        metrics.incr("invalidations")
+
+    def _on_soft_invalidate(dbapi_conn, record, exc):
+        metrics.incr("soft_invalidations")
+
+    event.listen(pool, "connect", _on_connect)
+    event.listen(pool, "checkout", _on_checkout)
+    event.listen(pool, "invalidate", _on_invalidate)
+    event.listen(pool, "soft_invalidate", _on_soft_invalidate)
+
+    _registry[name] = metrics
+    return metrics
+
+
+def pool_stats() -> list[Dict[str, Any]]:
+    return [metrics.snapshot() for metrics in _registry.values()]
@@ -1,27 +1,297 @@
 import os
 import uuid
+import asyncio
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime, timezone
 from dotenv import load_dotenv
 from typing import Dict, Any, Optional
-from keycloak import KeycloakAdmin
-from keycloak.exceptions import KeycloakGetError
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from keycloak import KeycloakAdmin, KeycloakOpenIDConnection
+from keycloak.exceptions import KeycloakConnectionError, KeycloakGetError, KeycloakDeleteError, KeycloakPostError
+
+from app.core import config
+from app.core.metrics import KEYCLOAK_CALLS_REJECTED, KEYCLOAK_CIRCUIT_STATE, keycloak_call_timer
+from app.core.resilience import Bulkhead, CircuitBreaker, CircuitState
+from app.core.tracing import start_span
 
 from app.core.exceptions.integrations import(
     KeycloakRegisterError,
     KeycloakSetPasswordError,
-    KeycloakDeleteAccountError
+    KeycloakDeleteAccountError,
+    KeycloakUnavailableError
 )
 
+from app.core.logging.logger import get_logger
+logger = get_logger(__name__)
+
 load_dotenv()
 
+# Códigos con los que un servidor rechaza "credentials" dentro de la representación del usuario.
+INLINE_CREDENTIALS_REJECTED_CODES = (400, 501)
+# Solo 501 dice que el servidor no lo implementa; un 400 puede ser por ese request en particular.
+INLINE_CREDENTIALS_UNSUPPORTED_CODE = 501
+_inline_credentials_lock = threading.Lock()
+# Espera entre intentos del lock de renovación de token desde el camino async.
+REFRESH_LOCK_POLL_SEC = 0.01
+
+
+_CIRCUIT_STATE_VALUES = {CircuitState.closed: 0, CircuitState.open: 1, CircuitState.half_open: 2}
+
+# Compartidos por el cliente sync (jobs) y el async (requests) del proceso.
+keycloak_breaker = CircuitBreaker(
+    "keycloak",
+    failure_threshold=config.KC_BREAKER_FAILURE_THRESHOLD,
+    open_sec=config.KC_BREAKER_OPEN_SEC,
+    half_open_probes=config.KC_BREAKER_HALF_OPEN_PROBES,
+    on_state_change=lambda state: KEYCLOAK_CIRCUIT_STATE.set(_CIRCUIT_STATE_VALUES[state]),
+)
+keycloak_bulkhead = Bulkhead(
+    "keycloak",
+    max_concurrent=config.KC_BULKHEAD_MAX_CONCURRENT,
+    wait_sec=config.KC_BULKHEAD_WAIT_SEC,
+)
+
+
+def keycloak_circuit_open() -> bool:
+    return config.KC_BREAKER_ENABLED and keycloak_breaker.is_open()
+
+
+def ensure_keycloak_available() -> None:
+    """
+    Falla rápido (503) con el circuito abierto, antes de hacer trabajo que después habría que deshacer.
+    """
+    if keycloak_circuit_open():
+        raise KeycloakUnavailableError(reason="circuit_open", retry_after_sec=keycloak_breaker.retry_after_sec())
+
+
+def _is_unavailability_error(exc: BaseException) -> bool:
+    """
+    Fallas que cuentan para el breaker: 5xx/429, timeouts y errores de conexión.
+    Un 4xx (409, política de password, 404) significa que Keycloak respondió bien.
+    """
+    code = getattr(exc, "response_code", None)
+    if code is not None:
+        return code >= 500 or code == 429
+    return isinstance(exc, (KeycloakConnectionError, httpx.TransportError, requests.RequestException, TimeoutError, ConnectionError))
+
+
+def _admit(operation: str) -> None:
+    if not keycloak_breaker.allow():
+        KEYCLOAK_CALLS_REJECTED.labels(operation, "circuit_open").inc()
+        raise KeycloakUnavailableError(reason="circuit_open", retry_after_sec=keycloak_breaker.retry_after_sec())
+
+
+def _record(exc: BaseException | None) -> None:
+    if exc is None:
+        keycloak_breaker.record_success()
+    elif not isinstance(exc, Exception):
+        keycloak_breaker.release()  # cancelada: no dice nada de la salud de Keycloak
+    elif _is_unavailability_error(exc):
+        keycloak_breaker.record_failure()
+    else:
+        keycloak_breaker.record_success()
+
+
+def _bulkhead_full(operation: str) -> KeycloakUnavailableError:
+    KEYCLOAK_CALLS_REJECTED.labels(operation, "bulkhead_full").inc()
+    return KeycloakUnavailableError(reason="bulkhead_full")
+
+
+@contextmanager
+def _traced_call(operation: str):
+    """
+    Span CLIENT + métricas de latencia/errores alrededor de una llamada al admin API.
+    """
+    with start_span(f"keycloak.{operation}", kind="client", attributes={"keycloak.operation": operation}):
+        with keycloak_call_timer(operation):
+            yield
+
+
+@contextmanager
+def _kc_call(operation: str):
+    """
+    Llamada sync: bulkhead (espera acotada) + circuit breaker + span y métricas.
+    """
+    if not config.KC_BREAKER_ENABLED:
+        with _traced_call(operation):
+            yield
+        return
+    if not keycloak_bulkhead.acquire():
+        raise _bulkhead_full(operation)
+    try:
+        _admit(operation)
+        try:
+            with _traced_call(operation):
+                yield
+        except BaseException as exc:
+            _record(exc)
+            raise
+        _record(None)
+    finally:
+        keycloak_bulkhead.release()
+
+
+@asynccontextmanager
+async def _a_kc_call(operation: str):
+    """
+    Variante async de _kc_call: el cupo del bulkhead se espera sin bloquear el event loop.
+    """
+    if not config.KC_BREAKER_ENABLED:
+        with _traced_call(operation):
+            yield
+        return
+    if not await keycloak_bulkhead.a_acquire():
+        raise _bulkhead_full(operation)
+    try:
+        _admit(operation)
+        try:
+            with _traced_call(operation):
+                yield
+        except BaseException as exc:
+            _record(exc)
+            raise
+        _record(None)
+    finally:
+        keycloak_bulkhead.a_release()
+
+
+def _user_payload(email: str, password: str | None = None) -> Dict[str, Any]:
+    user_data: Dict[str, Any] = {
+        "email": email,
+        "username": email,
+        "enabled": True
+    }
+    if password is not None:
+        user_data["credentials"] = [{"type": "password", "value": password, "temporary": False}]
+    return user_data
+
+
+def _is_password_policy_error(e: KeycloakPostError) -> bool:
+    body = e.response_body or b""
+    if isinstance(body, str):
+        body = body.encode()
+    return b"invalidPassword" in body
+
+def _disable_inline_credentials(integration) -> None:
+    """
+    El servidor respondió 501 a credenciales embebidas: se deja de intentarlas en esta
+    integración (create + set_password de ahí en más). Se loguea una sola vez.
+    """
+    with _inline_credentials_lock:
+        if not integration.inline_credentials:
+            return
+        integration.inline_credentials = False
+    logger.warning(
+        "kc_inline_credentials_disabled",
+        extra={"extra": {"status_code": INLINE_CREDENTIALS_UNSUPPORTED_CODE}},
+    )
+
+
+class PooledOpenIDConnection(KeycloakOpenIDConnection):
+    """
+    Conexión admin con un pool HTTP dimensionado y renovación de token serializada.
+
+    Varios hilos o corrutinas pueden detectar el token vencido (o un 401) a la vez; solo uno
+    hace el intercambio contra Keycloak y el resto reutiliza el token nuevo. El camino sync y
+    el async comparten el mismo lock de hilo.
+    """
+
+    def __init__(self, *args, pool_connections: int, pool_maxsize: int, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.token_refreshes = 0
+        self.token_refresh_failures = 0
+        self._refresh_lock = threading.Lock()
+
+        # Reemplaza los adapters por defecto (pool de 10) conservando la política de reintentos.
+        for protocol in ("https://", "http://"):
+            retries = self._s.get_adapter(protocol).max_retries
+            self._s.mount(
+                protocol,
+                HTTPAdapter(
+                    pool_connections=pool_connections,
+                    pool_maxsize=pool_maxsize,
+                    max_retries=retries,
+                ),
+            )
+
+        # Cliente async con el mismo tamaño de pool; reemplaza al que crea la librería, que
+        # nunca abrió conexiones y se cierra en aclose() (acá no hay loop).
+        self._replaced_async_s = self.async_s
+        limits = httpx.Limits(max_connections=pool_maxsize, max_keepalive_connections=pool_maxsize)
+        self.async_s = httpx.AsyncClient(
+            verify=self.verify,
+            cert=self.cert,
+            limits=limits,
+            transport=httpx.AsyncHTTPTransport(
+                retries=1, verify=self.verify, cert=self.cert, limits=limits
+            ),
+        )
+        self.async_s.auth = None
+
+    def refresh_token(self) -> None:
+        seen_expires_at = self.expires_at
+        with self._refresh_lock:
+            if self.token is not None and self.expires_at != seen_expires_at:
+                return  # otro hilo ya lo renovó mientras esperábamos el lock
+            try:
+                super().refresh_token()
+            except Exception:
+                self.token_refresh_failures += 1
+                raise
+            self.token_refreshes += 1
+
+    async def a_refresh_token(self) -> None:
+        seen_expires_at = self.expires_at
+        # Mismo lock que el camino sync, sin bloquear el loop: la espera solo ocurre con otra
+        # renovación en curso.
+        while not self._refresh_lock.acquire(blocking=False):
+            await asyncio.sleep(REFRESH_LOCK_POLL_SEC)
+        try:
+            if self.token is not None and self.expires_at != seen_expires_at:
+                return
+            try:
+                await super().a_refresh_token()
+            except Exception:
+                self.token_refresh_failures += 1
+                raise
+            self.token_refreshes += 1
+        finally:
+            self._refresh_lock.release()
+
+    async def aclose(self) -> None:
+        replaced = self._replaced_async_s
+        await replaced.aclose()
+        # La librería le cuelga un transport propio que el cliente no usa.
+        transport = getattr(replaced, "transport", None)
+        if transport is not None:
+            await transport.aclose()
+        await super().aclose()
+
+    def open_connections(self) -> int:
+        total = 0
+        for protocol in ("https://", "http://"):
+            pools = self._s.get_adapter(protocol).poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                total += getattr(pool, "num_connections", 0) if pool else 0
+        return total
+
+
 class KeycloakIntegration:
-    def __init__(self):
-        self.admin = KeycloakAdmin(
+    def __init__(self, admin: KeycloakAdmin | None = None):
+        self.admin = admin or KeycloakAdmin(
             server_url = os.getenv('KEYCLOAK_URL'),
             client_id = os.getenv('KC_CLIENT_ID'),
             realm_name = os.getenv('KC_REALM'),
             client_secret_key = os.getenv('KC_ADMIN_SECRET'),
             verify = True
         )
+        self.inline_credentials = config.KC_INLINE_CREDENTIALS
     
     def create_account_record(
             self, 
@@ -31,15 +301,36 @@ class KeycloakIntegration:
         Crea un usuario en Keycloak y extrae el UUID generado.
         """
         try:
-            user_data: Dict[str, Any] = {
-                "email": email,
-                "username": email,
-                "enabled": True
-            }
+            user_data = _user_payload(email)
             
-            user_id_str: str = self.admin.create_user(user_data)
+            with _kc_call("create_user"):
+                user_id_str: str = self.admin.create_user(user_data)
             
             return uuid.UUID(user_id_str)
+        except KeycloakUnavailableError:
+            raise
+        except Exception as e:
+            raise KeycloakRegisterError(detail=str(e), email=email, cause=e) from e
+
+    def create_account_with_password(self, email: str, password: str) -> Optional[uuid.UUID]:
+        """
+        Crea el usuario con la contraseña embebida en un solo request.
+        Retorna None si el servidor rechaza esa forma; el llamador usa create + set_password.
+        """
+        try:
+            with _kc_call("create_user_with_credentials"):
+                user_id_str: str = self.admin.create_user(_user_payload(email, password))
+            return uuid.UUID(user_id_str)
+        except KeycloakPostError as e:
+            if _is_password_policy_error(e):
+                raise KeycloakSetPasswordError(detail=str(e), cause=e) from e
+            if e.response_code == INLINE_CREDENTIALS_UNSUPPORTED_CODE:
+                _disable_inline_credentials(self)
+            if e.response_code in INLINE_CREDENTIALS_REJECTED_CODES:
+                return None
+            raise KeycloakRegisterError(detail=str(e), email=email, cause=e) from e
+        except KeycloakUnavailableError:
+            raise
         except Exception as e:
             raise KeycloakRegisterError(detail=str(e), email=email, cause=e) from e
 
@@ -49,12 +340,15 @@ class KeycloakIntegration:
         Retorna True si la operación fue exitosa.
         """
         try:
-            self.admin.set_user_password(
-                user_id=str(user_id), 
-                password=password, 
-                temporary=False
-            )
+            with _kc_call("set_user_password"):
+                self.admin.set_user_password(
+                    user_id=str(user_id), 
+                    password=password, 
+                    temporary=False
+                )
             return True
+        except KeycloakUnavailableError:
+            raise
         except Exception as e:
             raise KeycloakSetPasswordError(detail=str(e), user_id=str(user_id), cause=e) from e
 
@@ -63,12 +357,212 @@ class KeycloakIntegration:
         Elimina un usuario (útil para rollback).
         """
         try:
-            self.admin.delete_user(user_id=str(user_id))
+            with _kc_call("delete_user"):
+                self.admin.delete_user(user_id=str(user_id))
+            return True
+        except (KeycloakGetError, KeycloakDeleteError) as e:
+            status = getattr(e, "response_code", None) or getattr(e, "response_status", None)
+            if status == 404:
+                return True
+            raise KeycloakDeleteAccountError(detail=str(e), user_id=str(user_id), cause=e) from e
+        except Exception as e:
+            raise KeycloakDeleteAccountError(detail=str(e), user_id=str(user_id), cause=e) from e
+
+
+class AsyncKeycloakIntegration:
+    """
+    Variante asyncio de KeycloakIntegration sobre el cliente httpx de la conexión.
+
+    Mismo mapeo de errores que la versión síncrona, sin ocupar hilos del threadpool.
+    """
+
+    def __init__(self, admin: KeycloakAdmin):
+        self.admin = admin
+        self.inline_credentials = config.KC_INLINE_CREDENTIALS
+
+    async def create_account_record(self, email: str) -> uuid.UUID:
+        try:
+            async with _a_kc_call("create_user"):
+                user_id_str: str = await self.admin.a_create_user(_user_payload(email))
+            return uuid.UUID(user_id_str)
+        except KeycloakUnavailableError:
+            raise
+        except Exception as e:
+            raise KeycloakRegisterError(detail=str(e), email=email, cause=e) from e
+
+    async def create_account_with_password(self, email: str, password: str) -> Optional[uuid.UUID]:
+        try:
+            async with _a_kc_call("create_user_with_credentials"):
+                user_id_str: str = await self.admin.a_create_user(_user_payload(email, password))
+            return uuid.UUID(user_id_str)
+        except KeycloakPostError as e:
+            if _is_password_policy_error(e):
+                raise KeycloakSetPasswordError(detail=str(e), cause=e) from e
+            if e.response_code == INLINE_CREDENTIALS_UNSUPPORTED_CODE:
+                _disable_inline_credentials(self)
+            if e.response_code in INLINE_CREDENTIALS_REJECTED_CODES:
+                return None
+            raise KeycloakRegisterError(detail=str(e), email=email, cause=e) from e
+        except KeycloakUnavailableError:
+            raise
+        except Exception as e:
+            raise KeycloakRegisterError(detail=str(e), email=email, cause=e) from e
+
+    async def set_password(self, user_id: uuid.UUID, password: str) -> bool:
+        try:
+            async with _a_kc_call("set_user_password"):
+                await self.admin.a_set_user_password(
+                    user_id=str(user_id),
+                    password=password,
+                    temporary=False
+                )
             return True
-        except KeycloakGetError as e:
+        except KeycloakUnavailableError:
+            raise
+        except Exception as e:
+            raise KeycloakSetPasswordError(detail=str(e), user_id=str(user_id), cause=e) from e
+
+    async def delete_account(self, user_id: uuid.UUID) -> bool:
+        try:
+            async with _a_kc_call("delete_user"):
+                await self.admin.a_delete_user(user_id=str(user_id))
+            return True
+        except (KeycloakGetError, KeycloakDeleteError) as e:
             status = getattr(e, "response_code", None) or getattr(e, "response_status", None)
             if status == 404:
                 return True
             raise KeycloakDeleteAccountError(detail=str(e), user_id=str(user_id), cause=e) from e
         except Exception as e:
-            raise KeycloakDeleteAccountError(detail=str(e), user_id=str(user_id), cause=e) from e
\ No newline at end of file
+            raise KeycloakDeleteAccountError(detail=str(e), user_id=str(user_id), cause=e) from e
+
+
+class KeycloakAdminProvider:
+    """
+    Entrega un KeycloakIntegration único por proceso.
+
+    Comparte el pool HTTP y el token admin entre requests y jobs, y renueva el
+    token en un hilo de fondo antes de que venza para que el request path no
+    pague el intercambio de credenciales.
+    """
+
+    def __init__(
+        self,
+        *,
+        pool_connections: int = config.KC_POOL_CONNECTIONS,
+        pool_maxsize: int = config.KC_POOL_MAXSIZE,
+        timeout: int = config.KC_HTTP_TIMEOUT_SEC,
+        refresh_margin_sec: int = config.KC_TOKEN_REFRESH_MARGIN_SEC,
+    ):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.timeout = timeout
+        self.refresh_margin_sec = refresh_margin_sec
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._integration: KeycloakIntegration | None = None
+        self._async_integration: AsyncKeycloakIntegration | None = None
+        self._connection: PooledOpenIDConnection | None = None
+        self._refresher: threading.Thread | None = None
+
+    def get(self) -> KeycloakIntegration:
+        integration = self._integration
+        if integration is not None:
+            return integration
+
+        with self._lock:
+            if self._integration is None:
+                self._connection = PooledOpenIDConnection(
+                    server_url=os.getenv('KEYCLOAK_URL'),
+                    client_id=os.getenv('KC_CLIENT_ID'),
+                    realm_name=os.getenv('KC_REALM'),
+                    client_secret_key=os.getenv('KC_ADMIN_SECRET'),
+                    verify=True,
+                    timeout=self.timeout,
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize,
+                )
+                admin = KeycloakAdmin(connection=self._connection)
+                self._integration = KeycloakIntegration(admin)
+                self._async_integration = AsyncKeycloakIntegration(admin)
+                self._stop.clear()
+                self._refresher = threading.Thread(
+                    target=self._refresh_loop,
+                    name="kc-token-refresher",
+                    daemon=True,
+                )
+                self._refresher.start()
+            return self._integration
+
+    def get_async(self) -> AsyncKeycloakIntegration:
+        self.get()
+        return self._async_integration
+
+    def _next_refresh_delay(self) -> float:
+        connection = self._connection
+        if connection is None or connection.token is None:
+            return 0.0
+        remaining = (connection.expires_at - datetime.now(tz=timezone.utc)).total_seconds()
+        return max(1.0, remaining - self.refresh_margin_sec)
+
+    def _refresh_loop(self) -> None:
+        failures = 0
+        while not self._stop.wait(self._next_refresh_delay() if failures == 0 else min(60, 2 ** failures)):
+            connection = self._connection
+            if connection is None:
+                return
+            try:
+                connection.refresh_token()
+                failures = 0
+                logger.info(
+                    "kc_admin_token_refreshed",
+                    extra={"extra": {"expires_at": connection.expires_at.isoformat()}},
+                )
+            except Exception as e:
+                failures += 1
+                logger.warning(
+                    "kc_admin_token_refresh_failed",
+                    extra={"extra": {"failures": failures, "error_type": type(e).__name__}},
+                )
+
+    def stats(self) -> Dict[str, Any]:
+        connection = self._connection
+        return {
+            "pool_connections": self.pool_connections,
+            "pool_maxsize": self.pool_maxsize,
+            "open_connections": connection.open_connections() if connection else 0,
+            "token_refreshes": connection.token_refreshes if connection else 0,
+            "token_refresh_failures": connection.token_refresh_failures if connection else 0,
+            "token_expires_at": (
+                connection.expires_at.isoformat() if connection and connection.token else None
+            ),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._stop.set()
+            if self._refresher is not None:
+                self._refresher.join(timeout=5)
+            if self._connection is not None:
+                self._connection._s.close()
+            self._integration = None
+            self._async_integration = None
+            self._connection = None
+            self._refresher = None
+
+    async def aclose(self) -> None:
+        connection = self._connection
+        if connection is not None:
+            await connection.aclose()
+        await asyncio.to_thread(self.close)
+
+
+keycloak_provider = KeycloakAdminProvider()
+
+
+def get_keycloak_integration() -> KeycloakIntegration:
+    return keycloak_provider.get()
+
+
+def get_async_keycloak_integration() -> AsyncKeycloakIntegration:
+    return keycloak_provider.get_async()
@@ -1,12 +1,18 @@
 from fastapi import FastAPI
+from app.core import config
 from app.core.scheduler import lifespan
 from app.core.logging.logger import setup_logging
+from app.core.tracing import setup_tracing
 from app.api.middleware.correlation_id import add_correlation_id
+from app.api.middleware.metrics import MetricsMiddleware
+from app.api.middleware.tracing import FASTAPI_NATIVE_TRACING, TracingMiddleware
 from app.api.handlers.exception_handlers import register_exception_handlers
 from app.api.main import api_router
+from app.api.routes import metrics
 
 def create_app() -> FastAPI:
     setup_logging()
+    setup_tracing()
 
     app = FastAPI(
         title="Mi casa en minutos",
@@ -17,6 +23,13 @@ def create_app() -> FastAPI:
     register_exception_handlers(app)
 
     app.include_router(api_router, prefix="/v1")
+
+    if config.TRACING_ENABLED and not FASTAPI_NATIVE_TRACING:
+        app.add_middleware(TracingMiddleware)
+
+    if config.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware)
+        app.include_router(metrics.router)
     return app
 
 app = create_app()
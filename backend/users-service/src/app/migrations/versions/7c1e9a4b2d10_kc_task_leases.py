@@ -0,0 +1,31 @@
+"""kc compensation task leases
+
+Revision ID: 7c1e9a4b2d10
+Revises: 0304ccc99cab
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e9a4b2d10'
+down_revision: Union[str, Sequence[str], None] = '0304ccc99cab'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('kc_compensation_tasks', sa.Column('claimed_by', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=True))
+    op.add_column('kc_compensation_tasks', sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('kc_compensation_tasks', 'lease_expires_at')
+    op.drop_column('kc_compensation_tasks', 'claimed_by')
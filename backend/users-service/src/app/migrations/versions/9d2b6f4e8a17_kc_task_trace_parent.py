@@ -0,0 +1,31 @@
+"""kc compensation task trace parent
+
+Revision ID: 9d2b6f4e8a17
+Revises: e4a9c27f5b31
+Create Date: 2026-10-18 14:02:51.730219
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d2b6f4e8a17'
+down_revision: Union[str, Sequence[str], None] = 'e4a9c27f5b31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('kc_compensation_tasks', sa.Column('trace_parent', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=True))
+    op.add_column('kc_compensation_tasks_archive', sa.Column('trace_parent', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('kc_compensation_tasks_archive', 'trace_parent')
+    op.drop_column('kc_compensation_tasks', 'trace_parent')
@@ -0,0 +1,49 @@
+"""interest audience indexes
+
+Revision ID: a8d4f0c6e392
+Revises: e3a9c4b7d215
+Create Date: 2026-10-18 19:10:27.581904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8d4f0c6e392'
+down_revision: Union[str, Sequence[str], None] = 'e3a9c4b7d215'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY: tablas grandes con escrituras del onboarding; no se bloquean mientras se arma.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_user_interest_city_active',
+            'user_interest',
+            ['city_id', 'id'],
+            unique=False,
+            postgresql_where=sa.text('is_active'),
+            postgresql_include=['account_id'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_user_neighborhood_interest_reverse',
+            'user_neighborhood_interest',
+            ['neighborhood_id', 'user_interest_id'],
+            unique=False,
+            postgresql_include=['interest_rank'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_user_neighborhood_interest_reverse', table_name='user_neighborhood_interest', postgresql_concurrently=True)
+        op.drop_index('ix_user_interest_city_active', table_name='user_interest', postgresql_concurrently=True)
@@ -0,0 +1,43 @@
+"""kc compensation task insert notify
+
+Revision ID: b3f5d8e1a7c4
+Revises: 7c1e9a4b2d10
+Create Date: 2026-10-18 11:04:09.552871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f5d8e1a7c4'
+down_revision: Union[str, Sequence[str], None] = '7c1e9a4b2d10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # NOTIFY se entrega al hacer commit de la transacción que inserta la task.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_kc_compensation_task() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('kc_compensation_tasks', NEW.id::text);
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER kc_compensation_tasks_notify
+        AFTER INSERT ON kc_compensation_tasks
+        FOR EACH ROW EXECUTE FUNCTION notify_kc_compensation_task();
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS kc_compensation_tasks_notify ON kc_compensation_tasks;")
+    op.execute("DROP FUNCTION IF EXISTS notify_kc_compensation_task();")
@@ -0,0 +1,47 @@
+"""location catalog change notify
+
+Revision ID: c7d2e5a1f843
+Revises: 5f1c8a3e9b62
+Create Date: 2026-10-18 17:05:12.448310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d2e5a1f843'
+down_revision: Union[str, Sequence[str], None] = '5f1c8a3e9b62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CATALOG_TABLES = ("country", "city", "neighborhood")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Un NOTIFY por sentencia (no por fila): una carga masiva dispara una sola recarga del catálogo.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_location_catalog() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('location_catalog', TG_TABLE_NAME);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    for table in CATALOG_TABLES:
+        op.execute(f"""
+            CREATE TRIGGER {table}_catalog_notify
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION notify_location_catalog();
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in CATALOG_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_catalog_notify ON {table};")
+    op.execute("DROP FUNCTION IF EXISTS notify_location_catalog();")
@@ -0,0 +1,43 @@
+"""deferrable interest rank
+
+Revision ID: e3a9c4b7d215
+Revises: c7d2e5a1f843
+Create Date: 2026-10-18 18:02:41.730215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a9c4b7d215'
+down_revision: Union[str, Sequence[str], None] = 'c7d2e5a1f843'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Diferible: el reemplazo del set reordena ranks en un solo upsert y se valida al commit.
+    op.drop_constraint('uq_user_interest_rank', 'user_neighborhood_interest', type_='unique')
+    op.create_unique_constraint(
+        'uq_user_interest_rank',
+        'user_neighborhood_interest',
+        ['user_interest_id', 'interest_rank'],
+        deferrable=True,
+        initially='IMMEDIATE',
+    )
+    # Duplicados de la PK y del unique de rank: solo suman escrituras en cada upsert.
+    op.drop_index('ix_interest_rank', table_name='user_neighborhood_interest')
+    op.drop_constraint('uq_user_interest_neighborhood', 'user_neighborhood_interest', type_='unique')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_unique_constraint('uq_user_interest_neighborhood', 'user_neighborhood_interest', ['user_interest_id', 'neighborhood_id'])
+    op.create_index('ix_interest_rank', 'user_neighborhood_interest', ['user_interest_id', 'interest_rank'], unique=False)
+    op.drop_constraint('uq_user_interest_rank', 'user_neighborhood_interest', type_='unique')
+    op.create_unique_constraint('uq_user_interest_rank', 'user_neighborhood_interest', ['user_interest_id', 'interest_rank'])
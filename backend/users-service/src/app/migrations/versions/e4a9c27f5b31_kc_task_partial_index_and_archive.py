@@ -0,0 +1,77 @@
+"""kc compensation task partial index and archive
+
+Revision ID: e4a9c27f5b31
+Revises: b3f5d8e1a7c4
+Create Date: 2026-10-18 12:41:27.118304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a9c27f5b31'
+down_revision: Union[str, Sequence[str], None] = 'b3f5d8e1a7c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('kc_compensation_tasks_archive',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('task_type', postgresql.ENUM('delete_kc_user', name='kctasktype', create_type=False), nullable=False),
+    sa.Column('kc_user_id', sa.Uuid(), nullable=False),
+    sa.Column('email', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('status', postgresql.ENUM('pending', 'done', 'failed', name='kctaskstatus', create_type=False), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_retry_at', sa.DateTime(), nullable=False),
+    sa.Column('last_error', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('claimed_by', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=True),
+    sa.Column('lease_expires_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_kc_compensation_tasks_archive_kc_user_id'), 'kc_compensation_tasks_archive', ['kc_user_id'], unique=False)
+
+    # CONCURRENTLY: la tabla puede ser grande y recibe inserts del registro; no se bloquean escrituras.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_kc_compensation_tasks_pending_due',
+            'kc_compensation_tasks',
+            ['next_retry_at'],
+            unique=False,
+            postgresql_where=sa.text("status = 'pending'"),
+            postgresql_include=['attempts', 'lease_expires_at'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_kc_compensation_tasks_done_updated_at',
+            'kc_compensation_tasks',
+            ['updated_at'],
+            unique=False,
+            postgresql_where=sa.text("status = 'done'"),
+            postgresql_concurrently=True,
+        )
+        # id ya tiene el índice de la primary key; status y next_retry_at los reemplaza el índice parcial.
+        op.drop_index('ix_kc_compensation_tasks_id', table_name='kc_compensation_tasks', postgresql_concurrently=True)
+        op.drop_index('ix_kc_compensation_tasks_status', table_name='kc_compensation_tasks', postgresql_concurrently=True)
+        op.drop_index('ix_kc_compensation_tasks_next_retry_at', table_name='kc_compensation_tasks', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_kc_compensation_tasks_next_retry_at', 'kc_compensation_tasks', ['next_retry_at'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_kc_compensation_tasks_status', 'kc_compensation_tasks', ['status'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_kc_compensation_tasks_id', 'kc_compensation_tasks', ['id'], unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_kc_compensation_tasks_done_updated_at', table_name='kc_compensation_tasks', postgresql_concurrently=True)
+        op.drop_index('ix_kc_compensation_tasks_pending_due', table_name='kc_compensation_tasks', postgresql_concurrently=True)
+    op.drop_index(op.f('ix_kc_compensation_tasks_archive_kc_user_id'), table_name='kc_compensation_tasks_archive')
+    op.drop_table('kc_compensation_tasks_archive')
@@ -0,0 +1,39 @@
+import uuid
+from enum import Enum
+from typing import Optional
+from datetime import datetime
+
+from sqlmodel import Field, SQLModel
+
+import sqlalchemy as sa
+from sqlalchemy.sql import func
+from sqlalchemy import Column
+
+class IdempotencyStatus(str,Enum):
+    in_progress = "in_progress"
+    completed = "completed"
+
+class IdempotencyKey(SQLModel, table=True):
+    """
+    Resultado de un request con header Idempotency-Key, por (scope, key), hasta expires_at.
+    """
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        # Purga por TTL (purge_expired_idempotency_keys).
+        sa.Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
+
+    scope: str = Field(primary_key=True, max_length=64)
+    key: str = Field(primary_key=True, max_length=255)
+    # sha256 del body (sin secretos): la misma key con otro body es un error del cliente.
+    request_hash: str = Field(max_length=64)
+    status: IdempotencyStatus = Field(default=IdempotencyStatus.in_progress)
+    # Token del intento que tiene la key; complete/release solo aplican si sigue siendo el dueño.
+    locked_by: Optional[uuid.UUID] = Field(default=None)
+    locked_until: Optional[datetime] = Field(default=None)
+    # Respuesta serializada (JSON) que se repite a los duplicados.
+    response_body: Optional[str] = Field(default=None, sa_column=Column(sa.Text()))
+    expires_at: datetime = Field(nullable=False)
+    created_at: Optional[datetime] = Field(default=None, sa_column=Column(sa.DateTime(),server_default=func.now()))
+    updated_at: Optional[datetime] = Field(default=None, sa_column=Column(sa.DateTime(),server_default=func.now(),onupdate=func.now()))
@@ -33,6 +33,14 @@ class UserInterest(SQLModel, table=True):
             "city_id",
             name="uq_user_interest_user_city"
         ),
+        # Audiencias por ciudad: solo intereses activos, en orden de id (cursor de keyset).
+        sa.Index(
+            "ix_user_interest_city_active",
+            "city_id",
+            "id",
+            postgresql_where=sa.text("is_active"),
+            postgresql_include=["account_id"],
+        ),
     )
 
 class UserNeighborhoodInterest(SQLModel, table=True):
@@ -59,11 +67,19 @@ class UserNeighborhoodInterest(SQLModel, table=True):
         UniqueConstraint(
             "user_interest_id",
             "interest_rank",
-            name="uq_user_interest_rank"
+            name="uq_user_interest_rank",
+            # Diferible: el reemplazo del set de intereses hace SET CONSTRAINTS ... DEFERRED.
+            deferrable=True,
+            initially="IMMEDIATE",
         ),
-        Index("ix_interest_rank", "user_interest_id", "interest_rank"),
         CheckConstraint("interest_rank BETWEEN 1 AND 5", name="ck_interest_rank_range"),
-        UniqueConstraint("user_interest_id", "neighborhood_id", name="uq_user_interest_neighborhood")
+        # Búsqueda inversa (barrio -> intereses) para audiencias; la PK empieza por user_interest_id.
+        sa.Index(
+            "ix_user_neighborhood_interest_reverse",
+            "neighborhood_id",
+            "user_interest_id",
+            postgresql_include=["interest_rank"],
+        ),
     )
 
 class PropertyType(str,Enum):
@@ -20,16 +20,59 @@ class KcTaskStatus(str,Enum):
 class KcCompensationTask(SQLModel, table=True):
 
     __tablename__ = "kc_compensation_tasks"
+    __table_args__ = (
+        # Índice parcial para el poll de claim_due_tasks: solo cubre la cola pendiente, no el histórico.
+        sa.Index(
+            "ix_kc_compensation_tasks_pending_due",
+            "next_retry_at",
+            postgresql_where=sa.text("status = 'pending'"),
+            postgresql_include=["attempts", "lease_expires_at"],
+        ),
+        # Candidatas del job de retención (archive_done_tasks).
+        sa.Index(
+            "ix_kc_compensation_tasks_done_updated_at",
+            "updated_at",
+            postgresql_where=sa.text("status = 'done'"),
+        ),
+    )
 
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True, index=True)
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     task_type: KcTaskType = Field(default=KcTaskType.delete_kc_user)
     kc_user_id: uuid.UUID = Field(index=True)
     email: Optional[str] = Field(default=None, index=True)
-    status: KcTaskStatus = Field(default=KcTaskStatus.pending, index=True)
+    status: KcTaskStatus = Field(default=KcTaskStatus.pending)
     attempts: int = Field(default=0, nullable=False)
     next_retry_at: datetime = Field(
-        sa_column=Column(sa.DateTime(), nullable=False, server_default=func.now(), index=True)
+        sa_column=Column(sa.DateTime(), nullable=False, server_default=func.now())
     )
     last_error: Optional[str] = Field(default=None)
+    # Lease del worker que reclamó la task (SELECT ... FOR UPDATE SKIP LOCKED); vencido = reclamable.
+    claimed_by: Optional[str] = Field(default=None, max_length=255)
+    lease_expires_at: Optional[datetime] = Field(default=None)
+    # W3C traceparent del request que generó la task; el worker lo enlaza a su span.
+    trace_parent: Optional[str] = Field(default=None, max_length=64)
     created_at: Optional[datetime] = Field(default=None, sa_column=Column(sa.DateTime(),server_default=func.now()))
-    updated_at: Optional[datetime] = Field(default=None, sa_column=Column(sa.DateTime(),server_default=func.now(),onupdate=func.now()))
\ No newline at end of file
+    updated_at: Optional[datetime] = Field(default=None, sa_column=Column(sa.DateTime(),server_default=func.now(),onupdate=func.now()))
+
+
+class KcCompensationTaskArchive(SQLModel, table=True):
+    """
+    Tasks terminadas (done) que el job de retención saca de kc_compensation_tasks.
+    """
+
+    __tablename__ = "kc_compensation_tasks_archive"
+
+    id: uuid.UUID = Field(primary_key=True)
+    task_type: KcTaskType
+    kc_user_id: uuid.UUID = Field(index=True)
+    email: Optional[str] = Field(default=None)
+    status: KcTaskStatus
+    attempts: int = Field(nullable=False)
+    next_retry_at: datetime = Field(nullable=False)
+    last_error: Optional[str] = Field(default=None)
+    claimed_by: Optional[str] = Field(default=None, max_length=255)
+    lease_expires_at: Optional[datetime] = Field(default=None)
+    trace_parent: Optional[str] = Field(default=None, max_length=64)
+    created_at: Optional[datetime] = Field(default=None)
+    updated_at: Optional[datetime] = Field(default=None)
+    archived_at: Optional[datetime] = Field(default=None, sa_column=Column(sa.DateTime(),server_default=func.now()))
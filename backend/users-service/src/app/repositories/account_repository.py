@@ -1,21 +1,163 @@
+import uuid
 from typing import TypeVar
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.models.account import Account, UserProfile, CompanyProfile
+from app.core.cache import account_cache, invalidate_on_commit
+from app.models.account import Account, AccountType, UserProfile, CompanyProfile
 
 TProfile = TypeVar("TProfile", UserProfile, CompanyProfile)
 
+# Estado "pendiente" de una cuenta reservada antes de crear el usuario en Keycloak.
+RESERVED_ONBOARDING_STEP = 0
+
 def get_account_by_email(session: Session, email: str) -> Account | None:
     statement = select(Account).where(Account.email == email)
     session_user = session.exec(statement).first()
     return session_user
 
 def create_account(session: Session, account: Account) -> Account:
+    invalidate_on_commit(session, account_cache, account.account_id)
     session.add(account)
     session.flush()
     return account
 
 def create_profile(session: Session,profile: TProfile) -> TProfile:
+    invalidate_on_commit(session, account_cache, profile.account_id)
     session.add(profile)
     session.flush()
-    return profile
\ No newline at end of file
+    return profile
+
+async def get_account_by_email_async(session: AsyncSession, email: str) -> Account | None:
+    statement = select(Account).where(Account.email == email)
+    result = await session.exec(statement)
+    return result.first()
+
+async def create_account_async(session: AsyncSession, account: Account) -> Account:
+    invalidate_on_commit(session, account_cache, account.account_id)
+    session.add(account)
+    await session.flush()
+    return account
+
+async def create_profile_async(session: AsyncSession, profile: TProfile) -> TProfile:
+    invalidate_on_commit(session, account_cache, profile.account_id)
+    session.add(profile)
+    await session.flush()
+    return profile
+
+
+def _reserve_email_statement(reservation_id: uuid.UUID, email: str, account_type: AccountType, stale_after_sec: int):
+    """
+    INSERT de la reserva; si el email tiene una reserva abandonada (pendiente hace más de
+    `stale_after_sec`: el proceso murió o no pudo liberarla) se la toma.
+    """
+    statement = pg_insert(Account).values(
+        account_id=reservation_id,
+        email=email,
+        account_type=account_type,
+        onboarding_step=RESERVED_ONBOARDING_STEP,
+        is_active=False,
+    )
+    return (
+        statement.on_conflict_do_update(
+            index_elements=[Account.email],
+            set_={
+                "account_id": statement.excluded.account_id,
+                "account_type": statement.excluded.account_type,
+                "created_at": sa.func.now(),
+            },
+            where=sa.and_(
+                Account.onboarding_step == RESERVED_ONBOARDING_STEP,
+                Account.is_active.is_(False),
+                Account.created_at < sa.func.now() - sa.func.make_interval(0, 0, 0, 0, 0, 0, stale_after_sec),
+            ),
+        )
+        .returning(Account.account_id)
+    )
+
+def _release_reservation_statement(reservation_id: uuid.UUID):
+    return sa.delete(Account).where(
+        Account.account_id == reservation_id,
+        Account.onboarding_step == RESERVED_ONBOARDING_STEP,
+        Account.is_active.is_(False),
+    )
+
+def _activate_reserved_statement(reservation_id: uuid.UUID, account: Account, profile: TProfile):
+    """
+    UPDATE de la reserva (account_id definitivo = id de Keycloak) + INSERT del perfil
+    en una sola sentencia: WITH activated AS (UPDATE ... RETURNING) INSERT ... SELECT.
+    Sin fila devuelta, la reserva ya no existía.
+    """
+    activated = (
+        sa.update(Account)
+        .where(Account.account_id == reservation_id)
+        .values(
+            account_id=account.account_id,
+            onboarding_step=account.onboarding_step,
+            is_active=True,
+        )
+        .returning(Account.account_id)
+        .cte("activated")
+    )
+    table = type(profile).__table__
+    values = profile.model_dump(exclude={"account_id", "created_at", "updated_at"})
+    select_values = sa.select(
+        activated.c.account_id,
+        *[sa.literal(value, type_=table.c[column].type) for column, value in values.items()],
+    )
+    return (
+        sa.insert(table)
+        .from_select(["account_id", *values], select_values)
+        .add_cte(activated)
+        .returning(table.c.account_id)
+    )
+
+def _invalidate_activation(session: Session | AsyncSession, reservation_id: uuid.UUID, account: Account) -> None:
+    # La activación cambia la PK (reserva -> id de Keycloak): se invalidan las dos.
+    invalidate_on_commit(session, account_cache, reservation_id)
+    invalidate_on_commit(session, account_cache, account.account_id)
+
+def reserve_account_email(session: Session, reservation_id: uuid.UUID, email: str, account_type: AccountType, stale_after_sec: int) -> bool:
+    """
+    INSERT ... ON CONFLICT (email) RETURNING. False si el email ya existe
+    (o lo tiene reservado otra transacción que terminó en commit).
+    """
+    row = session.execute(_reserve_email_statement(reservation_id, email, account_type, stale_after_sec)).first()
+    return row is not None
+
+def release_reserved_email(session: Session, reservation_id: uuid.UUID) -> None:
+    session.execute(_release_reservation_statement(reservation_id))
+
+def activate_reserved_account(session: Session, reservation_id: uuid.UUID, account: Account, profile: TProfile) -> bool:
+    _invalidate_activation(session, reservation_id, account)
+    return session.execute(_activate_reserved_statement(reservation_id, account, profile)).first() is not None
+
+async def reserve_account_email_async(session: AsyncSession, reservation_id: uuid.UUID, email: str, account_type: AccountType, stale_after_sec: int) -> bool:
+    result = await session.execute(_reserve_email_statement(reservation_id, email, account_type, stale_after_sec))
+    return result.first() is not None
+
+async def release_reserved_email_async(session: AsyncSession, reservation_id: uuid.UUID) -> None:
+    await session.execute(_release_reservation_statement(reservation_id))
+
+async def activate_reserved_account_async(session: AsyncSession, reservation_id: uuid.UUID, account: Account, profile: TProfile) -> bool:
+    _invalidate_activation(session, reservation_id, account)
+    result = await session.execute(_activate_reserved_statement(reservation_id, account, profile))
+    return result.first() is not None
+
+def _account_with_profile_statement(account_id: uuid.UUID):
+    # Una sola lectura: la cuenta y el perfil que corresponda (el otro viene en NULL).
+    return (
+        select(Account, UserProfile, CompanyProfile)
+        .outerjoin(UserProfile, UserProfile.account_id == Account.account_id)
+        .outerjoin(CompanyProfile, CompanyProfile.account_id == Account.account_id)
+        .where(Account.account_id == account_id)
+    )
+
+def get_account_with_profile(session: Session, account_id: uuid.UUID) -> tuple[Account, UserProfile | None, CompanyProfile | None] | None:
+    return session.exec(_account_with_profile_statement(account_id)).first()
+
+async def get_account_with_profile_async(session: AsyncSession, account_id: uuid.UUID) -> tuple[Account, UserProfile | None, CompanyProfile | None] | None:
+    result = await session.exec(_account_with_profile_statement(account_id))
+    return result.first()
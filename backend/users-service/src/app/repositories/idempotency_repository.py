@@ -0,0 +1,117 @@
+import uuid
+from datetime import timedelta
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.idempotency import IdempotencyKey, IdempotencyStatus
+
+
+def _claim_statement(scope: str, key: str, request_hash: str, token: uuid.UUID, lock_sec: int, ttl_sec: int):
+    """
+    INSERT ... ON CONFLICT (scope, key) DO UPDATE solo si la fila existente venció (TTL) o
+    es un intento en curso con el lease vencido. RETURNING vacío = la key es de otro.
+    """
+    insert = pg_insert(IdempotencyKey).values(
+        scope=scope,
+        key=key,
+        request_hash=request_hash,
+        status=IdempotencyStatus.in_progress,
+        locked_by=token,
+        locked_until=sa.func.now() + timedelta(seconds=lock_sec),
+        expires_at=sa.func.now() + timedelta(seconds=ttl_sec),
+    )
+    existing = IdempotencyKey.__table__.c
+    return insert.on_conflict_do_update(
+        index_elements=[IdempotencyKey.scope, IdempotencyKey.key],
+        set_={
+            "request_hash": insert.excluded.request_hash,
+            "status": insert.excluded.status,
+            "locked_by": insert.excluded.locked_by,
+            "locked_until": insert.excluded.locked_until,
+            "expires_at": insert.excluded.expires_at,
+            "response_body": None,
+            "created_at": sa.func.now(),
+        },
+        where=sa.or_(
+            existing.expires_at < sa.func.now(),
+            sa.and_(
+                existing.status == IdempotencyStatus.in_progress,
+                existing.locked_until < sa.func.now(),
+            ),
+        ),
+    ).returning(existing.key)
+
+def _get_statement(scope: str, key: str):
+    return (
+        select(IdempotencyKey)
+        .where(IdempotencyKey.scope == scope)
+        .where(IdempotencyKey.key == key)
+        .where(IdempotencyKey.expires_at >= sa.func.now())
+    )
+
+def _complete_statement(scope: str, key: str, token: uuid.UUID, response_body: str):
+    return (
+        sa.update(IdempotencyKey)
+        .where(IdempotencyKey.scope == scope)
+        .where(IdempotencyKey.key == key)
+        .where(IdempotencyKey.locked_by == token)
+        .values(status=IdempotencyStatus.completed, response_body=response_body, locked_until=None)
+        .execution_options(synchronize_session=False)
+    )
+
+def _release_statement(scope: str, key: str, token: uuid.UUID):
+    return (
+        sa.delete(IdempotencyKey)
+        .where(IdempotencyKey.scope == scope)
+        .where(IdempotencyKey.key == key)
+        .where(IdempotencyKey.locked_by == token)
+        .where(IdempotencyKey.status == IdempotencyStatus.in_progress)
+        .execution_options(synchronize_session=False)
+    )
+
+def claim_idempotency_key(session: Session, scope: str, key: str, request_hash: str, token: uuid.UUID, *, lock_sec: int, ttl_sec: int) -> bool:
+    return session.execute(_claim_statement(scope, key, request_hash, token, lock_sec, ttl_sec)).first() is not None
+
+def get_idempotency_key(session: Session, scope: str, key: str) -> IdempotencyKey | None:
+    return session.exec(_get_statement(scope, key)).first()
+
+def complete_idempotency_key(session: Session, scope: str, key: str, token: uuid.UUID, response_body: str) -> None:
+    session.execute(_complete_statement(scope, key, token, response_body))
+
+def release_idempotency_key(session: Session, scope: str, key: str, token: uuid.UUID) -> None:
+    session.execute(_release_statement(scope, key, token))
+
+async def claim_idempotency_key_async(session: AsyncSession, scope: str, key: str, request_hash: str, token: uuid.UUID, *, lock_sec: int, ttl_sec: int) -> bool:
+    result = await session.execute(_claim_statement(scope, key, request_hash, token, lock_sec, ttl_sec))
+    return result.first() is not None
+
+async def get_idempotency_key_async(session: AsyncSession, scope: str, key: str) -> IdempotencyKey | None:
+    result = await session.exec(_get_statement(scope, key))
+    return result.first()
+
+async def complete_idempotency_key_async(session: AsyncSession, scope: str, key: str, token: uuid.UUID, response_body: str) -> None:
+    await session.execute(_complete_statement(scope, key, token, response_body))
+
+async def release_idempotency_key_async(session: AsyncSession, scope: str, key: str, token: uuid.UUID) -> None:
+    await session.execute(_release_statement(scope, key, token))
+
+
+def purge_expired_idempotency_keys(session: Session, *, batch_size: int) -> int:
+    """
+    Borra un lote de keys vencidas y hace commit. Devuelve cuántas borró.
+    """
+    expired = (
+        select(IdempotencyKey.scope, IdempotencyKey.key)
+        .where(IdempotencyKey.expires_at < sa.func.now())
+        .limit(batch_size)
+    )
+    result = session.execute(
+        sa.delete(IdempotencyKey)
+        .where(sa.tuple_(IdempotencyKey.scope, IdempotencyKey.key).in_(expired))
+        .execution_options(synchronize_session=False)
+    )
+    session.commit()
+    return result.rowcount
@@ -0,0 +1,271 @@
+import uuid
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID, insert as pg_insert
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.account import Account
+from app.models.interests import (
+    PropertyType,
+    UserInterest,
+    UserNeighborhoodInterest,
+    UserPropertyTypeInterest,
+)
+
+# Constraint diferible (migración e3a9c4b7d215): permite reordenar ranks en una sola sentencia.
+RANK_CONSTRAINT = "uq_user_interest_rank"
+
+_NEIGHBORHOOD = UserNeighborhoodInterest.__table__.c
+_PROPERTY_TYPE = UserPropertyTypeInterest.__table__.c
+_PROPERTY_TYPE_SQL = _PROPERTY_TYPE.property_type.type
+
+
+def _lock_account_statement(account_id: uuid.UUID):
+    # Serializa los reemplazos concurrentes de una misma cuenta (y confirma que existe).
+    return select(Account.account_id).where(Account.account_id == account_id).with_for_update()
+
+def _defer_rank_statement():
+    return sa.text(f"SET CONSTRAINTS {RANK_CONSTRAINT} DEFERRED")
+
+def _upsert_cities_statement(account_id: uuid.UUID, city_ids: list[uuid.UUID]):
+    """
+    Alta de las ciudades nuevas y reactivación de las desactivadas; las activas no se tocan.
+    """
+    insert = pg_insert(UserInterest).values([
+        {"id": uuid.uuid4(), "account_id": account_id, "city_id": city_id, "is_active": True}
+        for city_id in city_ids
+    ])
+    return insert.on_conflict_do_update(
+        index_elements=[UserInterest.account_id, UserInterest.city_id],
+        set_={"is_active": True, "deactivated_at": None, "updated_at": sa.func.now()},
+        where=UserInterest.is_active.is_(False),
+    )
+
+def _deactivate_cities_statement(account_id: uuid.UUID, city_ids: list[uuid.UUID]):
+    return (
+        sa.update(UserInterest)
+        .where(UserInterest.account_id == account_id)
+        .where(UserInterest.is_active.is_(True))
+        .where(UserInterest.city_id.not_in(city_ids))
+        .values(is_active=False, deactivated_at=sa.func.now())
+        .execution_options(synchronize_session=False)
+    )
+
+def _delete_neighborhoods_statement(account_id: uuid.UUID, pairs: list[tuple[uuid.UUID, uuid.UUID]]):
+    # pairs: (city_id, neighborhood_id). Borra también los barrios de las ciudades desactivadas.
+    return (
+        sa.delete(UserNeighborhoodInterest)
+        .where(_NEIGHBORHOOD.user_interest_id == UserInterest.id)
+        .where(UserInterest.account_id == account_id)
+        .where(sa.tuple_(UserInterest.city_id, _NEIGHBORHOOD.neighborhood_id).not_in(pairs))
+        .execution_options(synchronize_session=False)
+    )
+
+def _upsert_neighborhoods_statement(account_id: uuid.UUID, rows: list[tuple[uuid.UUID, uuid.UUID, int]]):
+    """
+    rows: (city_id, neighborhood_id, rank). INSERT ... SELECT desde VALUES resolviendo
+    user_interest.id por (account_id, city_id); solo reescribe los ranks que cambiaron.
+    """
+    desired = sa.values(
+        sa.column("city_id", UUID(as_uuid=True)),
+        sa.column("neighborhood_id", UUID(as_uuid=True)),
+        sa.column("interest_rank", sa.Integer),
+        name="desired",
+    ).data(rows)
+    source = (
+        select(
+            UserInterest.id,
+            sa.cast(desired.c.neighborhood_id, UUID(as_uuid=True)),
+            sa.cast(desired.c.interest_rank, sa.Integer),
+        )
+        .select_from(desired)
+        .join(UserInterest, UserInterest.city_id == sa.cast(desired.c.city_id, UUID(as_uuid=True)))
+        .where(UserInterest.account_id == account_id)
+    )
+    insert = pg_insert(UserNeighborhoodInterest).from_select(
+        ["user_interest_id", "neighborhood_id", "interest_rank"], source
+    )
+    return insert.on_conflict_do_update(
+        index_elements=[_NEIGHBORHOOD.user_interest_id, _NEIGHBORHOOD.neighborhood_id],
+        set_={"interest_rank": insert.excluded.interest_rank, "updated_at": sa.func.now()},
+        where=_NEIGHBORHOOD.interest_rank.is_distinct_from(insert.excluded.interest_rank),
+    )
+
+def _delete_property_types_statement(account_id: uuid.UUID, pairs: list[tuple[uuid.UUID, PropertyType]]):
+    # pairs: (city_id, property_type).
+    return (
+        sa.delete(UserPropertyTypeInterest)
+        .where(_PROPERTY_TYPE.user_interest_id == UserInterest.id)
+        .where(UserInterest.account_id == account_id)
+        .where(sa.tuple_(UserInterest.city_id, _PROPERTY_TYPE.property_type).not_in(pairs))
+        .execution_options(synchronize_session=False)
+    )
+
+def _insert_property_types_statement(account_id: uuid.UUID, pairs: list[tuple[uuid.UUID, PropertyType]]):
+    desired = sa.values(
+        sa.column("city_id", UUID(as_uuid=True)),
+        sa.column("property_type", sa.String),
+        name="desired",
+    ).data([(city_id, property_type.value) for city_id, property_type in pairs])
+    source = (
+        select(UserInterest.id, sa.cast(desired.c.property_type, _PROPERTY_TYPE_SQL))
+        .select_from(desired)
+        .join(UserInterest, UserInterest.city_id == sa.cast(desired.c.city_id, UUID(as_uuid=True)))
+        .where(UserInterest.account_id == account_id)
+    )
+    return pg_insert(UserPropertyTypeInterest).from_select(
+        ["user_interest_id", "property_type"], source
+    ).on_conflict_do_nothing()
+
+def _replace_statements(
+    account_id: uuid.UUID,
+    city_ids: list[uuid.UUID],
+    neighborhoods: list[tuple[uuid.UUID, uuid.UUID, int]],
+    property_types: list[tuple[uuid.UUID, PropertyType]],
+) -> list:
+    """
+    Sentencias del reemplazo, en orden. Su cantidad no depende del tamaño del set: los
+    INSERT con filas vacías se omiten, nada más.
+    """
+    statements = [_defer_rank_statement()]
+    if city_ids:
+        statements.append(_upsert_cities_statement(account_id, city_ids))
+    statements.append(_deactivate_cities_statement(account_id, city_ids))
+    # Primero los DELETE: liberan ranks y filas antes de los upserts.
+    statements.append(_delete_neighborhoods_statement(account_id, [(city_id, neighborhood_id) for city_id, neighborhood_id, _ in neighborhoods]))
+    if neighborhoods:
+        statements.append(_upsert_neighborhoods_statement(account_id, neighborhoods))
+    statements.append(_delete_property_types_statement(account_id, property_types))
+    if property_types:
+        statements.append(_insert_property_types_statement(account_id, property_types))
+    return statements
+
+def _interests_statement(account_id: uuid.UUID):
+    """
+    Set activo de la cuenta en una sola lectura: una fila por (ciudad, barrio | tipo).
+    """
+    neighborhoods = (
+        select(
+            UserInterest.city_id,
+            _NEIGHBORHOOD.neighborhood_id,
+            _NEIGHBORHOOD.interest_rank,
+            sa.null().label("property_type"),
+        )
+        .join(UserNeighborhoodInterest, _NEIGHBORHOOD.user_interest_id == UserInterest.id)
+        .where(UserInterest.account_id == account_id)
+        .where(UserInterest.is_active.is_(True))
+    )
+    property_types = (
+        select(
+            UserInterest.city_id,
+            sa.null(),
+            sa.null(),
+            sa.cast(_PROPERTY_TYPE.property_type, sa.String),
+        )
+        .join(UserPropertyTypeInterest, _PROPERTY_TYPE.user_interest_id == UserInterest.id)
+        .where(UserInterest.account_id == account_id)
+        .where(UserInterest.is_active.is_(True))
+    )
+    cities = (
+        select(UserInterest.city_id, sa.null(), sa.null(), sa.null())
+        .where(UserInterest.account_id == account_id)
+        .where(UserInterest.is_active.is_(True))
+    )
+    return sa.union_all(cities, neighborhoods, property_types)
+
+
+def _neighborhood_audience_statement(neighborhood_id: uuid.UUID, property_type: PropertyType | None, after: uuid.UUID | None, limit: int):
+    """
+    Cuentas activas interesadas en el barrio. Recorre ix_user_neighborhood_interest_reverse en
+    orden de user_interest_id (keyset: `after` es el último id de la página anterior) y corta en `limit`.
+    """
+    statement = (
+        select(UserInterest.id, UserInterest.account_id, _NEIGHBORHOOD.interest_rank)
+        .select_from(UserNeighborhoodInterest)
+        .join(UserInterest, UserInterest.id == _NEIGHBORHOOD.user_interest_id)
+        .join(Account, Account.account_id == UserInterest.account_id)
+        .where(_NEIGHBORHOOD.neighborhood_id == neighborhood_id)
+        # Columna booleana sola (no IS true): es el predicado de los índices parciales.
+        .where(UserInterest.is_active)
+        .where(Account.is_active)
+        # Orden por la columna del índice (no por UserInterest.id) para que no haga falta un sort.
+        .order_by(_NEIGHBORHOOD.user_interest_id)
+        .limit(limit)
+    )
+    if after is not None:
+        statement = statement.where(_NEIGHBORHOOD.user_interest_id > after)
+    if property_type is not None:
+        statement = statement.where(_has_property_type(_NEIGHBORHOOD.user_interest_id, property_type))
+    return statement
+
+def _city_audience_statement(city_id: uuid.UUID, property_type: PropertyType | None, after: uuid.UUID | None, limit: int):
+    # Mismo esquema sobre ix_user_interest_city_active (parcial, is_active).
+    statement = (
+        select(UserInterest.id, UserInterest.account_id, sa.null().label("interest_rank"))
+        .join(Account, Account.account_id == UserInterest.account_id)
+        .where(UserInterest.city_id == city_id)
+        .where(UserInterest.is_active)
+        .where(Account.is_active)
+        .order_by(UserInterest.id)
+        .limit(limit)
+    )
+    if after is not None:
+        statement = statement.where(UserInterest.id > after)
+    if property_type is not None:
+        statement = statement.where(_has_property_type(UserInterest.id, property_type))
+    return statement
+
+def _has_property_type(user_interest_id, property_type: PropertyType):
+    # Sonda por PK (user_interest_id, property_type).
+    return (
+        select(1)
+        .where(_PROPERTY_TYPE.user_interest_id == user_interest_id)
+        .where(_PROPERTY_TYPE.property_type == property_type)
+        .exists()
+    )
+
+
+def lock_account(session: Session, account_id: uuid.UUID) -> bool:
+    return session.execute(_lock_account_statement(account_id)).first() is not None
+
+def replace_interests(session: Session, account_id: uuid.UUID, city_ids, neighborhoods, property_types) -> int:
+    """
+    Ejecuta el reemplazo (sin commit). Devuelve cuántas sentencias mandó.
+    """
+    statements = _replace_statements(account_id, city_ids, neighborhoods, property_types)
+    for statement in statements:
+        session.execute(statement)
+    return len(statements)
+
+def list_interest_rows(session: Session, account_id: uuid.UUID) -> list:
+    return session.execute(_interests_statement(account_id)).all()
+
+async def lock_account_async(session: AsyncSession, account_id: uuid.UUID) -> bool:
+    result = await session.execute(_lock_account_statement(account_id))
+    return result.first() is not None
+
+async def replace_interests_async(session: AsyncSession, account_id: uuid.UUID, city_ids, neighborhoods, property_types) -> int:
+    statements = _replace_statements(account_id, city_ids, neighborhoods, property_types)
+    for statement in statements:
+        await session.execute(statement)
+    return len(statements)
+
+async def list_interest_rows_async(session: AsyncSession, account_id: uuid.UUID) -> list:
+    result = await session.execute(_interests_statement(account_id))
+    return result.all()
+
+
+def list_neighborhood_audience(session: Session, neighborhood_id: uuid.UUID, *, property_type: PropertyType | None, after: uuid.UUID | None, limit: int) -> list:
+    return session.execute(_neighborhood_audience_statement(neighborhood_id, property_type, after, limit)).all()
+
+def list_city_audience(session: Session, city_id: uuid.UUID, *, property_type: PropertyType | None, after: uuid.UUID | None, limit: int) -> list:
+    return session.execute(_city_audience_statement(city_id, property_type, after, limit)).all()
+
+async def list_neighborhood_audience_async(session: AsyncSession, neighborhood_id: uuid.UUID, *, property_type: PropertyType | None, after: uuid.UUID | None, limit: int) -> list:
+    result = await session.execute(_neighborhood_audience_statement(neighborhood_id, property_type, after, limit))
+    return result.all()
+
+async def list_city_audience_async(session: AsyncSession, city_id: uuid.UUID, *, property_type: PropertyType | None, after: uuid.UUID | None, limit: int) -> list:
+    result = await session.execute(_city_audience_statement(city_id, property_type, after, limit))
+    return result.all()
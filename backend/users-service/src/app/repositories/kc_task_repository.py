@@ -0,0 +1,18 @@
+from datetime import datetime
+
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from app.models.kc_tasks import KcCompensationTask, KcTaskStatus
+
+
+def compensation_backlog(session: Session) -> dict[KcTaskStatus, tuple[int, datetime | None]]:
+    """
+    (cantidad, next_retry_at más antiguo) por estado, solo para pending y failed.
+    """
+    statement = (
+        select(KcCompensationTask.status, func.count(), func.min(KcCompensationTask.next_retry_at))
+        .where(KcCompensationTask.status.in_([KcTaskStatus.pending, KcTaskStatus.failed]))
+        .group_by(KcCompensationTask.status)
+    )
+    return {status: (count, oldest) for status, count, oldest in session.exec(statement).all()}
@@ -0,0 +1,43 @@
+from sqlmodel import Session, select
+
+from app.models.location import City, Country, Neighborhood
+
+
+def list_active_countries(session: Session):
+    statement = (
+        select(Country.id, Country.name, Country.iso2, Country.iso3, Country.phone_code, Country.currency)
+        .where(Country.is_active.is_(True))
+        .order_by(Country.name)
+    )
+    return session.exec(statement).all()
+
+def list_active_cities(session: Session):
+    """
+    Ciudades activas de países activos, ordenadas por país y nombre.
+    """
+    statement = (
+        select(
+            City.id, City.country_id, City.name, City.state_id, City.code,
+            City.latitude, City.longitude, City.timezone,
+        )
+        .join(Country, Country.id == City.country_id)
+        .where(City.is_active.is_(True), Country.is_active.is_(True))
+        .order_by(City.country_id, City.name)
+    )
+    return session.exec(statement).all()
+
+def list_active_neighborhoods(session: Session):
+    """
+    Barrios activos de ciudades (y países) activos, ordenados por ciudad y nombre.
+    """
+    statement = (
+        select(
+            Neighborhood.id, Neighborhood.city_id, Neighborhood.name, Neighborhood.postal_code,
+            Neighborhood.latitude, Neighborhood.longitude,
+        )
+        .join(City, City.id == Neighborhood.city_id)
+        .join(Country, Country.id == City.country_id)
+        .where(Neighborhood.is_active.is_(True), City.is_active.is_(True), Country.is_active.is_(True))
+        .order_by(Neighborhood.city_id, Neighborhood.name)
+    )
+    return session.exec(statement).all()
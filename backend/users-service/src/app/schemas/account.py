@@ -0,0 +1,38 @@
+import uuid
+from datetime import datetime
+
+from pydantic import ConfigDict
+
+from app.models.account import AccountIntent, AccountType
+from app.schemas.base import StrictBase
+
+# frozen: la misma instancia se sirve desde el cache a todos los requests.
+
+class PersonProfileOut(StrictBase):
+    model_config = ConfigDict(frozen=True, from_attributes=True)
+    first_name: str
+    last_name: str
+    phone: str | None = None
+    intent: AccountIntent | None = None
+    photo_url: str | None = None
+    description: str | None = None
+    profile_score: int
+
+class CompanyProfileOut(StrictBase):
+    model_config = ConfigDict(frozen=True, from_attributes=True)
+    display_name: str
+    phone: str | None = None
+    intent: AccountIntent | None = None
+    photo_url: str | None = None
+    description: str | None = None
+    profile_score: int
+
+class AccountOut(StrictBase):
+    model_config = ConfigDict(frozen=True, from_attributes=True)
+    account_id: uuid.UUID
+    email: str
+    account_type: AccountType
+    onboarding_step: int
+    is_active: bool
+    created_at: datetime | None = None
+    profile: PersonProfileOut | CompanyProfileOut | None = None
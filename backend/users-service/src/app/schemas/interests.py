@@ -0,0 +1,55 @@
+import uuid
+
+from pydantic import Field, model_validator
+
+from app.models.interests import PropertyType
+from app.schemas.base import StrictBase
+
+# Límites del onboarding (el rango de rank lo impone también ck_interest_rank_range).
+MAX_CITY_INTERESTS = 10
+MAX_NEIGHBORHOODS_PER_CITY = 5
+
+class NeighborhoodInterestIn(StrictBase):
+    neighborhood_id: uuid.UUID
+    rank: int = Field(ge=1, le=MAX_NEIGHBORHOODS_PER_CITY)
+
+class CityInterestIn(StrictBase):
+    city_id: uuid.UUID
+    neighborhoods: list[NeighborhoodInterestIn] = Field(default_factory=list, max_length=MAX_NEIGHBORHOODS_PER_CITY)
+    property_types: list[PropertyType] = Field(default_factory=list)
+
+    @model_validator(mode="after")
+    def _unique_entries(self) -> "CityInterestIn":
+        if len({item.rank for item in self.neighborhoods}) != len(self.neighborhoods):
+            raise ValueError("neighborhood ranks must be unique per city")
+        if len({item.neighborhood_id for item in self.neighborhoods}) != len(self.neighborhoods):
+            raise ValueError("neighborhoods must be unique per city")
+        if len(set(self.property_types)) != len(self.property_types):
+            raise ValueError("property types must be unique per city")
+        return self
+
+class InterestsReplaceRequest(StrictBase):
+    """
+    Set completo de intereses del usuario: lo que no viene se borra (o se desactiva, las ciudades).
+    """
+    cities: list[CityInterestIn] = Field(default_factory=list, max_length=MAX_CITY_INTERESTS)
+
+    @model_validator(mode="after")
+    def _unique_cities(self) -> "InterestsReplaceRequest":
+        if len({item.city_id for item in self.cities}) != len(self.cities):
+            raise ValueError("cities must be unique")
+        return self
+
+class InterestsResponse(StrictBase):
+    account_id: uuid.UUID
+    cities: list[CityInterestIn]
+
+class AudienceMemberOut(StrictBase):
+    account_id: uuid.UUID
+    # Rank del barrio para ese usuario (null en audiencias por ciudad).
+    rank: int | None = None
+
+class AudiencePage(StrictBase):
+    items: list[AudienceMemberOut]
+    # Pasar como `cursor` para la página siguiente; null = no hay más.
+    next_cursor: uuid.UUID | None = None
@@ -0,0 +1,35 @@
+import uuid
+
+from app.schemas.base import StrictBase
+
+class CountryOut(StrictBase):
+    id: uuid.UUID
+    name: str
+    iso2: str
+    iso3: str
+    phone_code: str
+    currency: str
+
+class CityOut(StrictBase):
+    id: uuid.UUID
+    country_id: uuid.UUID
+    name: str
+    state_id: str
+    code: str
+    latitude: float
+    longitude: float
+    timezone: str
+
+class NeighborhoodOut(StrictBase):
+    id: uuid.UUID
+    city_id: uuid.UUID
+    name: str
+    postal_code: str | None = None
+    latitude: float
+    longitude: float
+
+class CityNearbyOut(CityOut):
+    distance_km: float
+
+class NeighborhoodNearbyOut(NeighborhoodOut):
+    distance_km: float
@@ -1,10 +1,13 @@
 import uuid
-from fastapi.concurrency import run_in_threadpool
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from sqlalchemy.exc import IntegrityError
 
 from app.core.logging.utils import email_hash
+from app.core.metrics import stage_timer
+from app.core.tracing import current_traceparent
+from app.db.errors import pg_error_details
 
 from app.models.account import(
     Account,
@@ -23,41 +26,133 @@ from app.schemas.auth import RegisterRequest
 from app.repositories.account_repository import (
     get_account_by_email, 
     create_account,
-    create_profile
+    create_profile,
+    get_account_by_email_async,
+    create_account_async,
+    create_profile_async,
+    reserve_account_email,
+    reserve_account_email_async,
+    activate_reserved_account,
+    activate_reserved_account_async,
+    release_reserved_email,
+    release_reserved_email_async,
 )
 
-from app.integrations.keycloak_client import KeycloakIntegration
+from app.core import config
+
+from app.integrations.keycloak_client import (
+    AsyncKeycloakIntegration,
+    ensure_keycloak_available,
+    get_async_keycloak_integration,
+)
 
 from app.core.exceptions.base import BaseError
 from app.core.exceptions.user import EmailAlreadyRegisteredError
-from app.core.exceptions.integrations import KeycloakDeleteAccountError
+from app.core.exceptions.integrations import KeycloakDeleteAccountError, KeycloakUnavailableError
 
 from app.core.logging.logger import get_logger
 logger = get_logger(__name__)
 
+DbSession = Session | AsyncSession
 
-async def create_account_keycloak(keycloak:KeycloakIntegration, account: RegisterRequest) -> uuid.UUID:
+# Nombre del unique sobre accounts.email: constraint por defecto de Postgres o el índice único de la migración.
+ACCOUNT_EMAIL_CONSTRAINTS = ("accounts_email_key", "ix_accounts_email")
 
-    logger.info("kc_user_create_started", extra={"extra": {"email_hash": email_hash(account.email)}})
 
-    keycloak_uuid = await run_in_threadpool(
-        keycloak.create_account_record,
-        account.email
+async def _db_commit(session: DbSession) -> None:
+    if isinstance(session, AsyncSession):
+        await session.commit()
+    else:
+        session.commit()
+
+async def _db_rollback(session: DbSession) -> None:
+    if isinstance(session, AsyncSession):
+        await session.rollback()
+    else:
+        session.rollback()
+
+async def _get_account_by_email(session: DbSession, email: str) -> Account | None:
+    if isinstance(session, AsyncSession):
+        return await get_account_by_email_async(session, email)
+    return get_account_by_email(session, email)
+
+async def _create_account(session: DbSession, account: Account) -> Account:
+    if isinstance(session, AsyncSession):
+        return await create_account_async(session, account)
+    return create_account(session, account)
+
+async def _create_profile(session: DbSession, profile: UserProfile | CompanyProfile) -> UserProfile | CompanyProfile:
+    if isinstance(session, AsyncSession):
+        return await create_profile_async(session, profile)
+    return create_profile(session, profile)
+
+async def _reserve_account_email(session: DbSession, reservation_id: uuid.UUID, account: RegisterRequest) -> bool:
+    stale_after_sec = config.REGISTER_RESERVATION_TTL_SEC
+    if isinstance(session, AsyncSession):
+        return await reserve_account_email_async(session, reservation_id, account.email, account.account_type, stale_after_sec)
+    return reserve_account_email(session, reservation_id, account.email, account.account_type, stale_after_sec)
+
+async def _release_reserved_email(session: DbSession, reservation_id: uuid.UUID) -> None:
+    if isinstance(session, AsyncSession):
+        await release_reserved_email_async(session, reservation_id)
+    else:
+        release_reserved_email(session, reservation_id)
+
+async def _activate_reserved_account(session: DbSession, reservation_id: uuid.UUID, new_user: Account, profile: UserProfile | CompanyProfile) -> bool:
+    if isinstance(session, AsyncSession):
+        return await activate_reserved_account_async(session, reservation_id, new_user, profile)
+    return activate_reserved_account(session, reservation_id, new_user, profile)
+
+def _build_profile(kc_user_id: uuid.UUID, account: RegisterRequest) -> UserProfile | CompanyProfile:
+    if account.account_type == AccountType.person:
+        return UserProfile(
+            account_id=kc_user_id,
+            first_name=account.first_name,
+            last_name=account.last_name,
+            phone=account.phone,
+            intent=getattr(account, "intent", None),
+            photo_url=getattr(account, "photo_url", None),
+            description=getattr(account, "description", None),
+            profile_score=10,
+        )
+
+    return CompanyProfile(
+        account_id=kc_user_id,
+        display_name=account.display_name,
+        phone=account.phone,
+        intent=getattr(account, "intent", None),
+        photo_url=getattr(account, "photo_url", None),
+        description=getattr(account, "description", None),
+        profile_score=10
     )
 
+
+async def create_account_keycloak(keycloak: AsyncKeycloakIntegration, account: RegisterRequest) -> uuid.UUID:
+
+    logger.info("kc_user_create_started", extra={"extra": {"email_hash": email_hash(account.email)}})
+
+    if keycloak.inline_credentials:
+        with stage_timer("kc_create_inline"):
+            keycloak_uuid = await keycloak.create_account_with_password(account.email, account.password)
+        if keycloak_uuid is not None:
+            logger.info("kc_user_create_succeeded", extra={"extra": {"kc_user_id": str(keycloak_uuid), "mode": "inline"}})
+            return keycloak_uuid
+        logger.warning("kc_inline_credentials_rejected", extra={"extra": {"email_hash": email_hash(account.email)}})
+
+    with stage_timer("kc_create_record"):
+        keycloak_uuid = await keycloak.create_account_record(account.email)
+
     try:
-        await run_in_threadpool(
-            keycloak.set_password,
-            keycloak_uuid,
-            account.password,
-        )
+        with stage_timer("kc_set_password"):
+            await keycloak.set_password(keycloak_uuid, account.password)
         logger.info("kc_user_create_succeeded", extra={"extra": {"kc_user_id": str(keycloak_uuid)}})
         return keycloak_uuid
 
     except Exception as set_pwd_exc:
         logger.warning("kc_user_set_password_failed", extra={"extra": {"kc_user_id": str(keycloak_uuid)}}, exc_info=True)
         try:
-            await run_in_threadpool(keycloak.delete_account, keycloak_uuid)
+            with stage_timer("kc_rollback_delete"):
+                await keycloak.delete_account(keycloak_uuid)
             logger.info("kc_user_delete_succeeded", extra={"extra": {"kc_user_id": str(keycloak_uuid)}})
 
         except KeycloakDeleteAccountError as delete_exc:
@@ -82,32 +177,85 @@ async def create_account_keycloak(keycloak:KeycloakIntegration, account: Registe
 
         raise
 
-def _persist_compensation_task_safe(session: Session, task: KcCompensationTask, *, log_extra: dict) -> None:
+async def _persist_compensation_task_safe(session: DbSession, task: KcCompensationTask, *, log_extra: dict) -> None:
     """
     Persiste una task de compensación con commit seguro (y rollback si el commit falla).
     """
     try:
+        task.trace_parent = task.trace_parent or current_traceparent()
         session.add(task)
-        session.commit()
+        await _db_commit(session)
     except Exception:
-        session.rollback()
+        await _db_rollback(session)
         logger.exception("kc_compensation_task_persist_failed", extra={"extra": log_extra})
 
-async def create_account_service(session: Session, account: RegisterRequest) -> Account:
-
-    logger.info("db_email_check_started", extra={"extra": {"email_hash": email_hash(account.email)}})
-    existing_account = get_account_by_email(session, account.email)
-    logger.info("db_email_check_result", extra={"extra": {"found": bool(existing_account)}})
-    if existing_account:
-        raise EmailAlreadyRegisteredError(email=account.email)
+async def _release_reservation(session: DbSession, reservation_id: uuid.UUID, account: RegisterRequest) -> None:
+    """
+    Borra la reserva de un registro fallido en una transacción propia. Si no se puede, el
+    email queda tomado hasta que un registro nuevo la recupere (REGISTER_RESERVATION_TTL_SEC).
+    """
+    try:
+        await _db_rollback(session)
+        await _release_reserved_email(session, reservation_id)
+        await _db_commit(session)
+        logger.info("db_email_reservation_released", extra={"extra": {"email_hash": email_hash(account.email)}})
+    except Exception:
+        try:
+            await _db_rollback(session)
+        except Exception:
+            pass
+        logger.exception("db_email_reservation_release_failed", extra={"extra": {"email_hash": email_hash(account.email)}})
+
+async def create_account_service(session: DbSession, account: RegisterRequest) -> Account:
+
+    reservation_id: uuid.UUID | None = None
+
+    # Con el circuito de Keycloak abierto se responde 503 antes de tocar la base.
+    ensure_keycloak_available()
+
+    if config.REGISTER_RESERVE_EMAIL:
+        # La reserva se confirma en su propia transacción antes de llamar a Keycloak: esas
+        # llamadas corren sin lock ni conexión del pool tomados. Un registro concurrente con el
+        # mismo email ve la reserva y recibe 409 sin llegar a crear otro usuario en Keycloak.
+        reservation_id = uuid.uuid4()
+        logger.info("db_email_reserve_started", extra={"extra": {"email_hash": email_hash(account.email)}})
+        with stage_timer("email_reserve"):
+            reserved = await _reserve_account_email(session, reservation_id, account)
+            if reserved:
+                await _db_commit(session)
+        logger.info("db_email_reserve_result", extra={"extra": {"reserved": reserved}})
+        if not reserved:
+            await _db_rollback(session)
+            raise EmailAlreadyRegisteredError(email=account.email)
+    else:
+        logger.info("db_email_check_started", extra={"extra": {"email_hash": email_hash(account.email)}})
+        with stage_timer("email_check"):
+            existing_account = await _get_account_by_email(session, account.email)
+        logger.info("db_email_check_result", extra={"extra": {"found": bool(existing_account)}})
+        if existing_account:
+            raise EmailAlreadyRegisteredError(email=account.email)
+
+    if reservation_id is None:
+        return await _register_account(session, account, None)
+    try:
+        return await _register_account(session, account, reservation_id)
+    except BaseException:
+        await _release_reservation(session, reservation_id, account)
+        raise
 
-    keycloak = KeycloakIntegration()
+async def _register_account(session: DbSession, account: RegisterRequest, reservation_id: uuid.UUID | None) -> Account:
+    """
+    Crea el usuario en Keycloak y después la cuenta + perfil (o activa la reserva) en una
+    transacción corta. Ante un error compensa en Keycloak.
+    """
+    keycloak = get_async_keycloak_integration()
 
     kc_user_id: uuid.UUID | None = None
 
     try:
 
-        kc_user_id = await create_account_keycloak(keycloak, account)
+        with stage_timer("keycloak"):
+            kc_user_id = await create_account_keycloak(keycloak, account)
 
         user_data = account.model_dump(exclude={"password"})
         new_user = Account(
@@ -116,41 +264,26 @@ async def create_account_service(session: Session, account: RegisterRequest) ->
             account_type=user_data["account_type"],
             onboarding_step=1
         )
-        create_account(session, new_user)
-
-        if account.account_type == AccountType.person:
-            user_profile = UserProfile(
-                account_id=kc_user_id,
-                first_name=account.first_name,
-                last_name=account.last_name,
-                phone=account.phone,
-                intent=getattr(account, "intent", None),
-                photo_url=getattr(account, "photo_url", None),
-                description=getattr(account, "description", None),
-                profile_score=10,
-            )
-            create_profile(session, user_profile)
-
-        elif account.account_type == AccountType.organization:
-            company_profile = CompanyProfile(
-                account_id=kc_user_id,
-                display_name=account.display_name,
-                phone=account.phone,
-                intent=getattr(account, "intent", None),
-                photo_url=getattr(account, "photo_url", None),
-                description=getattr(account, "description", None),
-                profile_score=10
-            )
-            create_profile(session, company_profile)
-
-        session.commit()
+        profile = _build_profile(kc_user_id, account)
+
+        with stage_timer("db_persist"):
+            if reservation_id is not None:
+                if not await _activate_reserved_account(session, reservation_id, new_user, profile):
+                    # Keycloak tardó más que REGISTER_RESERVATION_TTL_SEC y otro registro tomó el email.
+                    raise EmailAlreadyRegisteredError(email=account.email)
+            else:
+                await _create_account(session, new_user)
+                await _create_profile(session, profile)
+
+        with stage_timer("db_commit"):
+            await _db_commit(session)
         
         logger.info("account_register_ok", extra={"extra": {"kc_user_id": str(kc_user_id) if kc_user_id else None}})
         return new_user
     
     except KeycloakDeleteAccountError as kc_del_exc:
         try:
-            session.rollback()
+            await _db_rollback(session)
         except Exception:
             logger.exception("db_rollback_failed", extra={"extra": {"kc_user_id": str(kc_user_id) if kc_user_id else None}})
 
@@ -169,30 +302,29 @@ async def create_account_service(session: Session, account: RegisterRequest) ->
                 last_error=str(kc_del_exc),
                 attempts=0,
             )
-            _persist_compensation_task_safe(
+            await _persist_compensation_task_safe(
                 session,
                 task,
                 log_extra={"kc_user_id": str(leaked_kc_user_id), "email_hash": email_hash(account.email)},
             )
 
+        # Keycloak se volvió inaccesible a mitad del alta (breaker o bulkhead): el usuario queda
+        # compensado por la task y el cliente recibe el 503 con Retry-After, no un 502.
+        if isinstance(kc_del_exc.__cause__, KeycloakUnavailableError):
+            raise kc_del_exc.__cause__ from kc_del_exc
         raise
 
     except IntegrityError as db_exc:
         try:
-            session.rollback()
+            await _db_rollback(session)
         except Exception:
             logger.exception("db_rollback_failed", extra={"extra": {"kc_user_id": str(kc_user_id) if kc_user_id else None}})
 
-        orig = getattr(db_exc, "orig", None)
-        pgcode = getattr(orig, "pgcode", None)
-
-        constraint = getattr(orig, "diag", None)
-        constraint_name = getattr(constraint, "constraint_name", None)
-        column_name = getattr(constraint, "column_name", None)
+        pgcode, constraint_name, column_name = pg_error_details(db_exc)
 
         if kc_user_id:
             try:
-                await run_in_threadpool(keycloak.delete_account, kc_user_id)
+                await keycloak.delete_account(kc_user_id)
                 logger.info("kc_user_delete_succeeded", extra={"extra": {"kc_user_id": str(kc_user_id) if kc_user_id else None}})
             except Exception as kc_exc:
                 logger.error(
@@ -208,13 +340,13 @@ async def create_account_service(session: Session, account: RegisterRequest) ->
                     last_error=f"{type(kc_exc).__name__}: {str(kc_exc)[:500]}",
                     attempts=0,
                 )
-                _persist_compensation_task_safe(
+                await _persist_compensation_task_safe(
                     session,
                     task,
                     log_extra={"kc_user_id": str(kc_user_id) if kc_user_id else None, "email_hash": email_hash(account.email)},
                 )
             
-            if pgcode == "23505" and constraint_name == "accounts_email_key":
+            if pgcode == "23505" and constraint_name in ACCOUNT_EMAIL_CONSTRAINTS:
                 raise EmailAlreadyRegisteredError(email=account.email) from db_exc
             
             if pgcode == "23502":
@@ -249,13 +381,13 @@ async def create_account_service(session: Session, account: RegisterRequest) ->
         )
 
         try:
-            session.rollback()
+            await _db_rollback(session)
         except Exception:
             logger.exception("db_rollback_failed", extra={"extra": {"kc_user_id": str(kc_user_id) if kc_user_id else None}})
 
         if kc_user_id:
             try:
-                await run_in_threadpool(keycloak.delete_account, kc_user_id)
+                await keycloak.delete_account(kc_user_id)
                 logger.info("kc_user_delete_succeeded", extra={"extra": {"kc_user_id": str(kc_user_id) if kc_user_id else None}})
             except Exception as kc_exc:
                 logger.error(
@@ -271,7 +403,7 @@ async def create_account_service(session: Session, account: RegisterRequest) ->
                     last_error=f"{type(kc_exc).__name__}: {str(kc_exc)[:500]}",
                     attempts=0,
                 )
-                _persist_compensation_task_safe(
+                await _persist_compensation_task_safe(
                     session,
                     task,
                     log_extra={"kc_user_id": str(kc_user_id) if kc_user_id else None, "email_hash": email_hash(account.email)},
@@ -0,0 +1,174 @@
+import asyncio
+import hashlib
+import hmac
+import secrets
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+from pydantic import BaseModel
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core import config
+from app.core.metrics import IDEMPOTENCY_REQUESTS
+from app.core.exceptions.idempotency import IdempotencyKeyInProgressError, IdempotencyKeyMismatchError
+from app.models.idempotency import IdempotencyKey, IdempotencyStatus
+from app.repositories.idempotency_repository import (
+    claim_idempotency_key,
+    claim_idempotency_key_async,
+    get_idempotency_key,
+    get_idempotency_key_async,
+    complete_idempotency_key,
+    complete_idempotency_key_async,
+    release_idempotency_key,
+    release_idempotency_key_async,
+)
+
+from app.core.logging.logger import get_logger
+logger = get_logger(__name__)
+
+DbSession = Session | AsyncSession
+TResponse = TypeVar("TResponse", bound=BaseModel)
+
+# Backoff del poll mientras otro request tiene la key (segundos).
+POLL_MIN_SEC = 0.05
+POLL_MAX_SEC = 0.5
+
+_process_fingerprint_key: bytes | None = None
+
+
+def _fingerprint_key() -> bytes:
+    global _process_fingerprint_key
+    if config.IDEMPOTENCY_FINGERPRINT_SECRET:
+        return config.IDEMPOTENCY_FINGERPRINT_SECRET.encode()
+    if _process_fingerprint_key is None:
+        # Sin secreto configurado la clave es del proceso: un reintento en otra réplica da 422.
+        _process_fingerprint_key = secrets.token_bytes(32)
+        logger.warning("idempotency_fingerprint_secret_missing")
+    return _process_fingerprint_key
+
+def request_fingerprint(payload: BaseModel, *, secret_fields: set[str] | None = None) -> str:
+    """
+    sha256 del body serializado. Con `secret_fields` (password) es un HMAC con
+    IDEMPOTENCY_FINGERPRINT_SECRET: el secreto cuenta para el mismatch pero no se persiste
+    ni con un hash que se pueda atacar offline.
+    """
+    body = payload.model_dump_json(exclude=secret_fields).encode()
+    if not secret_fields:
+        return hashlib.sha256(body).hexdigest()
+    secret_values = payload.model_dump_json(include=secret_fields).encode()
+    return hmac.new(_fingerprint_key(), body + b"\0" + secret_values, hashlib.sha256).hexdigest()
+
+async def _db_commit(session: DbSession) -> None:
+    if isinstance(session, AsyncSession):
+        await session.commit()
+    else:
+        session.commit()
+
+async def _db_rollback(session: DbSession) -> None:
+    if isinstance(session, AsyncSession):
+        await session.rollback()
+    else:
+        session.rollback()
+
+async def _claim(session: DbSession, scope: str, key: str, request_hash: str, token: uuid.UUID) -> bool:
+    kwargs = {"lock_sec": config.IDEMPOTENCY_LOCK_SEC, "ttl_sec": config.IDEMPOTENCY_TTL_SEC}
+    if isinstance(session, AsyncSession):
+        claimed = await claim_idempotency_key_async(session, scope, key, request_hash, token, **kwargs)
+    else:
+        claimed = claim_idempotency_key(session, scope, key, request_hash, token, **kwargs)
+    await _db_commit(session)
+    return claimed
+
+async def _get(session: DbSession, scope: str, key: str) -> IdempotencyKey | None:
+    if isinstance(session, AsyncSession):
+        record = await get_idempotency_key_async(session, scope, key)
+    else:
+        record = get_idempotency_key(session, scope, key)
+    # Cierra la transacción: el próximo poll tiene que ver el estado nuevo, no el de este snapshot.
+    # Expunge antes: el rollback expiraría el objeto y leerlo dispararía un refresh (lazy IO en async).
+    if record is not None:
+        session.expunge(record)
+    await _db_rollback(session)
+    return record
+
+async def _complete(session: DbSession, scope: str, key: str, token: uuid.UUID, response_body: str) -> None:
+    if isinstance(session, AsyncSession):
+        await complete_idempotency_key_async(session, scope, key, token, response_body)
+    else:
+        complete_idempotency_key(session, scope, key, token, response_body)
+    await _db_commit(session)
+
+async def _release(session: DbSession, scope: str, key: str, token: uuid.UUID) -> None:
+    await _db_rollback(session)
+    if isinstance(session, AsyncSession):
+        await release_idempotency_key_async(session, scope, key, token)
+    else:
+        release_idempotency_key(session, scope, key, token)
+    await _db_commit(session)
+
+
+async def run_idempotent(
+    session: DbSession,
+    *,
+    scope: str,
+    key: str,
+    request_hash: str,
+    operation: Callable[[], Awaitable[object]],
+    response_model: type[TResponse],
+) -> tuple[TResponse, bool]:
+    """
+    Ejecuta `operation` una sola vez por (scope, key) dentro del TTL. Devuelve (respuesta, replayed).
+
+    Un duplicado con el intento todavía en curso espera hasta IDEMPOTENCY_WAIT_SEC (409 si no
+    termina); con el intento completado, repite la respuesta guardada. Si el intento falla, la
+    key se libera y el próximo reintento vuelve a ejecutar.
+    """
+    deadline = time.monotonic() + config.IDEMPOTENCY_WAIT_SEC
+    delay = POLL_MIN_SEC
+    waited = False
+
+    while True:
+        token = uuid.uuid4()
+        if await _claim(session, scope, key, request_hash, token):
+            break
+
+        record = await _get(session, scope, key)
+        if record is None:
+            # Se liberó (o venció) entre el claim y la lectura: reintentar el claim.
+            continue
+        if record.request_hash != request_hash:
+            IDEMPOTENCY_REQUESTS.labels(scope, "mismatch").inc()
+            raise IdempotencyKeyMismatchError(key=key)
+        if record.status == IdempotencyStatus.completed:
+            IDEMPOTENCY_REQUESTS.labels(scope, "replayed").inc()
+            logger.info("idempotency_replayed", extra={"extra": {"scope": scope, "waited": waited}})
+            return response_model.model_validate_json(record.response_body), True
+        if time.monotonic() >= deadline:
+            IDEMPOTENCY_REQUESTS.labels(scope, "in_progress").inc()
+            raise IdempotencyKeyInProgressError(key=key)
+
+        waited = True
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, POLL_MAX_SEC)
+
+    try:
+        result = await operation()
+    except BaseException:
+        try:
+            await _release(session, scope, key, token)
+        except Exception:
+            # El lease vence solo (IDEMPOTENCY_LOCK_SEC); después otro reintento puede tomar la key.
+            logger.exception("idempotency_release_failed", extra={"extra": {"scope": scope}})
+        raise
+
+    response = response_model.model_validate(result)
+    IDEMPOTENCY_REQUESTS.labels(scope, "executed").inc()
+    try:
+        await _complete(session, scope, key, token, response.model_dump_json())
+    except Exception:
+        # La operación ya quedó hecha: responder igual; un reintento tras el lease la re-ejecuta.
+        logger.exception("idempotency_complete_failed", extra={"extra": {"scope": scope}})
+    return response, False
@@ -0,0 +1,213 @@
+import time
+import uuid
+
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.exceptions.base import BaseError
+from app.core.exceptions.interests import InterestRankConflictError, InvalidInterestLocationError
+from app.core.exceptions.location import LocationCatalogUnavailableError
+from app.core.exceptions.user import AccountNotFoundError
+from app.db.errors import FOREIGN_KEY_VIOLATION, UNIQUE_VIOLATION, pg_error_details, pg_error_key
+from app.models.interests import PropertyType
+from app.repositories.interest_repository import (
+    RANK_CONSTRAINT,
+    list_city_audience,
+    list_city_audience_async,
+    list_neighborhood_audience,
+    list_neighborhood_audience_async,
+    list_interest_rows,
+    list_interest_rows_async,
+    lock_account,
+    lock_account_async,
+    replace_interests,
+    replace_interests_async,
+)
+from app.schemas.interests import (
+    AudienceMemberOut,
+    AudiencePage,
+    CityInterestIn,
+    InterestsReplaceRequest,
+    InterestsResponse,
+    NeighborhoodInterestIn,
+)
+from app.services.location_catalog import location_catalog
+
+from app.core.logging.logger import get_logger
+logger = get_logger(__name__)
+
+DbSession = Session | AsyncSession
+
+# FKs a catálogo: ids que el catálogo en memoria (si estaba cargado) todavía no conocía.
+LOCATION_FOREIGN_KEYS = {
+    "user_interest_city_id_fkey": "city",
+    "user_neighborhood_interest_neighborhood_id_fkey": "neighborhood",
+}
+
+
+async def _db_commit(session: DbSession) -> None:
+    if isinstance(session, AsyncSession):
+        await session.commit()
+    else:
+        session.commit()
+
+async def _db_rollback(session: DbSession) -> None:
+    if isinstance(session, AsyncSession):
+        await session.rollback()
+    else:
+        session.rollback()
+
+async def _lock_account(session: DbSession, account_id: uuid.UUID) -> bool:
+    if isinstance(session, AsyncSession):
+        return await lock_account_async(session, account_id)
+    return lock_account(session, account_id)
+
+async def _replace_interests(session: DbSession, account_id: uuid.UUID, city_ids, neighborhoods, property_types) -> int:
+    if isinstance(session, AsyncSession):
+        return await replace_interests_async(session, account_id, city_ids, neighborhoods, property_types)
+    return replace_interests(session, account_id, city_ids, neighborhoods, property_types)
+
+async def _list_interest_rows(session: DbSession, account_id: uuid.UUID) -> list:
+    if isinstance(session, AsyncSession):
+        return await list_interest_rows_async(session, account_id)
+    return list_interest_rows(session, account_id)
+
+async def _list_audience(session: DbSession, kind: str, location_id: uuid.UUID, **kwargs) -> list:
+    if kind == "neighborhood":
+        if isinstance(session, AsyncSession):
+            return await list_neighborhood_audience_async(session, location_id, **kwargs)
+        return list_neighborhood_audience(session, location_id, **kwargs)
+    if isinstance(session, AsyncSession):
+        return await list_city_audience_async(session, location_id, **kwargs)
+    return list_city_audience(session, location_id, **kwargs)
+
+
+def _validate_locations(payload: InterestsReplaceRequest) -> None:
+    """
+    Valida ciudades y barrios contra el catálogo en memoria (sin ir a la base). Si el catálogo
+    no está cargado, quedan las FKs: un id inexistente falla igual, al escribir.
+    """
+    try:
+        snapshot = location_catalog.snapshot
+    except LocationCatalogUnavailableError:
+        return
+    for city in payload.cities:
+        if city.city_id not in snapshot.cities_by_id:
+            raise InvalidInterestLocationError(kind="city", location_id=str(city.city_id))
+        for item in city.neighborhoods:
+            neighborhood = snapshot.neighborhoods_by_id.get(item.neighborhood_id)
+            if neighborhood is None or neighborhood.city_id != city.city_id:
+                raise InvalidInterestLocationError(
+                    kind="neighborhood", location_id=str(item.neighborhood_id), city_id=str(city.city_id)
+                )
+
+def _normalize(payload: InterestsReplaceRequest):
+    city_ids = [city.city_id for city in payload.cities]
+    neighborhoods = [
+        (city.city_id, item.neighborhood_id, item.rank)
+        for city in payload.cities
+        for item in city.neighborhoods
+    ]
+    property_types = [
+        (city.city_id, property_type)
+        for city in payload.cities
+        for property_type in city.property_types
+    ]
+    return city_ids, neighborhoods, property_types
+
+def _integrity_error(db_exc: IntegrityError, account_id: uuid.UUID) -> BaseError | None:
+    """
+    Error de dominio para las violaciones esperables; None para las demás (se re-lanzan).
+    """
+    pgcode, constraint_name, _ = pg_error_details(db_exc)
+    if pgcode == FOREIGN_KEY_VIOLATION and constraint_name in LOCATION_FOREIGN_KEYS:
+        _, location_id = pg_error_key(db_exc)
+        return InvalidInterestLocationError(kind=LOCATION_FOREIGN_KEYS[constraint_name], location_id=str(location_id))
+    if pgcode == UNIQUE_VIOLATION and constraint_name == RANK_CONSTRAINT:
+        return InterestRankConflictError(account_id=str(account_id))
+    return None
+
+def _response(account_id: uuid.UUID, cities: list[CityInterestIn]) -> InterestsResponse:
+    return InterestsResponse(
+        account_id=account_id,
+        cities=[
+            city.model_copy(update={"neighborhoods": sorted(city.neighborhoods, key=lambda item: item.rank)})
+            for city in cities
+        ],
+    )
+
+
+async def replace_interests_service(session: DbSession, account_id: uuid.UUID, payload: InterestsReplaceRequest) -> InterestsResponse:
+    """
+    Reemplaza el set completo de intereses de la cuenta en una transacción, con una cantidad
+    fija de sentencias (upserts y DELETE ... NOT IN por set, no por fila).
+    """
+    _validate_locations(payload)
+    city_ids, neighborhoods, property_types = _normalize(payload)
+    started = time.perf_counter()
+
+    try:
+        if not await _lock_account(session, account_id):
+            raise AccountNotFoundError(account_id=str(account_id))
+        statements = await _replace_interests(session, account_id, city_ids, neighborhoods, property_types)
+        # El unique de rank (diferido) se valida acá.
+        await _db_commit(session)
+    except IntegrityError as db_exc:
+        await _db_rollback(session)
+        error = _integrity_error(db_exc, account_id)
+        if error is None:
+            raise
+        raise error from db_exc
+    except BaseException:
+        await _db_rollback(session)
+        raise
+
+    logger.info(
+        "interests_replaced",
+        extra={"extra": {
+            "account_id": str(account_id),
+            "cities": len(city_ids),
+            "neighborhoods": len(neighborhoods),
+            "property_types": len(property_types),
+            "statements": statements + 2,  # + lock de la cuenta y commit
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }},
+    )
+    return _response(account_id, payload.cities)
+
+async def get_interests_service(session: DbSession, account_id: uuid.UUID) -> InterestsResponse:
+    rows = await _list_interest_rows(session, account_id)
+    await _db_rollback(session)
+
+    cities: dict[uuid.UUID, CityInterestIn] = {}
+    for city_id, neighborhood_id, rank, property_type in rows:
+        city = cities.setdefault(city_id, CityInterestIn(city_id=city_id))
+        if neighborhood_id is not None:
+            city.neighborhoods.append(NeighborhoodInterestIn(neighborhood_id=neighborhood_id, rank=rank))
+        elif property_type is not None:
+            city.property_types.append(PropertyType(property_type))
+    return _response(account_id, list(cities.values()))
+
+async def audience_service(
+    session: DbSession,
+    *,
+    kind: str,
+    location_id: uuid.UUID,
+    property_type: PropertyType | None,
+    cursor: uuid.UUID | None,
+    limit: int,
+) -> AudiencePage:
+    """
+    Página de cuentas activas interesadas en una ciudad o barrio (`kind`), opcionalmente
+    filtradas por tipo de propiedad. Keyset: el costo no crece con el número de página.
+    """
+    # Una fila de más para saber si hay página siguiente sin un COUNT.
+    rows = await _list_audience(session, kind, location_id, property_type=property_type, after=cursor, limit=limit + 1)
+    await _db_rollback(session)
+
+    page = rows[:limit]
+    return AudiencePage(
+        items=[AudienceMemberOut(account_id=account_id, rank=rank) for _, account_id, rank in page],
+        next_cursor=page[-1][0] if len(rows) > limit else None,
+    )
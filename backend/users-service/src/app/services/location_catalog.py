@@ -0,0 +1,283 @@
+import hashlib
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+from pydantic_core import to_json
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+from app.api.deps.db import worker_engine
+from app.core import config
+from app.core.exceptions.location import LocationCatalogUnavailableError, LocationNotFoundError
+from app.core.metrics import LOCATION_CATALOG_VERSION
+from app.repositories.location_repository import (
+    list_active_cities,
+    list_active_countries,
+    list_active_neighborhoods,
+)
+from app.services.spatial_index import SpatialIndex
+from app.workers.notifications import NotificationListener, supports_listen
+
+from app.core.logging.logger import get_logger
+logger = get_logger(__name__)
+
+# Canal del trigger location_catalog_notify (migración c7d2e5a1f843).
+NOTIFY_CHANNEL = "location_catalog"
+# Granularidad de la espera del hilo de recarga (revisa stop y notificaciones).
+WAIT_SLICE_SEC = 1.0
+# Agrupa ráfagas de cambios (p. ej. una carga masiva de barrios) en una sola recarga.
+NOTIFY_DEBOUNCE_SEC = 0.5
+
+
+class CountryEntry(NamedTuple):
+    id: uuid.UUID
+    name: str
+    iso2: str
+    iso3: str
+    phone_code: str
+    currency: str
+
+class CityEntry(NamedTuple):
+    id: uuid.UUID
+    country_id: uuid.UUID
+    name: str
+    state_id: str
+    code: str
+    latitude: float
+    longitude: float
+    timezone: str
+
+class NeighborhoodEntry(NamedTuple):
+    id: uuid.UUID
+    city_id: uuid.UUID
+    name: str
+    postal_code: str | None
+    latitude: float
+    longitude: float
+
+
+def _group(entries, key: str) -> dict[uuid.UUID, tuple]:
+    grouped: dict[uuid.UUID, list] = {}
+    for entry in entries:
+        grouped.setdefault(getattr(entry, key), []).append(entry)
+    return {parent_id: tuple(children) for parent_id, children in grouped.items()}
+
+def _json(entries) -> bytes:
+    return to_json([entry._asdict() for entry in entries])
+
+def _spatial_index(entries) -> SpatialIndex:
+    return SpatialIndex(entries, [entry.latitude for entry in entries], [entry.longitude for entry in entries])
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogSnapshot:
+    """
+    Foto inmutable del catálogo activo. Se reemplaza entera en cada recarga; los lectores
+    nunca ven un estado a medio armar y no necesitan lock.
+    """
+
+    version: int
+    etag: str
+    loaded_at: datetime
+    countries: tuple[CountryEntry, ...]
+    countries_by_id: dict[uuid.UUID, CountryEntry]
+    cities_by_id: dict[uuid.UUID, CityEntry]
+    neighborhoods_by_id: dict[uuid.UUID, NeighborhoodEntry]
+    cities_by_country: dict[uuid.UUID, tuple[CityEntry, ...]]
+    neighborhoods_by_city: dict[uuid.UUID, tuple[NeighborhoodEntry, ...]]
+    # Respuestas JSON ya serializadas: los endpoints devuelven bytes sin tocar la base.
+    countries_json: bytes
+    cities_json: dict[uuid.UUID, bytes]
+    neighborhoods_json: dict[uuid.UUID, bytes]
+    # Índices espaciales (kNN / radio) sobre las coordenadas, armados una vez por versión.
+    city_index: SpatialIndex[CityEntry]
+    neighborhood_index: SpatialIndex[NeighborhoodEntry]
+
+
+def build_snapshot(countries, cities, neighborhoods, previous: CatalogSnapshot | None = None) -> CatalogSnapshot:
+    """
+    Arma el snapshot a partir de las filas activas. Si el contenido no cambió respecto de
+    `previous`, devuelve `previous` (misma versión y ETag).
+    """
+    countries = tuple(CountryEntry(*row) for row in countries)
+    cities = tuple(CityEntry(*row) for row in cities)
+    neighborhoods = tuple(NeighborhoodEntry(*row) for row in neighborhoods)
+
+    cities_by_country = _group(cities, "country_id")
+    neighborhoods_by_city = _group(neighborhoods, "city_id")
+    countries_json = _json(countries)
+    cities_json = {country_id: _json(entries) for country_id, entries in cities_by_country.items()}
+    neighborhoods_json = {city_id: _json(entries) for city_id, entries in neighborhoods_by_city.items()}
+
+    digest = hashlib.sha256(countries_json)
+    for payloads in (cities_json, neighborhoods_json):
+        for parent_id in sorted(payloads):
+            digest.update(parent_id.bytes)
+            digest.update(payloads[parent_id])
+    etag = f'"{digest.hexdigest()[:32]}"'
+
+    if previous is not None and previous.etag == etag:
+        return previous
+
+    return CatalogSnapshot(
+        version=previous.version + 1 if previous is not None else 1,
+        etag=etag,
+        loaded_at=datetime.now(timezone.utc),
+        countries=countries,
+        countries_by_id={entry.id: entry for entry in countries},
+        cities_by_id={entry.id: entry for entry in cities},
+        neighborhoods_by_id={entry.id: entry for entry in neighborhoods},
+        cities_by_country=cities_by_country,
+        neighborhoods_by_city=neighborhoods_by_city,
+        countries_json=countries_json,
+        cities_json=cities_json,
+        neighborhoods_json=neighborhoods_json,
+        city_index=_spatial_index(cities),
+        neighborhood_index=_spatial_index(neighborhoods),
+    )
+
+
+class LocationCatalog:
+    """
+    Catálogo country/city/neighborhood en memoria del proceso.
+
+    Se carga al arrancar y un hilo lo recarga cada LOCATION_CATALOG_REFRESH_SEC o apenas
+    llega un NOTIFY de cambio (LOCATION_CATALOG_LISTEN). Las lecturas no usan el pool de la API.
+    """
+
+    def __init__(
+        self,
+        engine: Engine = worker_engine,
+        *,
+        refresh_sec: float = config.LOCATION_CATALOG_REFRESH_SEC,
+        listen: bool = config.LOCATION_CATALOG_LISTEN,
+    ):
+        self.engine = engine
+        self.refresh_sec = refresh_sec
+        self.listen = listen
+        self._snapshot: CatalogSnapshot | None = None
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def snapshot(self) -> CatalogSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None:
+            raise LocationCatalogUnavailableError()
+        return snapshot
+
+    def reload(self) -> bool:
+        """
+        Relee las tablas y publica un snapshot nuevo. True si cambió el contenido.
+        """
+        with self._reload_lock:
+            started = time.perf_counter()
+            with Session(self.engine) as session:
+                countries = list_active_countries(session)
+                cities = list_active_cities(session)
+                neighborhoods = list_active_neighborhoods(session)
+            previous = self._snapshot
+            snapshot = build_snapshot(countries, cities, neighborhoods, previous)
+            self._snapshot = snapshot
+
+        changed = snapshot is not previous
+        if changed:
+            LOCATION_CATALOG_VERSION.set(snapshot.version)
+            logger.info(
+                "location_catalog_loaded",
+                extra={"extra": {
+                    "version": snapshot.version,
+                    "countries": len(snapshot.countries),
+                    "cities": len(snapshot.cities_by_id),
+                    "neighborhoods": len(snapshot.neighborhoods_by_id),
+                    "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+                }},
+            )
+        return changed
+
+    def start(self) -> None:
+        try:
+            self.reload()
+        except Exception:
+            # Sin catálogo los endpoints responden 503; el hilo reintenta en el próximo ciclo.
+            logger.exception("location_catalog_load_failed")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._refresh_loop, name="location-catalog-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _refresh_loop(self) -> None:
+        listener = None
+        if self.listen and supports_listen(self.engine):
+            listener = NotificationListener(self.engine, NOTIFY_CHANNEL)
+        try:
+            while not self._stop.is_set():
+                self._wait_for_change(listener)
+                if self._stop.is_set():
+                    break
+                try:
+                    self.reload()
+                except Exception:
+                    logger.exception("location_catalog_load_failed")
+        finally:
+            if listener is not None:
+                listener.close()
+
+    def _wait_for_change(self, listener: NotificationListener | None) -> None:
+        deadline = time.monotonic() + self.refresh_sec
+        while not self._stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            if listener is None:
+                self._stop.wait(min(remaining, WAIT_SLICE_SEC))
+                continue
+            if listener.wait(min(remaining, WAIT_SLICE_SEC)):
+                self._stop.wait(NOTIFY_DEBOUNCE_SEC)
+                listener.drain()
+                return
+
+    # Lecturas
+
+    def countries(self) -> tuple[CountryEntry, ...]:
+        return self.snapshot.countries
+
+    def cities(self, country_id: uuid.UUID) -> tuple[CityEntry, ...]:
+        snapshot = self.snapshot
+        if country_id not in snapshot.countries_by_id:
+            raise LocationNotFoundError(kind="country", location_id=str(country_id))
+        return snapshot.cities_by_country.get(country_id, ())
+
+    def neighborhoods(self, city_id: uuid.UUID) -> tuple[NeighborhoodEntry, ...]:
+        snapshot = self.snapshot
+        if city_id not in snapshot.cities_by_id:
+            raise LocationNotFoundError(kind="city", location_id=str(city_id))
+        return snapshot.neighborhoods_by_city.get(city_id, ())
+
+    def get_country(self, country_id: uuid.UUID) -> CountryEntry | None:
+        return self.snapshot.countries_by_id.get(country_id)
+
+    def get_city(self, city_id: uuid.UUID) -> CityEntry | None:
+        return self.snapshot.cities_by_id.get(city_id)
+
+    def get_neighborhood(self, neighborhood_id: uuid.UUID) -> NeighborhoodEntry | None:
+        return self.snapshot.neighborhoods_by_id.get(neighborhood_id)
+
+    def nearest_cities(self, lat: float, lon: float, k: int, *, max_km: float | None = None) -> list[tuple[CityEntry, float]]:
+        return self.snapshot.city_index.nearest(lat, lon, k, max_km=max_km)
+
+    def nearest_neighborhoods(self, lat: float, lon: float, k: int, *, max_km: float | None = None) -> list[tuple[NeighborhoodEntry, float]]:
+        return self.snapshot.neighborhood_index.nearest(lat, lon, k, max_km=max_km)
+
+
+location_catalog = LocationCatalog()
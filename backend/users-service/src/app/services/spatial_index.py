@@ -0,0 +1,173 @@
+import bisect
+import math
+from collections.abc import Sequence
+from typing import Generic, TypeVar
+
+try:
+    import numpy as np
+except ImportError:  # extra opcional: uv sync --extra spatial
+    np = None
+
+T = TypeVar("T")
+
+EARTH_RADIUS_KM = 6371.0088
+HALF_CIRCUMFERENCE_KM = math.pi * EARTH_RADIUS_KM
+# Radio inicial del kNN; se multiplica por 4 hasta juntar k candidatos.
+KNN_START_KM = 10.0
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = math.sin((phi2 - phi1) / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class SpatialIndex(Generic[T]):
+    """
+    Índice inmutable de puntos (lat/lon en grados) para k-vecinos y búsqueda por radio,
+    con distancia de gran círculo.
+
+    Los puntos se ordenan por latitud: una consulta de radio solo mira la franja
+    [lat - r, lat + r] (bisect) y el kNN agranda el radio hasta juntar k puntos. Con numpy
+    la franja se evalúa vectorizada (vectores unitarios, producto escalar); sin numpy,
+    con haversine en Python sobre los candidatos de la franja.
+    """
+
+    def __init__(self, items: Sequence[T], latitudes: Sequence[float], longitudes: Sequence[float], *, backend: str = "auto"):
+        if backend == "auto":
+            backend = "numpy" if np is not None else "python"
+        if backend == "numpy" and np is None:
+            raise RuntimeError("numpy no está instalado (uv sync --extra spatial)")
+        self.backend = backend
+        self.items = tuple(items)
+
+        if backend == "numpy":
+            lat = np.asarray(latitudes, dtype=np.float64)
+            order = np.argsort(lat, kind="stable")
+            self._order = order
+            self._lat_sorted = lat[order]
+            self._lon_sorted = np.asarray(longitudes, dtype=np.float64)[order]
+            phi, lam = np.radians(self._lat_sorted), np.radians(self._lon_sorted)
+            self._xyz = np.column_stack((np.cos(phi) * np.cos(lam), np.cos(phi) * np.sin(lam), np.sin(phi)))
+        else:
+            order = sorted(range(len(self.items)), key=latitudes.__getitem__)
+            self._order = order
+            self._lat_sorted = [latitudes[i] for i in order]
+            self._lon_sorted = [longitudes[i] for i in order]
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def nearest(self, lat: float, lon: float, k: int, *, max_km: float | None = None) -> list[tuple[T, float]]:
+        """
+        Hasta `k` items más cercanos (y a no más de `max_km`, si se indica), del más cercano
+        al más lejano, como (item, distancia_km).
+        """
+        if k <= 0 or not self.items:
+            return []
+        within = self._within_numpy if self.backend == "numpy" else self._within_python
+        limit_km = min(max_km, HALF_CIRCUMFERENCE_KM) if max_km is not None else HALF_CIRCUMFERENCE_KM
+        radius_km = limit_km if max_km is not None else min(KNN_START_KM, limit_km)
+        while True:
+            # Todo lo que está dentro del radio es exacto: si ya hay k, son los k más cercanos.
+            found = within(lat, lon, radius_km)
+            if len(found) >= k or radius_km >= limit_km:
+                break
+            radius_km = min(radius_km * 4, limit_km)
+        return found.top(k)
+
+    def within(self, lat: float, lon: float, radius_km: float, *, limit: int | None = None) -> list[tuple[T, float]]:
+        """
+        Items a no más de `radius_km`, ordenados por distancia (cortado en `limit`).
+        """
+        return self.nearest(lat, lon, limit if limit is not None else len(self.items), max_km=radius_km)
+
+    @staticmethod
+    def _band(lat: float, radius_km: float) -> tuple[float, float, float]:
+        """
+        (lat mínima, lat máxima, delta de longitud) que contienen el círculo. Cerca de los
+        polos la franja de longitud no sirve y se revisa el anillo completo (360).
+        """
+        delta_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+        max_lat = abs(lat) + delta_lat
+        delta_lon = math.degrees(radius_km / (EARTH_RADIUS_KM * math.cos(math.radians(max_lat)))) if max_lat < 89.0 else 360.0
+        return lat - delta_lat, lat + delta_lat, delta_lon
+
+    # numpy
+
+    def _within_numpy(self, lat: float, lon: float, radius_km: float) -> "_NumpyMatches":
+        lat_min, lat_max, _ = self._band(lat, radius_km)
+        lo = int(np.searchsorted(self._lat_sorted, lat_min, side="left"))
+        hi = int(np.searchsorted(self._lat_sorted, lat_max, side="right"))
+        phi, lam = math.radians(lat), math.radians(lon)
+        query = np.array((math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi)))
+        # Producto escalar = coseno del ángulo central: más grande, más cerca.
+        dots = self._xyz[lo:hi] @ query
+        if radius_km < HALF_CIRCUMFERENCE_KM:
+            positions = np.flatnonzero(dots >= math.cos(radius_km / EARTH_RADIUS_KM))
+            return _NumpyMatches(self, lat, lon, lo + positions, dots[positions])
+        return _NumpyMatches(self, lat, lon, lo + np.arange(hi - lo), dots)
+
+    # Python puro
+
+    def _within_python(self, lat: float, lon: float, radius_km: float) -> "_PythonMatches":
+        lat_min, lat_max, delta_lon = self._band(lat, radius_km)
+        lo = bisect.bisect_left(self._lat_sorted, lat_min)
+        hi = bisect.bisect_right(self._lat_sorted, lat_max)
+
+        found = []
+        for position in range(lo, hi):
+            other_lon = self._lon_sorted[position]
+            if delta_lon < 180.0 and abs((other_lon - lon + 180.0) % 360.0 - 180.0) > delta_lon:
+                continue
+            distance = haversine_km(lat, lon, self._lat_sorted[position], other_lon)
+            if distance <= radius_km:
+                found.append((self._order[position], distance))
+        return _PythonMatches(self, found)
+
+
+class _PythonMatches:
+    __slots__ = ("_index", "_found")
+
+    def __init__(self, index: SpatialIndex, found: list[tuple[int, float]]):
+        self._index = index
+        self._found = found
+
+    def __len__(self) -> int:
+        return len(self._found)
+
+    def top(self, k: int) -> list:
+        items = self._index.items
+        return [(items[i], distance) for i, distance in sorted(self._found, key=lambda pair: pair[1])[:k]]
+
+
+class _NumpyMatches:
+    __slots__ = ("_index", "_lat", "_lon", "_positions", "_dots")
+
+    def __init__(self, index: SpatialIndex, lat: float, lon: float, positions, dots):
+        self._index = index
+        self._lat = lat
+        self._lon = lon
+        self._positions = positions
+        self._dots = dots
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def top(self, k: int) -> list:
+        dots = self._dots
+        if len(dots) == 0:
+            return []
+        top = np.argpartition(dots, -k)[-k:] if k < len(dots) else np.arange(len(dots))
+        top = top[np.argsort(-dots[top], kind="stable")]
+        positions = self._positions[top]
+
+        # Distancia final con haversine (arccos pierde precisión a pocos metros).
+        index = self._index
+        phi, lam = math.radians(self._lat), math.radians(self._lon)
+        lat2, lon2 = np.radians(index._lat_sorted[positions]), np.radians(index._lon_sorted[positions])
+        a = np.sin((lat2 - phi) / 2) ** 2 + math.cos(phi) * np.cos(lat2) * np.sin((lon2 - lam) / 2) ** 2
+        distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+        items = index.items
+        return [(items[i], distance) for i, distance in zip(index._order[positions].tolist(), distances.tolist())]
@@ -0,0 +1,62 @@
+import uuid
+
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.cache import account_cache
+from app.core.exceptions.user import AccountNotFoundError
+from app.repositories.account_repository import (
+    RESERVED_ONBOARDING_STEP,
+    get_account_with_profile,
+    get_account_with_profile_async,
+)
+from app.schemas.account import AccountOut, CompanyProfileOut, PersonProfileOut
+
+DbSession = Session | AsyncSession
+
+
+async def _db_rollback(session: DbSession) -> None:
+    if isinstance(session, AsyncSession):
+        await session.rollback()
+    else:
+        session.rollback()
+
+async def _get_account_with_profile(session: DbSession, account_id: uuid.UUID):
+    if isinstance(session, AsyncSession):
+        return await get_account_with_profile_async(session, account_id)
+    return get_account_with_profile(session, account_id)
+
+
+def _account_out(row) -> AccountOut | None:
+    account, user_profile, company_profile = row
+    # Una reserva todavía sin usuario en Keycloak no es una cuenta (y no se cachea).
+    if account.onboarding_step == RESERVED_ONBOARDING_STEP:
+        return None
+    if user_profile is not None:
+        profile = PersonProfileOut.model_validate(user_profile)
+    elif company_profile is not None:
+        profile = CompanyProfileOut.model_validate(company_profile)
+    else:
+        profile = None
+    return AccountOut.model_validate(account).model_copy(update={"profile": profile})
+
+
+async def get_account_service(session: DbSession, account_id: uuid.UUID) -> AccountOut:
+    """
+    Cuenta + perfil. Desde account_cache si está; si no, una consulta (con join al perfil)
+    y se cachea. En un hit no se toma conexión: la sesión solo conecta al ejecutar.
+    """
+    cached = account_cache.get(account_id)
+    if cached is not None:
+        return cached
+
+    token = account_cache.load_token()
+    row = await _get_account_with_profile(session, account_id)
+    # El modelo de salida se arma antes del rollback: después los objetos quedan expirados.
+    result = _account_out(row) if row is not None else None
+    await _db_rollback(session)
+    if result is None:
+        raise AccountNotFoundError(account_id=str(account_id))
+
+    account_cache.set(account_id, result, token=token)
+    return result
@@ -0,0 +1,99 @@
+"""
+Worker de compensaciones Keycloak como proceso independiente de la API.
+
+    python -m app.workers
+
+Procesa KcCompensationTask cada KC_COMPENSATION_INTERVAL_SEC y, con
+KC_COMPENSATION_LISTEN, también apenas llega un NOTIFY de una task nueva.
+Cada KC_TASK_ARCHIVE_INTERVAL_SEC archiva las tasks done (retención) y cada
+IDEMPOTENCY_PURGE_INTERVAL_SEC borra las Idempotency-Key vencidas.
+SIGTERM/SIGINT terminan el lote en curso, liberan los clientes y salen.
+"""
+import signal
+import threading
+import time
+
+from app.core import config
+from app.core.logging.logger import get_logger, setup_logging
+from app.core.tracing import setup_tracing
+from app.integrations.keycloak_client import keycloak_provider
+from app.workers.idempotency import _run_purge_sync
+from app.workers.keycloak_tasks import WORKER_ID, _run_archive_sync, _run_job_sync
+from app.workers.notifications import CompensationTaskListener, supports_listen
+from app.api.deps.db import worker_engine
+
+logger = get_logger(__name__)
+
+# Granularidad de la espera: cada cuánto se revisa la señal de apagado.
+WAIT_SLICE_SEC = 1.0
+
+
+def _wait_for_next_run(stop: threading.Event, listener: CompensationTaskListener | None) -> None:
+    """
+    Espera hasta el próximo poll por intervalo o hasta una notificación de task nueva.
+    """
+    deadline = time.monotonic() + config.KC_COMPENSATION_INTERVAL_SEC
+    while not stop.is_set():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        if listener is None:
+            stop.wait(min(remaining, WAIT_SLICE_SEC))
+            continue
+        if listener.wait(min(remaining, WAIT_SLICE_SEC)):
+            # Agrupa inserts en ráfaga en una sola corrida.
+            stop.wait(config.KC_COMPENSATION_NOTIFY_DEBOUNCE_SEC)
+            listener.drain()
+            logger.info("compensation_worker_woken_by_notify")
+            return
+
+
+def main() -> None:
+    setup_logging()
+    setup_tracing()
+    stop = threading.Event()
+
+    def _request_shutdown(signum, frame):
+        logger.info("compensation_worker_shutdown_requested", extra={"extra": {"signal": signal.Signals(signum).name}})
+        stop.set()
+
+    signal.signal(signal.SIGTERM, _request_shutdown)
+    signal.signal(signal.SIGINT, _request_shutdown)
+
+    logger.info(
+        "compensation_worker_started",
+        extra={"extra": {"worker_id": WORKER_ID, "interval_sec": config.KC_COMPENSATION_INTERVAL_SEC}},
+    )
+
+    listener = CompensationTaskListener() if config.KC_COMPENSATION_LISTEN and supports_listen(worker_engine) else None
+    next_archive_at = time.monotonic()
+    next_purge_at = time.monotonic()
+
+    while not stop.is_set():
+        try:
+            _run_job_sync(stop)
+        except Exception:
+            logger.exception("compensation_run_failed")
+        if time.monotonic() >= next_archive_at:
+            try:
+                _run_archive_sync(stop)
+            except Exception:
+                logger.exception("kc_task_archive_run_failed")
+            next_archive_at = time.monotonic() + config.KC_TASK_ARCHIVE_INTERVAL_SEC
+        if time.monotonic() >= next_purge_at:
+            try:
+                _run_purge_sync(stop)
+            except Exception:
+                logger.exception("idempotency_purge_run_failed")
+            next_purge_at = time.monotonic() + config.IDEMPOTENCY_PURGE_INTERVAL_SEC
+        _wait_for_next_run(stop, listener)
+
+    if listener is not None:
+        listener.close()
+    keycloak_provider.close()
+    worker_engine.dispose()
+    logger.info("compensation_worker_stopped", extra={"extra": {"worker_id": WORKER_ID}})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import asyncio
+import threading
+import time
+
+from sqlmodel import Session
+
+from app.api.deps.db import worker_engine
+from app.core import config
+from app.repositories.idempotency_repository import purge_expired_idempotency_keys
+
+from app.core.logging.logger import get_logger
+logger = get_logger(__name__)
+
+PURGE_BATCH_SIZE = 1000
+TIME_BUDGET_SEC = config.KC_COMPENSATION_TIME_BUDGET_SEC
+
+
+async def run_purge_job() -> None:
+    await asyncio.to_thread(_run_purge_sync)
+
+def _run_purge_sync(stop: threading.Event | None = None) -> None:
+    with Session(worker_engine) as session:
+        purge_expired_keys(session, stop=stop)
+
+def purge_expired_keys(
+    session: Session,
+    *,
+    batch_size: int = PURGE_BATCH_SIZE,
+    time_budget_sec: float = TIME_BUDGET_SEC,
+    stop: threading.Event | None = None,
+) -> int:
+    """
+    Borra por lotes las Idempotency-Key vencidas (TTL). Retorna cuántas borró.
+    """
+    deadline = time.monotonic() + time_budget_sec
+    purged = 0
+
+    while True:
+        try:
+            deleted = purge_expired_idempotency_keys(session, batch_size=batch_size)
+        except Exception as db_err:
+            session.rollback()
+            logger.error("idempotency_purge_failed", extra={"extra": {"purged": purged, "db_err": db_err}})
+            break
+
+        purged += deleted
+        if deleted < batch_size or time.monotonic() >= deadline:
+            break
+        if stop is not None and stop.is_set():
+            break
+
+    logger.info("idempotency_purge_finished", extra={"extra": {"purged": purged}})
+    return purged
@@ -1,15 +1,26 @@
 import asyncio
+import contextvars
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from sqlmodel import Session, select
+from sqlalchemy import delete, func, insert, or_, update
 from datetime import datetime, timedelta
 import random
 
 from keycloak.exceptions import KeycloakGetError
 
-from app.models.kc_tasks import KcCompensationTask, KcTaskStatus
-from app.integrations.keycloak_client import KeycloakIntegration
+from app.models.kc_tasks import KcCompensationTask, KcCompensationTaskArchive, KcTaskStatus
+from app.integrations.keycloak_client import get_keycloak_integration, keycloak_breaker, keycloak_circuit_open
+from app.core.exceptions.integrations import KeycloakUnavailableError
 
 from sqlmodel import Session
-from app.api.deps.db import engine
+from app.api.deps.db import worker_engine
+from app.core import config
+from app.core.tracing import start_span
 
 
 from app.core.logging.logger import get_logger
@@ -18,75 +29,255 @@ logger = get_logger(__name__)
 MAX_ATTEMPTS = 5
 BATCH_SIZE = 25
 MAX_DELAY_MIN = 60
+CONCURRENCY = config.KC_COMPENSATION_CONCURRENCY
+TIME_BUDGET_SEC = config.KC_COMPENSATION_TIME_BUDGET_SEC
+LEASE_SEC = config.KC_COMPENSATION_LEASE_SEC
+RETENTION_DAYS = config.KC_TASK_RETENTION_DAYS
+ARCHIVE_BATCH_SIZE = config.KC_TASK_ARCHIVE_BATCH_SIZE
+
+# Identifica a este proceso como dueño de los leases que reclama.
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
 
 
 async def run_job() -> None:
     await asyncio.to_thread(_run_job_sync)
 
-def _run_job_sync() -> None:
-    with Session(engine) as session:
-        retry_keycloak_deletions(session)
+def _run_job_sync(stop: threading.Event | None = None) -> None:
+    with start_span("kc_compensation.run", attributes={"worker.id": WORKER_ID}):
+        with Session(worker_engine) as session:
+            retry_keycloak_deletions(session, stop=stop)
+
+async def run_archive_job() -> None:
+    await asyncio.to_thread(_run_archive_sync)
 
-def retry_keycloak_deletions(session: Session):
+def _run_archive_sync(stop: threading.Event | None = None) -> None:
+    with Session(worker_engine) as session:
+        archive_done_tasks(session, stop=stop)
 
-    tasks = session.exec(
-        select(KcCompensationTask)
+def claim_due_tasks(session: Session, *, worker_id: str = WORKER_ID, limit: int = BATCH_SIZE):
+    """
+    Reclama hasta `limit` tasks vencidas con FOR UPDATE SKIP LOCKED y les asigna un lease.
+    Réplicas concurrentes se reparten la cola; un lease vencido (worker caído) vuelve a ser reclamable.
+    """
+    due_ids = (
+        select(KcCompensationTask.id)
         .where(KcCompensationTask.status == KcTaskStatus.pending)
         .where(KcCompensationTask.attempts < MAX_ATTEMPTS)
         .where(KcCompensationTask.next_retry_at <= datetime.utcnow())
-        .limit(BATCH_SIZE)
+        .where(or_(
+            KcCompensationTask.lease_expires_at.is_(None),
+            KcCompensationTask.lease_expires_at < func.now(),
+        ))
+        .order_by(KcCompensationTask.next_retry_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    claimed = session.execute(
+        update(KcCompensationTask)
+        .where(KcCompensationTask.id.in_(due_ids.scalar_subquery()))
+        .values(claimed_by=worker_id, lease_expires_at=func.now() + timedelta(seconds=LEASE_SEC))
+        .returning(
+            KcCompensationTask.id,
+            KcCompensationTask.kc_user_id,
+            KcCompensationTask.attempts,
+            KcCompensationTask.trace_parent,
+        )
+        .execution_options(synchronize_session=False)
     ).all()
+    session.commit()
+    return claimed
 
-    logger.info("start_compensation_task", extra={"extra": {"count": len(tasks)}})
+def _delete_kc_user(keycloak, task) -> Exception | None:
+    # Span propio por task, enlazado (link) al request que dejó la task pendiente.
+    with start_span(
+        "kc_compensation.delete_user",
+        attributes={"kc_task.id": str(task.id), "kc_task.attempts": task.attempts},
+        traceparent=task.trace_parent,
+    ):
+        try:
+            keycloak.delete_account(task.kc_user_id)
+            return None
+        except Exception as e:
+            return e
 
-    if len(tasks) == 0:
-        logger.info("no_compensation_task_to_run")
-        return
+def _task_outcome(task_id: uuid.UUID, kc_user_id: uuid.UUID, attempts: int, error: Exception | None) -> dict:
+    """
+    Valores nuevos de la task (para el UPDATE en lote) según el resultado del delete.
+    """
+    if error is None:
+        logger.info(
+            "kc_user_deleted_successfully",
+            extra={"extra": {"task_id": str(task_id), "kc_user": str(kc_user_id)}},
+        )
+        return {"id": task_id, "status": KcTaskStatus.done, "last_error": None, "claimed_by": None, "lease_expires_at": None}
 
-    keycloak = KeycloakIntegration()
+    if isinstance(getattr(error, "cause", error), KeycloakUnavailableError):
+        # Rechazada por el circuit breaker/bulkhead sin llegar a Keycloak: no consume un intento.
+        next_retry_at = datetime.utcnow() + timedelta(seconds=keycloak_breaker.open_sec)
+        logger.info(
+            "kc_user_delete_deferred",
+            extra={"extra": {"task_id": str(task_id), "next_retry_at": next_retry_at.isoformat()}},
+        )
+        return {
+            "id": task_id,
+            "status": KcTaskStatus.pending,
+            "attempts": attempts,
+            "next_retry_at": next_retry_at,
+            "last_error": f"{type(error).__name__}: {str(error)[:500]}",
+            "claimed_by": None,
+            "lease_expires_at": None,
+        }
 
-    for task in tasks:
+    attempts += 1
+    delay_min = min(MAX_DELAY_MIN, 2 ** attempts)
+    jitter_sec = random.randint(0, 30)
+    next_retry_at = datetime.utcnow() + timedelta(minutes=delay_min, seconds=jitter_sec)
+    status = KcTaskStatus.failed if attempts >= MAX_ATTEMPTS else KcTaskStatus.pending
 
-        try:
-            keycloak.delete_account(task.kc_user_id)
-            task.status = KcTaskStatus.done
-            task.last_error = None
+    logger.warning(
+        "kc_user_deleted_fail",
+        exc_info=error,
+        extra={"extra": {
+            "task_id": str(task_id),
+            "kc_user": str(kc_user_id),
+            "attempts": attempts,
+            "next_retry_at": next_retry_at.isoformat(),
+            "error_type": type(error).__name__,
+        }},
+    )
+    return {
+        "id": task_id,
+        "status": status,
+        "attempts": attempts,
+        "next_retry_at": next_retry_at,
+        "last_error": f"{type(error).__name__}: {str(error)[:500]}",  # truncado
+        "claimed_by": None,
+        "lease_expires_at": None,
+    }
 
-            logger.info(
-                "kc_user_deleted_successfully",
-                extra={"extra": {"task_id": str(task.id), "kc_user": str(task.kc_user_id)}},
-            )
+def retry_keycloak_deletions(
+    session: Session,
+    *,
+    time_budget_sec: float = TIME_BUDGET_SEC,
+    stop: threading.Event | None = None,
+) -> int:
+    """
+    Drena las tasks vencidas por lotes de BATCH_SIZE, con hasta CONCURRENCY deletes en vuelo,
+    hasta vaciar la cola, agotar el presupuesto de tiempo o recibir `stop` (se termina el lote en curso).
+    Retorna cuántas tasks procesó.
+    """
+    deadline = time.monotonic() + time_budget_sec
+    keycloak = None
+    processed = 0
 
-        except Exception as e:
-            task.attempts += 1
-            task.last_error = f"{type(e).__name__}: {str(e)[:500]}"  # truncado
-
-            delay_min = min(MAX_DELAY_MIN, 2 ** task.attempts)
-            jitter_sec = random.randint(0, 30)
-            task.next_retry_at = datetime.utcnow() + timedelta(minutes=delay_min, seconds=jitter_sec)
-
-            # opcional: si attempts llegó al máximo, márcala failed
-            if task.attempts >= MAX_ATTEMPTS:
-                task.status = KcTaskStatus.failed  # si tienes ese enum
-
-            logger.warning(
-                "kc_user_deleted_fail",
-                exc_info=True,
-                extra={"extra": {
-                    "task_id": str(task.id),
-                    "kc_user": str(task.kc_user_id),
-                    "attempts": task.attempts,
-                    "next_retry_at": task.next_retry_at.isoformat(),
-                    "error_type": type(e).__name__,
-                }},
-            )
-        
+    with ThreadPoolExecutor(max_workers=CONCURRENCY, thread_name_prefix="kc-compensation") as pool:
+        while True:
+            if keycloak_circuit_open():
+                # No se reclaman tasks mientras Keycloak está caído: se retoma en la próxima corrida.
+                logger.warning("kc_compensation_paused_circuit_open", extra={"extra": {"processed": processed}})
+                break
+
+            # El claim se confirma antes de llamar a Keycloak: no hay transacción abierta durante los deletes.
+            due = claim_due_tasks(session)
+
+            logger.info("start_compensation_task", extra={"extra": {"count": len(due)}})
+
+            if len(due) == 0:
+                if processed == 0:
+                    logger.info("no_compensation_task_to_run")
+                break
+
+            keycloak = keycloak or get_keycloak_integration()
+            # copy_context por task: los spans de cada hilo quedan bajo el span de la corrida.
+            futures = [pool.submit(contextvars.copy_context().run, _delete_kc_user, keycloak, row) for row in due]
+            errors = [future.result() for future in futures]
+            outcomes = [
+                _task_outcome(row.id, row.kc_user_id, row.attempts, error)
+                for row, error in zip(due, errors)
+            ]
+
+            try:
+                # Un solo UPDATE por lote (executemany por primary key), solo sobre leases propios.
+                session.execute(
+                    update(KcCompensationTask)
+                    .where(KcCompensationTask.claimed_by == WORKER_ID)
+                    .execution_options(synchronize_session=None),
+                    outcomes,
+                )
+                session.commit()
+            except Exception as db_err:
+                session.rollback()
+                logger.error(
+                    "Failed to update task",
+                    extra={"extra": {"task_ids": [str(row.id) for row in due], "db_err": db_err}},
+                )
+                break
+
+            processed += len(due)
+
+            if len(due) < BATCH_SIZE or time.monotonic() >= deadline:
+                break
+            if stop is not None and stop.is_set():
+                break
+
+    logger.info("compensation_run_finished", extra={"extra": {"processed": processed}})
+    return processed
+
+def _archive_batch_statement(retention_days: int, batch_size: int):
+    """
+    WITH moved AS (DELETE ... RETURNING *) INSERT INTO archive SELECT * FROM moved:
+    mueve un lote de tasks done más viejas que la retención en una sola sentencia.
+    """
+    columns = [column.name for column in KcCompensationTask.__table__.columns]
+    candidates = (
+        select(KcCompensationTask.id)
+        .where(KcCompensationTask.status == KcTaskStatus.done)
+        .where(KcCompensationTask.updated_at < func.now() - timedelta(days=retention_days))
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    moved = (
+        delete(KcCompensationTask)
+        .where(KcCompensationTask.id.in_(candidates.scalar_subquery()))
+        .returning(*KcCompensationTask.__table__.columns)
+        .cte("moved")
+    )
+    return (
+        insert(KcCompensationTaskArchive)
+        .from_select(columns, select(*[moved.c[name] for name in columns]))
+        .add_cte(moved)
+    )
+
+def archive_done_tasks(
+    session: Session,
+    *,
+    retention_days: int = RETENTION_DAYS,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+    time_budget_sec: float = TIME_BUDGET_SEC,
+    stop: threading.Event | None = None,
+) -> int:
+    """
+    Saca de la tabla caliente las tasks done por lotes (un commit por lote) para que el índice
+    parcial del poll y la tabla no crezcan con el histórico. Retorna cuántas archivó.
+    """
+    deadline = time.monotonic() + time_budget_sec
+    statement = _archive_batch_statement(retention_days, batch_size)
+    archived = 0
+
+    while True:
         try:
-            session.add(task)
+            moved = session.execute(statement).rowcount
             session.commit()
         except Exception as db_err:
             session.rollback()
-            logger.error(
-                "Failed to update task",
-                extra={"extra": {"task_id": str(task.id), "db_err": db_err}},
-            )
+            logger.error("kc_task_archive_failed", extra={"extra": {"archived": archived, "db_err": db_err}})
+            break
+
+        archived += moved
+        if moved < batch_size or time.monotonic() >= deadline:
+            break
+        if stop is not None and stop.is_set():
+            break
+
+    logger.info("kc_task_archive_finished", extra={"extra": {"archived": archived, "retention_days": retention_days}})
+    return archived
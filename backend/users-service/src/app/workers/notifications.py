@@ -0,0 +1,89 @@
+import select
+import time
+
+from sqlalchemy.engine import Engine
+
+from app.api.deps.db import worker_engine
+
+from app.core.logging.logger import get_logger
+logger = get_logger(__name__)
+
+# Canal del trigger kc_compensation_tasks_notify (migración b3f5d8e1a7c4).
+NOTIFY_CHANNEL = "kc_compensation_tasks"
+
+
+def supports_listen(engine: Engine) -> bool:
+    # LISTEN/NOTIFY solo existe en Postgres (SQLite en benchmarks locales).
+    return engine.dialect.name == "postgresql"
+
+
+class NotificationListener:
+    """
+    LISTEN sobre una conexión dedicada (fuera del pool). Si la conexión se cae, se
+    reintenta en la siguiente espera; el poll por intervalo sigue siendo la red de seguridad.
+    """
+
+    # Prefijo de los eventos de log (<prefix>_connected / <prefix>_failed).
+    log_prefix = "pg_listener"
+
+    def __init__(self, engine: Engine, channel: str):
+        self.engine = engine
+        self.channel = channel
+        self._conn = None
+
+    def _connect(self) -> None:
+        cargs, cparams = self.engine.dialect.create_connect_args(self.engine.url)
+        conn = self.engine.dialect.connect(*cargs, **cparams)
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(f'LISTEN "{self.channel}"')
+        self._conn = conn
+        logger.info(f"{self.log_prefix}_connected", extra={"extra": {"channel": self.channel}})
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Bloquea hasta `timeout` segundos. True si llegó al menos una notificación.
+        """
+        try:
+            if self._conn is None:
+                self._connect()
+            conn = self._conn
+            if not conn.notifies:
+                readable, _, _ = select.select([conn], [], [], timeout)
+                if not readable:
+                    return False
+                conn.poll()
+            received = bool(conn.notifies)
+            conn.notifies.clear()
+            return received
+        except Exception as e:
+            logger.warning(
+                f"{self.log_prefix}_failed",
+                extra={"extra": {"channel": self.channel, "error_type": type(e).__name__}},
+            )
+            self.close()
+            time.sleep(timeout)
+            return False
+
+    def drain(self) -> None:
+        """Descarta notificaciones acumuladas (p. ej. varias inserts en ráfaga)."""
+        self.wait(0)
+
+    def close(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+
+class CompensationTaskListener(NotificationListener):
+    """
+    Despierta al worker apenas se inserta una KcCompensationTask.
+    """
+
+    log_prefix = "kc_task_listener"
+
+    def __init__(self, engine: Engine = worker_engine, channel: str = NOTIFY_CHANNEL):
+        super().__init__(engine, channel)
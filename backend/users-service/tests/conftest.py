@@ -0,0 +1,27 @@
+import pytest
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def fake_clock(monkeypatch):
+    """
+    Instala un FakeClock en el hook `_clock` del módulo indicado: solo ese módulo ve el
+    tiempo falso, time.monotonic sigue siendo el real para el resto del proceso.
+    """
+
+    def install(module) -> FakeClock:
+        clock = FakeClock()
+        monkeypatch.setattr(module, "_clock", clock)
+        return clock
+
+    return install
@@ -0,0 +1,111 @@
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+from app.core import cache as cache_module
+from app.core.cache import Cache, MemoryBackend, invalidate_on_commit, memory_cache
+
+
+@pytest.fixture
+def clock(fake_clock):
+    return fake_clock(cache_module)
+
+
+@pytest.fixture
+def session():
+    engine = sa.create_engine("sqlite://")
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def test_entry_expires_after_ttl(clock):
+    evicted = []
+    backend = MemoryBackend(max_entries=10, ttl_sec=5.0, on_evict=evicted.append)
+    backend.set("a", 1)
+
+    clock.advance(4.9)
+    assert backend.get("a") == 1
+    clock.advance(0.1)
+    assert backend.get("a") is None
+    assert evicted == ["expired"]
+    assert len(backend) == 0
+
+
+def test_lru_evicts_least_recently_used(clock):
+    evicted = []
+    backend = MemoryBackend(max_entries=2, ttl_sec=60.0, on_evict=evicted.append)
+    backend.set("a", 1)
+    backend.set("b", 2)
+    # Leer "a" la vuelve la más reciente: sale "b".
+    assert backend.get("a") == 1
+    backend.set("c", 3)
+
+    assert backend.get("b") is None
+    assert backend.get("a") == 1
+    assert backend.get("c") == 3
+    assert evicted == ["lru"]
+
+
+def test_set_refreshes_ttl(clock):
+    backend = MemoryBackend(max_entries=10, ttl_sec=5.0)
+    backend.set("a", 1)
+    clock.advance(4)
+    backend.set("a", 2)
+    clock.advance(4)
+    assert backend.get("a") == 2
+
+
+def test_disabled_cache_never_stores():
+    cache = memory_cache("test_disabled", max_entries=10, ttl_sec=60.0, enabled=False)
+    assert cache.set("a", 1) is False
+    assert cache.get("a") is None
+
+
+def test_invalidate_removes_entry():
+    cache = memory_cache("test_invalidate", max_entries=10, ttl_sec=60.0)
+    cache.set("a", 1)
+    cache.invalidate("a")
+    assert cache.get("a") is None
+
+
+def test_load_started_before_invalidation_is_discarded():
+    cache = memory_cache("test_race", max_entries=10, ttl_sec=60.0)
+    token = cache.load_token()
+    # Un commit invalida la key mientras el lector todavía consulta la base.
+    cache.invalidate("a")
+
+    assert cache.set("a", "stale", token=token) is False
+    assert cache.get("a") is None
+    assert cache.set("a", "fresh", token=cache.load_token()) is True
+    assert cache.get("a") == "fresh"
+
+
+def test_invalidation_of_other_key_does_not_discard_load():
+    cache = memory_cache("test_other_key", max_entries=10, ttl_sec=60.0)
+    token = cache.load_token()
+    cache.invalidate("b")
+    assert cache.set("a", 1, token=token) is True
+
+
+def test_invalidate_on_commit_waits_for_commit(session):
+    cache = Cache("test_commit", MemoryBackend(max_entries=10, ttl_sec=60.0))
+    cache.set("a", 1)
+
+    session.execute(sa.text("SELECT 1"))
+    invalidate_on_commit(session, cache, "a")
+    assert cache.get("a") == 1
+
+    session.commit()
+    assert cache.get("a") is None
+
+
+def test_invalidate_on_commit_is_dropped_on_rollback(session):
+    cache = Cache("test_rollback", MemoryBackend(max_entries=10, ttl_sec=60.0))
+    cache.set("a", 1)
+
+    session.execute(sa.text("SELECT 1"))
+    invalidate_on_commit(session, cache, "a")
+    session.rollback()
+    session.commit()
+    assert cache.get("a") == 1
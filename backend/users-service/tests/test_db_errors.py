@@ -0,0 +1,34 @@
+import uuid
+from types import SimpleNamespace
+
+from sqlalchemy.exc import IntegrityError
+
+from app.db.errors import FOREIGN_KEY_VIOLATION, pg_error_details, pg_error_key
+
+NEIGHBORHOOD_ID = uuid.uuid4()
+DETAIL = f'Key (neighborhood_id)=({NEIGHBORHOOD_ID}) is not present in table "neighborhood".'
+CONSTRAINT = "user_neighborhood_interest_neighborhood_id_fkey"
+
+
+def _psycopg2_error() -> IntegrityError:
+    diag = SimpleNamespace(constraint_name=CONSTRAINT, column_name=None, message_detail=DETAIL)
+    return IntegrityError("INSERT ...", {}, SimpleNamespace(pgcode=FOREIGN_KEY_VIOLATION, diag=diag))
+
+
+def _asyncpg_error() -> IntegrityError:
+    # El adaptador de SQLAlchemy expone pgcode; el detalle queda en la excepción de asyncpg.
+    orig = SimpleNamespace(pgcode=FOREIGN_KEY_VIOLATION)
+    orig.__cause__ = SimpleNamespace(constraint_name=CONSTRAINT, column_name=None, detail=DETAIL)
+    return IntegrityError("INSERT ...", {}, orig)
+
+
+def test_details_from_both_drivers():
+    for error in (_psycopg2_error(), _asyncpg_error()):
+        assert pg_error_details(error) == (FOREIGN_KEY_VIOLATION, CONSTRAINT, None)
+        assert pg_error_key(error) == ("neighborhood_id", str(NEIGHBORHOOD_ID))
+
+
+def test_missing_details():
+    error = IntegrityError("INSERT ...", {}, SimpleNamespace())
+    assert pg_error_details(error) == (None, None, None)
+    assert pg_error_key(error) == (None, None)
@@ -0,0 +1,49 @@
+import hashlib
+
+import pytest
+from pydantic import BaseModel
+
+from app.core import config
+from app.services import idempotency_service
+from app.services.idempotency_service import request_fingerprint
+
+
+class Register(BaseModel):
+    email: str
+    password: str
+
+
+@pytest.fixture
+def secret(monkeypatch):
+    monkeypatch.setattr(config, "IDEMPOTENCY_FINGERPRINT_SECRET", "test-secret")
+
+
+def test_without_secret_fields_is_a_plain_hash():
+    payload = Register(email="a@x.com", password="p")
+    assert request_fingerprint(payload) == hashlib.sha256(payload.model_dump_json().encode()).hexdigest()
+
+
+def test_password_changes_the_fingerprint(secret):
+    first = request_fingerprint(Register(email="a@x.com", password="p1"), secret_fields={"password"})
+    retry = request_fingerprint(Register(email="a@x.com", password="p1"), secret_fields={"password"})
+    other = request_fingerprint(Register(email="a@x.com", password="p2"), secret_fields={"password"})
+    assert first == retry
+    assert first != other
+    assert len(first) == 64
+
+
+def test_fingerprint_is_keyed(monkeypatch, secret):
+    payload = Register(email="a@x.com", password="p")
+    keyed = request_fingerprint(payload, secret_fields={"password"})
+    monkeypatch.setattr(config, "IDEMPOTENCY_FINGERPRINT_SECRET", "other-secret")
+    assert request_fingerprint(payload, secret_fields={"password"}) != keyed
+    # Sin la clave no se puede reproducir con un sha256 del body.
+    assert keyed != hashlib.sha256(payload.model_dump_json().encode()).hexdigest()
+
+
+def test_without_configured_secret_uses_a_process_key(monkeypatch):
+    monkeypatch.setattr(config, "IDEMPOTENCY_FINGERPRINT_SECRET", "")
+    monkeypatch.setattr(idempotency_service, "_process_fingerprint_key", None)
+    payload = Register(email="a@x.com", password="p")
+    first = request_fingerprint(payload, secret_fields={"password"})
+    assert request_fingerprint(payload, secret_fields={"password"}) == first
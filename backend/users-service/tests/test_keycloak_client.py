@@ -0,0 +1,118 @@
+import asyncio
+import uuid
+
+import pytest
+
+from app.core import config
+from app.core.exceptions.integrations import KeycloakDeleteAccountError, KeycloakSetPasswordError, KeycloakUnavailableError
+from app.core.resilience import Bulkhead, CircuitBreaker
+from app.integrations import keycloak_client
+from app.integrations.keycloak_client import AsyncKeycloakIntegration, KeycloakIntegration
+from app.schemas.auth import PersonRegisterIn
+from app.services.auth_service import create_account_keycloak
+
+USER_ID = uuid.uuid4()
+
+
+class FakeAdmin:
+    """
+    KeycloakAdmin mínimo: registra las llamadas; `on_create` corre al crear el usuario.
+    """
+
+    def __init__(self, on_create=None, password_error: Exception | None = None):
+        self.calls: list[str] = []
+        self.on_create = on_create
+        self.password_error = password_error
+
+    def _create(self, payload):
+        self.calls.append("create_user")
+        if self.on_create is not None:
+            self.on_create()
+        return str(USER_ID)
+
+    def _set_password(self):
+        self.calls.append("set_user_password")
+        if self.password_error is not None:
+            raise self.password_error
+
+    def _delete(self):
+        self.calls.append("delete_user")
+
+    def create_user(self, payload):
+        return self._create(payload)
+
+    def set_user_password(self, **kwargs):
+        self._set_password()
+
+    def delete_user(self, **kwargs):
+        self._delete()
+
+    async def a_create_user(self, payload):
+        return self._create(payload)
+
+    async def a_set_user_password(self, **kwargs):
+        self._set_password()
+
+    async def a_delete_user(self, **kwargs):
+        self._delete()
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = CircuitBreaker("test", failure_threshold=1, open_sec=30.0)
+    monkeypatch.setattr(config, "KC_BREAKER_ENABLED", True)
+    monkeypatch.setattr(keycloak_client, "keycloak_breaker", breaker)
+    monkeypatch.setattr(keycloak_client, "keycloak_bulkhead", Bulkhead("test", max_concurrent=1, wait_sec=0.01))
+    return breaker
+
+
+def test_set_password_with_circuit_open_fails_fast(breaker):
+    admin = FakeAdmin()
+    breaker.record_failure()
+
+    with pytest.raises(KeycloakUnavailableError) as exc_info:
+        KeycloakIntegration(admin).set_password(USER_ID, "p")
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.context["reason"] == "circuit_open"
+    assert exc_info.value.context["retry_after_sec"] > 0
+    assert admin.calls == []
+
+
+def test_async_set_password_with_circuit_open_fails_fast(breaker):
+    admin = FakeAdmin()
+    breaker.record_failure()
+
+    with pytest.raises(KeycloakUnavailableError) as exc_info:
+        asyncio.run(AsyncKeycloakIntegration(admin).set_password(USER_ID, "p"))
+    assert exc_info.value.status_code == 503
+    assert admin.calls == []
+
+
+def test_async_set_password_with_bulkhead_full_fails_fast(breaker):
+    async def scenario():
+        assert await keycloak_client.keycloak_bulkhead.a_acquire()
+        await AsyncKeycloakIntegration(FakeAdmin()).set_password(USER_ID, "p")
+
+    with pytest.raises(KeycloakUnavailableError) as exc_info:
+        asyncio.run(scenario())
+    assert exc_info.value.context["reason"] == "bulkhead_full"
+
+
+def test_set_password_error_is_still_wrapped(breaker):
+    admin = FakeAdmin(password_error=ValueError("policy"))
+    with pytest.raises(KeycloakSetPasswordError):
+        KeycloakIntegration(admin).set_password(USER_ID, "p")
+
+
+def test_circuit_opening_between_create_and_set_password(breaker, monkeypatch):
+    # El create pasa y el circuito se abre antes del set_password: ni la contraseña ni el
+    # rollback llegan a Keycloak, y el 503 viaja como causa del delete fallido.
+    admin = FakeAdmin(on_create=breaker.record_failure)
+    integration = AsyncKeycloakIntegration(admin)
+    monkeypatch.setattr(integration, "inline_credentials", False)
+    account = PersonRegisterIn(first_name="a", last_name="b", email="a@x.com", password="p")
+
+    with pytest.raises(KeycloakDeleteAccountError) as exc_info:
+        asyncio.run(create_account_keycloak(integration, account))
+    assert isinstance(exc_info.value.__cause__, KeycloakUnavailableError)
+    assert admin.calls == ["create_user"]
@@ -0,0 +1,115 @@
+import logging
+import uuid
+
+import pytest
+
+from app.core.logging.context import request_id_ctx
+from app.core.logging.sampling import SamplingFilter, finish_request_trail, parse_rates, start_request_trail
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records: list[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+    @property
+    def events(self) -> list[str]:
+        return [record.msg for record in self.records]
+
+
+logger = logging.getLogger("tests.sampling")
+
+
+@pytest.fixture
+def handler(monkeypatch):
+    # Igual que setup_logging: el filtro va en los handlers del root.
+    handler = ListHandler()
+    handler.addFilter(SamplingFilter({"noisy": 0.0}, default_rate=1.0))
+    root = logging.getLogger()
+    monkeypatch.setattr(root, "handlers", [handler])
+    monkeypatch.setattr(root, "level", logging.DEBUG)
+    return handler
+
+
+@pytest.fixture
+def request_id():
+    token = request_id_ctx.set(str(uuid.uuid4()))
+    yield
+    request_id_ctx.reset(token)
+
+
+def test_parse_rates():
+    assert parse_rates(" a=0.5, b = 2 ,c=-1,, ") == {"a": 0.5, "b": 1.0, "c": 0.0}
+    assert parse_rates(None) == {}
+
+
+def test_rates_by_event(handler):
+    logger.info("noisy")
+    logger.info("other")
+    assert handler.events == ["other"]
+
+
+def test_warning_is_never_sampled(handler):
+    logger.warning("noisy")
+    logger.error("noisy")
+    assert handler.events == ["noisy", "noisy"]
+
+
+def test_decision_is_deterministic_per_request():
+    sampling = SamplingFilter()
+    for _ in range(50):
+        request_id = str(uuid.uuid4())
+        decisions = {sampling._keep(0.5, request_id) for _ in range(5)}
+        assert len(decisions) == 1
+
+
+def test_request_rate_matches_configured_rate():
+    sampling = SamplingFilter()
+    kept = sum(sampling._keep(0.25, str(uuid.uuid4())) for _ in range(4000))
+    assert 0.2 < kept / 4000 < 0.3
+
+
+def test_trail_is_dropped_when_request_succeeds(handler, request_id):
+    token = start_request_trail(10)
+    logger.info("noisy")
+    finish_request_trail(token, failed=False)
+    assert handler.events == []
+
+
+def test_trail_is_flushed_when_request_fails(handler, request_id):
+    token = start_request_trail(10)
+    logger.info("noisy", extra={"step": 1})
+    logger.info("other")
+    logger.info("noisy", extra={"step": 2})
+    finish_request_trail(token, failed=True)
+
+    assert handler.events == ["other", "noisy", "noisy"]
+    flushed = handler.records[1:]
+    assert [record.step for record in flushed] == [1, 2]
+    assert all(record.sampling_flushed for record in flushed)
+
+
+def test_error_log_flushes_the_trail(handler, request_id):
+    token = start_request_trail(10)
+    logger.info("noisy")
+    logger.error("boom")
+    finish_request_trail(token, failed=False)
+    assert handler.events == ["boom", "noisy"]
+
+
+def test_trail_keeps_the_latest_records(handler, request_id):
+    token = start_request_trail(2)
+    for step in range(5):
+        logger.info("noisy", extra={"step": step})
+    finish_request_trail(token, failed=True)
+    assert [record.step for record in handler.records] == [3, 4]
+
+
+def test_without_trail_dropped_records_are_lost(handler):
+    logger.info("noisy")
+    token = start_request_trail(10)
+    finish_request_trail(token, failed=True)
+    assert handler.events == []
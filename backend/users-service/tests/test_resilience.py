@@ -0,0 +1,145 @@
+import asyncio
+
+import pytest
+
+from app.core import resilience
+from app.core.resilience import Bulkhead, CircuitBreaker, CircuitState
+
+
+@pytest.fixture
+def clock(fake_clock):
+    return fake_clock(resilience)
+
+
+def _breaker(**kwargs) -> CircuitBreaker:
+    options = {"failure_threshold": 3, "open_sec": 10.0, "half_open_probes": 1}
+    options.update(kwargs)
+    return CircuitBreaker("test", **options)
+
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = _breaker()
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state is CircuitState.closed
+
+    breaker.record_failure()
+    assert breaker.state is CircuitState.open
+    assert not breaker.allow()
+    assert breaker.retry_after_sec() == pytest.approx(10.0)
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = _breaker()
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state is CircuitState.closed
+
+
+def test_half_open_after_open_sec(clock):
+    breaker = _breaker()
+    for _ in range(3):
+        breaker.record_failure()
+
+    clock.advance(9.9)
+    assert breaker.state is CircuitState.open
+    assert breaker.retry_after_sec() == pytest.approx(0.1)
+
+    clock.advance(0.1)
+    assert breaker.state is CircuitState.half_open
+    assert breaker.retry_after_sec() == 0.0
+
+
+def test_half_open_limits_probes(clock):
+    breaker = _breaker(half_open_probes=2)
+    for _ in range(3):
+        breaker.record_failure()
+    clock.advance(10)
+
+    assert breaker.allow()
+    assert breaker.allow()
+    assert not breaker.allow()
+
+
+def test_probe_success_closes(clock):
+    breaker = _breaker()
+    for _ in range(3):
+        breaker.record_failure()
+    clock.advance(10)
+
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state is CircuitState.closed
+    # Cerrado de nuevo: vuelve a hacer falta el umbral completo para abrir.
+    breaker.record_failure()
+    assert breaker.state is CircuitState.closed
+
+
+def test_probe_failure_reopens(clock):
+    breaker = _breaker()
+    for _ in range(3):
+        breaker.record_failure()
+    clock.advance(10)
+
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state is CircuitState.open
+    assert breaker.retry_after_sec() == pytest.approx(10.0)
+
+
+def test_release_returns_the_probe(clock):
+    breaker = _breaker()
+    for _ in range(3):
+        breaker.record_failure()
+    clock.advance(10)
+
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.release()
+    assert breaker.state is CircuitState.half_open
+    assert breaker.allow()
+
+
+def test_reports_state_changes(clock):
+    changes = []
+    breaker = _breaker(failure_threshold=1, on_state_change=changes.append)
+    breaker.record_failure()
+    clock.advance(10)
+    breaker.allow()
+    breaker.record_success()
+    assert changes == [CircuitState.open, CircuitState.half_open, CircuitState.closed]
+
+
+def test_bulkhead_rejects_after_wait():
+    bulkhead = Bulkhead("test", max_concurrent=2, wait_sec=0.01)
+    assert bulkhead.acquire()
+    assert bulkhead.acquire()
+    assert not bulkhead.acquire()
+
+    bulkhead.release()
+    assert bulkhead.acquire()
+
+
+def test_async_bulkhead_rejects_after_wait():
+    async def scenario():
+        bulkhead = Bulkhead("test", max_concurrent=1, wait_sec=0.01)
+        assert await bulkhead.a_acquire()
+        assert not await bulkhead.a_acquire()
+        bulkhead.a_release()
+        assert await bulkhead.a_acquire()
+
+    asyncio.run(scenario())
+
+
+def test_async_bulkhead_waits_for_a_slot():
+    async def scenario():
+        bulkhead = Bulkhead("test", max_concurrent=1, wait_sec=1.0)
+        assert await bulkhead.a_acquire()
+        asyncio.get_running_loop().call_later(0.01, bulkhead.a_release)
+        assert await bulkhead.a_acquire()
+
+    asyncio.run(scenario())
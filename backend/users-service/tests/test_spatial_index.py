@@ -0,0 +1,115 @@
+import random
+
+import pytest
+
+from app.services import spatial_index
+from app.services.spatial_index import SpatialIndex, haversine_km
+
+BACKENDS = [
+    "python",
+    pytest.param("numpy", marks=pytest.mark.skipif(spatial_index.np is None, reason="numpy no instalado")),
+]
+# Tolerancia de distancia entre el índice y haversine directo (km).
+TOLERANCE_KM = 1e-6
+
+
+def _points(seed: int = 7) -> list[tuple[str, float, float]]:
+    """
+    Puntos con densidades distintas: ciudades con barrios cercanos, dispersos en todo el
+    globo, y casos borde (antimeridiano y polos).
+    """
+    rng = random.Random(seed)
+    points = []
+    for city in range(20):
+        lat, lon = rng.uniform(-60, 70), rng.uniform(-180, 180)
+        for n in range(30):
+            points.append((f"c{city}-{n}", lat + rng.gauss(0, 0.05), lon + rng.gauss(0, 0.05)))
+    for n in range(400):
+        points.append((f"g{n}", rng.uniform(-90, 90), rng.uniform(-180, 180)))
+    for n in range(20):
+        points.append((f"am{n}", rng.uniform(-5, 5), rng.choice((-1, 1)) * rng.uniform(179.5, 180)))
+        points.append((f"np{n}", rng.uniform(88.5, 90), rng.uniform(-180, 180)))
+    return points
+
+
+def _queries(points, seed: int = 11) -> list[tuple[float, float]]:
+    rng = random.Random(seed)
+    queries = [(lat, lon) for _, lat, lon in rng.sample(points, 25)]
+    queries += [(rng.uniform(-90, 90), rng.uniform(-180, 180)) for _ in range(25)]
+    queries += [(0.0, 179.99), (0.0, -179.99), (89.9, 0.0), (-89.9, 45.0)]
+    return queries
+
+
+def _brute_force(points, lat, lon):
+    return sorted(((name, haversine_km(lat, lon, p_lat, p_lon)) for name, p_lat, p_lon in points), key=lambda pair: pair[1])
+
+
+@pytest.fixture(scope="module")
+def points():
+    return _points()
+
+
+def _index(points, backend) -> SpatialIndex:
+    names, lats, lons = zip(*points)
+    return SpatialIndex(names, lats, lons, backend=backend)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("k", [1, 5, 40])
+def test_nearest_matches_brute_force(points, backend, k):
+    index = _index(points, backend)
+    for lat, lon in _queries(points):
+        expected = _brute_force(points, lat, lon)[:k]
+        found = index.nearest(lat, lon, k)
+        assert [name for name, _ in found] == [name for name, _ in expected]
+        assert [distance for _, distance in found] == pytest.approx([distance for _, distance in expected], abs=TOLERANCE_KM)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("radius_km", [0.5, 5.0, 250.0, 3000.0])
+def test_within_matches_brute_force(points, backend, radius_km):
+    index = _index(points, backend)
+    for lat, lon in _queries(points):
+        expected = _brute_force(points, lat, lon)
+        found = index.within(lat, lon, radius_km)
+        found_names = {name for name, _ in found}
+
+        # Lo que queda justo en el borde puede caer de cualquier lado por redondeo.
+        assert {name for name, distance in expected if distance < radius_km - TOLERANCE_KM} <= found_names
+        assert found_names <= {name for name, distance in expected if distance <= radius_km + TOLERANCE_KM}
+        distances = [distance for _, distance in found]
+        assert distances == sorted(distances)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_nearest_respects_max_km(points, backend):
+    index = _index(points, backend)
+    for lat, lon in _queries(points):
+        expected = [pair for pair in _brute_force(points, lat, lon) if pair[1] <= 100.0][:10]
+        found = index.nearest(lat, lon, 10, max_km=100.0)
+        assert [name for name, _ in found] == [name for name, _ in expected]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_within_limit(points, backend):
+    index = _index(points, backend)
+    lat, lon = points[0][1], points[0][2]
+    assert index.within(lat, lon, 50.0, limit=3) == index.nearest(lat, lon, 3, max_km=50.0)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_k_larger_than_index_returns_everything(backend):
+    index = SpatialIndex(["a", "b"], [0.0, 10.0], [0.0, 10.0], backend=backend)
+    assert [name for name, _ in index.nearest(9.0, 9.0, 5)] == ["b", "a"]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_empty_index_and_zero_k(backend):
+    assert SpatialIndex([], [], [], backend=backend).nearest(0.0, 0.0, 3) == []
+    assert SpatialIndex(["a"], [0.0], [0.0], backend=backend).nearest(0.0, 0.0, 0) == []
+
+
+def test_haversine_known_distance():
+    # Buenos Aires - Córdoba, ~646 km.
+    assert haversine_km(-34.6037, -58.3816, -31.4201, -64.1888) == pytest.approx(646, abs=5)
+    assert haversine_km(0.0, 179.9, 0.0, -179.9) == pytest.approx(22.24, abs=0.01)